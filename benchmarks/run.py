@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""Standalone benchmark runner for the document generation pipeline
+
+Examples:
+  python -m benchmarks.run --scales 1,10,100 --output bench.json
+  python -m benchmarks.run --suites templates,nodes --scales 1,10000
+  python -m benchmarks.run --compare baseline.json --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import synthetic_idea
+from docs_agent.erd import erd_context
+from docs_agent.ingest import clear_idea_cache, ingest_idea
+from docs_agent.openapi import render_openapi
+from docs_agent.state import Idea
+from docs_agent.graph import ALL_DOCS, NODE_FUNCTIONS, run_docs_generation
+from docs_agent.utils.render import TEMPLATES_DIR, render_template, warm_templates
+from docs_agent.utils.storage import MemoryStorage, use_storage
+
+
+SUITES = ("startup", "ingest", "templates", "nodes", "e2e", "mcp")
+
+# Suites that do not depend on the Idea; they run once, at the first scale
+SCALE_FREE = {"startup"}
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Templates rendered with context built by code, as their nodes do
+TEMPLATE_CONTEXT: Dict[str, Callable[[Idea], Dict[str, Any]]] = {
+  "erd.mmd.jinja": lambda idea: {"erd": erd_context(idea)}
+}
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+  return {
+    "runs": len(timings),
+    "median": statistics.median(timings),
+    "mean": statistics.fmean(timings),
+    "min": min(timings),
+    "max": max(timings),
+    "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0
+  }
+
+
+def measure(fn: Callable[[Path], Any], repeat: int, warmup: int = 1) -> Dict[str, float]:
+  """Time fn(tmp_dir), with a fresh directory per call created outside the timing"""
+  timings = []
+  for i in range(warmup + repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+      start = time.perf_counter()
+      fn(Path(tmp))
+      if i >= warmup:
+        timings.append(time.perf_counter() - start)
+  return summarize(timings)
+
+
+async def measure_async(fn: Callable[[Path], Awaitable[Any]], repeat: int, warmup: int = 1) -> Dict[str, float]:
+  timings = []
+  for i in range(warmup + repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+      start = time.perf_counter()
+      await fn(Path(tmp))
+      if i >= warmup:
+        timings.append(time.perf_counter() - start)
+  return summarize(timings)
+
+
+def _with_output(idea: Idea, output_dir: Path) -> Idea:
+  return idea.model_copy(update={"output_dir": output_dir, "overwrite": True, "artifacts": []})
+
+
+def bench_startup(idea: Idea, repeat: int) -> Dict[str, Dict[str, float]]:
+  """Cold start: importing each MCP server, and spawning it over stdio until ping returns"""
+  from fastmcp import Client
+  from fastmcp.client.transports import PythonStdioTransport
+
+  servers = {"docs_agent.server": "docs_agent/server.py", "orchestrator.server": "orchestrator/server.py"}
+
+  async def ping(script: str) -> None:
+    transport = PythonStdioTransport(
+      str(PROJECT_ROOT / script), env=dict(os.environ), cwd=str(PROJECT_ROOT), keep_alive=False, log_file=Path(os.devnull)
+    )
+    async with Client(transport) as client:
+      await client.call_tool("ping", {})
+
+  results = {}
+  for module, script in servers.items():
+    results[f"import[{module}]"] = measure(
+      lambda _, module=module: subprocess.run([sys.executable, "-c", f"import {module}"], cwd=PROJECT_ROOT, check=True),
+      repeat
+    )
+    results[f"first_ping[{module}]"] = measure(lambda _, script=script: asyncio.run(ping(script)), repeat)
+  return results
+
+
+def bench_ingest(idea: Idea, repeat: int) -> Dict[str, Dict[str, float]]:
+  """Parsing and validating an Idea payload, cold and from the Idea cache"""
+  payload = idea.model_dump_json().encode("utf-8")
+  clear_idea_cache()
+  ingest_idea(payload)
+  return {
+    "ingest_idea[cold]": measure(lambda _: ingest_idea(payload, cache=False), repeat),
+    "ingest_idea[cached]": measure(lambda _: ingest_idea(payload), repeat),
+    "Idea.model_validate_json": measure(lambda _: Idea.model_validate_json(payload), repeat)
+  }
+
+
+def bench_templates(idea: Idea, repeat: int) -> Dict[str, Dict[str, float]]:
+  """Render time of every prompt template, including any context it needs"""
+  results = {}
+  for path in sorted(TEMPLATES_DIR.glob("*.jinja")):
+    extra = TEMPLATE_CONTEXT.get(path.name, lambda _: {})
+    results[path.name] = measure(
+      lambda _, name=path.name, extra=extra: render_template(name, {"idea": idea, **extra(idea)}), repeat
+    )
+  # openapi.yaml is built in code by default; the template above is its fallback
+  results["openapi.yaml[builder]"] = measure(lambda _: render_openapi(idea), repeat)
+  return results
+
+
+def in_memory(fn: Callable[[Path], Any]) -> Callable[[Path], Any]:
+  """Run fn against a fresh in-memory storage, so only rendering and bookkeeping are timed"""
+  def run(tmp: Path) -> Any:
+    with use_storage(MemoryStorage(tmp)):
+      return fn(tmp)
+  return run
+
+
+def with_env(fn: Callable[[Path], Any], **env: str) -> Callable[[Path], Any]:
+  """Run fn with environment variables set for the call"""
+  def run(tmp: Path) -> Any:
+    previous = {name: os.environ.get(name) for name in env}
+    os.environ.update(env)
+    try:
+      return fn(tmp)
+    finally:
+      for name, value in previous.items():
+        if value is None:
+          os.environ.pop(name, None)
+        else:
+          os.environ[name] = value
+  return run
+
+
+def bench_nodes(idea: Idea, repeat: int) -> Dict[str, Dict[str, float]]:
+  """Time of each generate_* node, including its write"""
+  results = {}
+  for name, node in NODE_FUNCTIONS.items():
+    results[name] = measure(lambda tmp, node=node: node(_with_output(idea, tmp)), repeat)
+  return results
+
+
+def bench_e2e(idea: Idea, repeat: int) -> Dict[str, Dict[str, float]]:
+  """End-to-end time of the docs graph and the orchestrator workflows"""
+  from orchestrator.graph import PROFILES, orchestrate_docgen, run_unified_workflow
+
+  cases: Dict[str, Callable[[Path], Any]] = {
+    "run_docs_generation[serial]": lambda tmp: run_docs_generation(_with_output(idea, tmp), ALL_DOCS, overwrite=True),
+    "run_docs_generation[parallel]": lambda tmp: run_docs_generation(
+      _with_output(idea, tmp), ALL_DOCS, overwrite=True, parallel=True
+    ),
+    # Every size goes to the render pool here; production keeps small Ideas in-process
+    "run_docs_generation[process]": with_env(
+      lambda tmp: run_docs_generation(_with_output(idea, tmp), ALL_DOCS, overwrite=True, backend="process"),
+      DOCGEN_PROCESS_MIN_ITEMS="0"
+    ),
+    "run_docs_generation[memory_storage]": in_memory(
+      lambda tmp: run_docs_generation(_with_output(idea, tmp), ALL_DOCS, overwrite=True)
+    ),
+    # Documents returned in the result instead of written, against the serial disk case
+    "run_docs_generation[memory_sink]": lambda tmp: run_docs_generation(
+      _with_output(idea, tmp), ALL_DOCS, sink="memory"
+    )
+  }
+  for profile in PROFILES:
+    cases[f"orchestrate_docgen[{profile}]"] = (
+      lambda tmp, profile=profile: orchestrate_docgen(_with_output(idea, tmp), profile, overwrite=True)
+    )
+  cases["run_unified_workflow"] = lambda tmp: run_unified_workflow(_with_output(idea, tmp), overwrite=True)
+
+  return {name: measure(case, repeat) for name, case in cases.items()}
+
+
+def bench_mcp(idea: Idea, repeat: int) -> Dict[str, Dict[str, float]]:
+  """Round trips through an in-process FastMCP client"""
+  from fastmcp import Client
+  from docs_agent.server import mcp
+
+  idea_json = idea.model_dump_json()
+
+  async def main() -> Dict[str, Dict[str, float]]:
+    results = {}
+    async with Client(mcp) as client:
+
+      def in_root(call: Callable[[Any], Awaitable[Any]]) -> Callable[[Path], Awaitable[Any]]:
+        # Each round trip writes into its own fresh output root
+        async def run(tmp: Path) -> Any:
+          os.environ["DOCGEN_OUTPUT_ROOT"] = str(tmp)
+          return await call(client)
+        return run
+
+      cases = {
+        "ping": lambda c: c.call_tool("ping", {}),
+        "generate_documents[frd]": lambda c: c.call_tool("generate_documents", {"idea_json": idea_json, "docs": ["frd"]}),
+        "generate_all": lambda c: c.call_tool("generate_all", {"idea_json": idea_json}),
+        "generate_all[parallel]": lambda c: c.call_tool("generate_all", {"idea_json": idea_json, "parallel": True}),
+        "list_outputs": lambda c: c.call_tool("list_outputs", {})
+      }
+      for name, call in cases.items():
+        results[name] = await measure_async(in_root(call), repeat)
+    return results
+
+  previous = os.environ.get("DOCGEN_OUTPUT_ROOT")
+  try:
+    return asyncio.run(main())
+  finally:
+    if previous is None:
+      os.environ.pop("DOCGEN_OUTPUT_ROOT", None)
+    else:
+      os.environ["DOCGEN_OUTPUT_ROOT"] = previous
+
+
+BENCHMARKS: Dict[str, Callable[[Idea, int], Dict[str, Dict[str, float]]]] = {
+  "startup": bench_startup,
+  "ingest": bench_ingest,
+  "templates": bench_templates,
+  "nodes": bench_nodes,
+  "e2e": bench_e2e,
+  "mcp": bench_mcp
+}
+
+
+def git_commit() -> Optional[str]:
+  try:
+    out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    return out.stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+
+def run_benchmarks(suites: List[str], scales: List[int], repeat: int) -> Dict[str, Any]:
+  warm_templates()
+  results = []
+  for scale in scales:
+    idea = synthetic_idea(scale)
+    for suite in suites:
+      if suite in SCALE_FREE and scale != scales[0]:
+        continue
+      for name, stats in BENCHMARKS[suite](idea, repeat).items():
+        results.append({"suite": suite, "name": name, "scale": scale, **stats})
+        print(f"{suite:10} {name:40} x{scale:<6} median {stats['median'] * 1000:10.3f} ms", file=sys.stderr)
+  return {
+    "meta": {
+      "commit": git_commit(),
+      "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+      "python": platform.python_version(),
+      "platform": platform.platform(),
+      "suites": suites,
+      "scales": scales,
+      "repeat": repeat
+    },
+    "results": results
+  }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+  """Median ratios against a baseline run; regressions exceed 1 + threshold"""
+  previous = {(r["suite"], r["name"], r["scale"]): r for r in baseline["results"]}
+  rows = []
+  for result in current["results"]:
+    base = previous.get((result["suite"], result["name"], result["scale"]))
+    if base is None or not base["median"]:
+      continue
+    ratio = result["median"] / base["median"]
+    rows.append({
+      "suite": result["suite"],
+      "name": result["name"],
+      "scale": result["scale"],
+      "baseline": base["median"],
+      "current": result["median"],
+      "ratio": ratio,
+      "regression": ratio > 1 + threshold
+    })
+  return rows
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Benchmark the document generation pipeline")
+  parser.add_argument("--suites", default=",".join(SUITES), help=f"Comma-separated suites: {', '.join(SUITES)}")
+  parser.add_argument("--scales", default="1,10,100,1000", help="Comma-separated entity/API/module counts, up to 10000")
+  parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+  parser.add_argument("--output", help="Write results JSON to this file")
+  parser.add_argument("--compare", help="Baseline results JSON to compare against")
+  parser.add_argument("--threshold", type=float, default=0.10, help="Allowed median slowdown before flagging a regression")
+  parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero if any benchmark regressed")
+  args = parser.parse_args()
+
+  suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+  unknown = [s for s in suites if s not in BENCHMARKS]
+  if unknown:
+    parser.error(f"unknown suites: {', '.join(unknown)}")
+  scales = [int(s) for s in args.scales.split(",") if s.strip()]
+
+  # Keep every output, catalog and run directory out of the working tree
+  with tempfile.TemporaryDirectory() as root:
+    os.environ["DOCGEN_OUTPUT_ROOT"] = root
+    report = run_benchmarks(suites, scales, args.repeat)
+
+  if args.output:
+    Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results written to {args.output}", file=sys.stderr)
+  else:
+    print(json.dumps(report, indent=2))
+
+  if args.compare:
+    rows = compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), report, args.threshold)
+    for row in rows:
+      flag = "REGRESSION" if row["regression"] else ""
+      print(
+        f"{row['suite']:10} {row['name']:40} x{row['scale']:<6} "
+        f"{row['baseline'] * 1000:10.3f} -> {row['current'] * 1000:10.3f} ms ({row['ratio']:.2f}x) {flag}",
+        file=sys.stderr
+      )
+    if args.fail_on_regression and any(row["regression"] for row in rows):
+      sys.exit(1)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,38 @@
+"""Synthetic Ideas for benchmarks"""
+
+from typing import Dict
+from docs_agent.state import Context, Idea
+
+
+_ENTITY_NAMES = ["User", "Account", "Product", "Order", "Invoice", "Payment", "Shipment", "Review"]
+_MODULE_NAMES = ["Identity", "Catalog", "Checkout", "Billing", "Fulfillment", "Reporting", "Support", "Search"]
+
+
+def synthetic_idea(scale: int, title: str = "Synthetic Platform") -> Idea:
+  """An Idea with ``scale`` entities, APIs and modules
+
+  Names are deterministic so results compare across commits.
+  """
+  entities = [f"{_ENTITY_NAMES[i % len(_ENTITY_NAMES)]}{i}" for i in range(scale)]
+  modules = [f"{_MODULE_NAMES[i % len(_MODULE_NAMES)]} {i}" for i in range(scale)]
+  apis = [f"{entity} API" for entity in entities]
+  slas: Dict[str, str] = {"Uptime": "99.9%", "Response Time": "<200ms"}
+  return Idea(
+    title=f"{title} x{scale}",
+    description=f"Synthetic benchmark Idea with {scale} entities, APIs and modules",
+    context=Context(
+      project_name=f"{title} x{scale}",
+      domain="Benchmarking",
+      stakeholders=["CTO", "Product Manager", "Development Team"],
+      constraints=["Budget: $1M", "Timeline: 12 months"],
+      assumptions=["Cloud-native architecture"]
+    ),
+    personas=["Customer", "Operator", "Admin User"],
+    kpis=["Conversion rate", "Latency", "Error rate"],
+    modules=modules,
+    entities=entities,
+    apis=apis,
+    compliance=["GDPR", "SOC 2"],
+    slas=slas,
+    version="1.0.0"
+  )
@@ -1,15 +1,32 @@
 """DocGen Suite - LangGraph Docs Agent Package"""
 
+import importlib
+from typing import Any, List
+
 __version__ = "0.1.0"
 __author__ = "DocGen Team"
 
-from .state import Idea, Context, DocRequest, DocArtifacts
-from .graph import create_docs_graph
+# Public names and the submodules defining them, imported on first access
+# so that loading a light submodule does not pull in LangGraph
+_EXPORTS = {
+  "Idea": "state",
+  "Context": "state",
+  "DocRequest": "state",
+  "DocArtifacts": "state",
+  "create_docs_graph": "graph"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+  module = _EXPORTS.get(name)
+  if module is None:
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  value = getattr(importlib.import_module(f".{module}", __name__), name)
+  globals()[name] = value
+  return value
+
 
-__all__ = [
-  "Idea",
-  "Context", 
-  "DocRequest",
-  "DocArtifacts",
-  "create_docs_graph"
-]
+def __dir__() -> List[str]:
+  return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,246 @@
+"""HTTP API for DocGen Suite
+
+The MCP tools' operations as REST endpoints on an ASGI app. Generation
+endpoints take the Idea JSON as the request body and their options as
+query parameters, and run on the bounded job queue. Run it with several
+uvicorn workers (``python -m docs_agent.api --workers 4``); each worker
+compiles its own templates and graphs when it starts. ``handler`` serves
+the app on AWS Lambda through Mangum.
+"""
+
+import contextlib
+import itertools
+import os
+import sys
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from mangum import Mangum
+from docs_agent import service
+from docs_agent.utils.output import get_output_directory
+from docs_agent.utils.startup import start_prewarm
+
+
+def default_max_concurrency() -> int:
+  """Requests a worker serves at once before answering 503, from DOCGEN_API_MAX_CONCURRENCY"""
+  return int(os.getenv("DOCGEN_API_MAX_CONCURRENCY", "64"))
+
+
+class ConcurrencyLimit:
+  """ASGI middleware that rejects requests beyond ``limit`` in flight
+
+  Rejected requests get 503 with Retry-After instead of queueing, so a
+  saturated worker sheds load right away. A limit of 0 disables it.
+  """
+
+  def __init__(self, app: Any, limit: Optional[int] = None):
+    self.app = app
+    self.limit = default_max_concurrency() if limit is None else limit
+    self.active = 0
+    self.rejected = 0
+
+  async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+    if scope["type"] != "http" or self.limit <= 0:
+      await self.app(scope, receive, send)
+      return
+    # One event loop per worker, so the counter needs no lock
+    if self.active >= self.limit:
+      self.rejected += 1
+      response = JSONResponse(
+        {"success": False, "error": f"Server is handling {self.limit} requests; retry later"},
+        status_code=503,
+        headers={"Retry-After": "1"}
+      )
+      await response(scope, receive, send)
+      return
+    self.active += 1
+    try:
+      await self.app(scope, receive, send)
+    finally:
+      self.active -= 1
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+  # Compile templates and graphs in this worker (DOCGEN_PREWARM)
+  start_prewarm(service.warm_up)
+  yield
+
+
+app = FastAPI(title="DocGen Suite", version="1.0.0", lifespan=lifespan)
+limiter = ConcurrencyLimit(app)
+
+
+def _split(values: Optional[List[str]]) -> List[str]:
+  """Accept both ?docs=a&docs=b and ?docs=a,b"""
+  return [value.strip() for item in values or [] for value in item.split(",") if value.strip()]
+
+
+async def _queued(fn: Any, *args: Any) -> Dict[str, Any]:
+  from docs_agent.jobs import QueueFullError, get_job_queue
+
+  try:
+    return await get_job_queue().run(fn, *args)
+  except QueueFullError as e:
+    raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+  except ValueError as e:
+    raise HTTPException(status_code=422, detail=str(e))
+
+
+@app.get("/health")
+def health() -> Dict[str, str]:
+  return {"status": "ok"}
+
+
+@app.get("/doc-types")
+def doc_types() -> List[Dict[str, Any]]:
+  """Registered document types with their template, output file, node and profiles"""
+  from docs_agent.registry import describe_documents
+  return describe_documents()
+
+
+@app.get("/profiles")
+def profiles() -> Dict[str, List[str]]:
+  """Document types generated by each orchestration profile"""
+  from docs_agent.registry import profiles as doc_profiles
+  return doc_profiles()
+
+
+@app.post("/generate")
+async def generate(
+  request: Request,
+  docs: List[str] = Query(..., description="Document types, repeated or comma-separated"),
+  overwrite: bool = False,
+  parallel: bool = False,
+  incremental: bool = False,
+  layout: Optional[str] = None,
+  backend: Optional[str] = None,
+  sink: str = "storage"
+) -> Dict[str, Any]:
+  """Generate specific documents for the Idea in the request body; sink=memory returns them unwritten"""
+  payload = await request.body()
+  return await _queued(
+    service.generate, payload, _split(docs), overwrite, parallel, incremental, layout, backend, sink
+  )
+
+
+@app.post("/generate/all")
+async def generate_all(
+  request: Request,
+  overwrite: bool = False,
+  parallel: bool = False,
+  incremental: bool = False,
+  layout: Optional[str] = None,
+  backend: Optional[str] = None,
+  sink: str = "storage"
+) -> Dict[str, Any]:
+  """Generate every document type for the Idea in the request body"""
+  payload = await request.body()
+  return await _queued(
+    service.generate, payload, service.all_docs(), overwrite, parallel, incremental, layout, backend, sink
+  )
+
+
+@app.post("/orchestrate")
+async def orchestrate(request: Request, profile: str = "full", overwrite: bool = False) -> Dict[str, Any]:
+  """Generate an orchestration profile's documents for the Idea in the request body"""
+  payload = await request.body()
+  return await _queued(service.orchestrate, payload, profile, overwrite)
+
+
+@app.get("/outputs")
+def list_outputs(
+  doc_type: Optional[str] = None,
+  idea_hash: Optional[str] = None,
+  prefix: Optional[str] = None,
+  limit: Optional[int] = None,
+  offset: int = 0,
+  refresh: bool = False
+) -> List[str]:
+  """Output paths from the catalog"""
+  return service.list_outputs(doc_type, idea_hash, prefix, limit, offset, refresh)
+
+
+@app.get("/outputs/{path:path}", response_class=PlainTextResponse)
+def show_doc(
+  path: str,
+  start_line: Optional[int] = None,
+  end_line: Optional[int] = None,
+  offset: Optional[int] = None,
+  length: Optional[int] = None
+) -> str:
+  """A document's content, whole or by line (1-based, inclusive) or byte range"""
+  try:
+    return service.read_document(path, start_line, end_line, offset, length)
+  except FileNotFoundError as e:
+    raise HTTPException(status_code=404, detail=str(e))
+  except ValueError as e:
+    raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/zip")
+def zip_outputs(
+  subdir: Optional[str] = None,
+  files: Optional[List[str]] = Query(None),
+  compression: Optional[str] = None
+) -> StreamingResponse:
+  """Stream a zip of the outputs, or of a subdirectory or some files, built as it is sent"""
+  from docs_agent.utils.archive import collect_files, iter_archive_chunks
+
+  try:
+    sources = collect_files(get_output_directory(), subdir, _split(files) or None)
+    chunks = iter_archive_chunks(sources, compression)
+    # The size and compression checks run with the first chunk; fail before the response starts
+    first = next(chunks)
+  except FileNotFoundError as e:
+    raise HTTPException(status_code=404, detail=str(e))
+  except ValueError as e:
+    raise HTTPException(status_code=400, detail=str(e))
+  return StreamingResponse(
+    itertools.chain([first], chunks),
+    media_type="application/zip",
+    headers={"Content-Disposition": 'attachment; filename="docs_outputs.zip"'}
+  )
+
+
+@app.get("/stats")
+def stats() -> Dict[str, Any]:
+  """Rolling run metrics plus this worker's request and job queue counters"""
+  from docs_agent.jobs import get_job_queue
+  from docs_agent.metrics import get_metrics_registry
+
+  return {
+    "pid": os.getpid(),
+    "requests": {"active": limiter.active, "limit": limiter.limit, "rejected": limiter.rejected},
+    "jobs": get_job_queue().stats(),
+    "runs": get_metrics_registry().stats()
+  }
+
+
+# The limiter wraps the app after the routes are registered
+asgi = limiter
+
+# AWS Lambda entry point
+handler = Mangum(asgi, lifespan="auto")
+
+
+def main() -> None:
+  import argparse
+  import uvicorn
+
+  parser = argparse.ArgumentParser(description="DocGen HTTP API")
+  parser.add_argument("--host", default=os.getenv("DOCGEN_API_HOST", "127.0.0.1"))
+  parser.add_argument("--port", type=int, default=int(os.getenv("DOCGEN_API_PORT", "8000")))
+  parser.add_argument("--workers", type=int, default=int(os.getenv("DOCGEN_API_WORKERS", "1")),
+                      help="uvicorn worker processes, each with its own compiled templates and graphs")
+  args = parser.parse_args()
+  uvicorn.run("docs_agent.api:asgi", host=args.host, port=args.port, workers=args.workers, log_level="warning")
+
+
+if __name__ == "__main__":
+  main()
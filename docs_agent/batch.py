@@ -0,0 +1,154 @@
+"""Batch document generation for many Ideas in one call"""
+
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from .state import Idea
+from .ingest import IdeaPayload, load_idea
+from .graph import ALL_DOCS, get_compiled_graph, run_docs_generation
+from .render_pool import pool_context
+from .utils.render import warm_templates
+from .utils.storage import get_storage
+
+
+def load_jsonl(path: Union[str, Path]) -> List[str]:
+  """Read one Idea payload per non-empty line of a JSONL file"""
+  with open(path, "r", encoding="utf-8") as f:
+    return [line for line in (raw.strip() for raw in f) if line]
+
+
+def validate_ideas(payloads: Iterable[IdeaPayload]) -> Tuple[List[Tuple[int, Idea]], List[Dict[str, Any]]]:
+  """Validate all payloads up front, collecting per-item errors"""
+  ideas: List[Tuple[int, Idea]] = []
+  errors: List[Dict[str, Any]] = []
+  for index, payload in enumerate(payloads):
+    try:
+      # Batch payloads are rarely repeated, so they skip the Idea cache
+      ideas.append((index, load_idea(payload, cache=False)))
+    except ValueError as e:
+      errors.append({"index": index, "success": False, "error": str(e)})
+  return ideas, errors
+
+
+def _slug(text: str) -> str:
+  return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "idea"
+
+
+def assign_subdirectories(ideas: List[Tuple[int, Idea]], output_root: Path) -> None:
+  """Give each Idea its own output directory under output_root"""
+  used: Dict[str, int] = {}
+  for _, idea in ideas:
+    name = _slug(idea.title)
+    used[name] = used.get(name, 0) + 1
+    if used[name] > 1:
+      name = f"{name}-{used[name]}"
+    idea.output_dir = output_root / name
+
+
+def _init_worker(docs: List[str], parallel: bool) -> None:
+  """Compile templates and the graph once per worker process"""
+  warm_templates()
+  get_compiled_graph(docs, parallel)
+
+
+def _generate_one(
+  index: int,
+  idea: Idea,
+  docs: List[str],
+  overwrite: bool,
+  parallel: bool,
+  incremental: bool
+) -> Dict[str, Any]:
+  start = time.perf_counter()
+  try:
+    # Each batch worker already has a core of its own
+    result = run_docs_generation(idea, docs, overwrite, parallel, incremental=incremental, backend="thread")
+    artifacts = result["artifacts"]
+    return {
+      "index": index,
+      "title": idea.title,
+      "success": True,
+      "output_dir": str(idea.output_dir),
+      "documents": sum(len(a.get("artifacts", [a])) for a in artifacts),
+      "elapsed": round(time.perf_counter() - start, 4)
+    }
+  except Exception as e:
+    return {
+      "index": index,
+      "title": idea.title,
+      "success": False,
+      "error": str(e),
+      "elapsed": round(time.perf_counter() - start, 4)
+    }
+
+
+def iter_batch(
+  payloads: Iterable[IdeaPayload],
+  output_root: Union[str, Path],
+  docs: Optional[List[str]] = None,
+  overwrite: bool = False,
+  parallel: bool = False,
+  incremental: bool = False,
+  workers: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+  """Generate documents for many Ideas, yielding each result as it finishes
+
+  Payloads are validated in bulk first; invalid ones are yielded as failures
+  without being scheduled. Valid Ideas run across a process pool whose
+  workers compile templates and the graph once. With one worker everything
+  runs in-process. Workers are started with forkserver or spawn, never
+  fork, since callers such as the MCP server are multi-threaded.
+  """
+  docs = docs or ALL_DOCS
+  ideas, errors = validate_ideas(payloads)
+  yield from errors
+  assign_subdirectories(ideas, Path(output_root))
+
+  workers = workers or os.cpu_count() or 1
+  # Worker processes could not write to storage private to this process
+  if workers <= 1 or len(ideas) <= 1 or not get_storage().shared:
+    _init_worker(docs, parallel)
+    for index, idea in ideas:
+      yield _generate_one(index, idea, docs, overwrite, parallel, incremental)
+    return
+
+  with ProcessPoolExecutor(
+    max_workers=min(workers, len(ideas)),
+    mp_context=pool_context(),
+    initializer=_init_worker,
+    initargs=(docs, parallel)
+  ) as pool:
+    futures = [
+      pool.submit(_generate_one, index, idea, docs, overwrite, parallel, incremental)
+      for index, idea in ideas
+    ]
+    for future in as_completed(futures):
+      yield future.result()
+
+
+def summarize(results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+  """Throughput summary for a finished batch"""
+  succeeded = [r for r in results if r.get("success")]
+  documents = sum(r.get("documents", 0) for r in succeeded)
+  return {
+    "total": len(results),
+    "succeeded": len(succeeded),
+    "failed": len(results) - len(succeeded),
+    "documents": documents,
+    "elapsed": round(elapsed, 4),
+    "ideas_per_second": round(len(results) / elapsed, 2) if elapsed else 0.0,
+    "documents_per_second": round(documents / elapsed, 2) if elapsed else 0.0
+  }
+
+
+def run_batch(payloads: Iterable[IdeaPayload], output_root: Union[str, Path], **kwargs: Any) -> Dict[str, Any]:
+  """Generate documents for many Ideas and return all results with a summary"""
+  start = time.perf_counter()
+  results = list(iter_batch(payloads, output_root, **kwargs))
+  return {
+    "results": sorted(results, key=lambda r: r["index"]),
+    "summary": summarize(results, time.perf_counter() - start)
+  }
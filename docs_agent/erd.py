@@ -0,0 +1,202 @@
+"""Entity model behind the ERD document"""
+
+import itertools
+import os
+import re
+from collections import deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+import networkx as nx
+from .state import Idea
+
+
+# Attributes by entity name, beyond the audit fields every entity gets
+_BASE_ATTRIBUTES = [("UUID", "id", "PK"), ("TIMESTAMP", "created_at", ""), ("TIMESTAMP", "updated_at", "")]
+_ATTRIBUTE_GROUPS = [
+  (("user", "customer", "account"), [("VARCHAR(255)", "email"), ("VARCHAR(255)", "name"), ("VARCHAR(50)", "status")]),
+  (("order", "transaction", "payment"), [("DECIMAL(10,2)", "amount"), ("VARCHAR(3)", "currency"), ("VARCHAR(50)", "status")]),
+  (("product", "item", "service"), [("VARCHAR(255)", "name"), ("TEXT", "description"), ("DECIMAL(10,2)", "price")])
+]
+_DEFAULT_ATTRIBUTES = [("VARCHAR(255)", "name"), ("TEXT", "description")]
+_ATTRIBUTES_BY_NAME = {name: attributes for names, attributes in _ATTRIBUTE_GROUPS for name in names}
+
+# Relationships inferred from well-known entity names: (sources, targets, cardinality, label)
+_INFERRED = [
+  (("user", "customer"), ("order",), "one-to-many", "places"),
+  (("order", "transaction"), ("payment",), "one-to-one", "has"),
+  (("order",), ("product", "item"), "one-to-many", "contains")
+]
+
+CARDINALITY_SYMBOLS = {
+  "one-to-one": "||--||",
+  "one-to-many": "||--o{",
+  "many-to-one": "}o--||",
+  "many-to-many": "}o--o{"
+}
+
+UNASSIGNED_MODULE = "Other"
+
+
+def default_max_entities() -> int:
+  """Entities per diagram, from DOCGEN_ERD_MAX_ENTITIES"""
+  return int(os.getenv("DOCGEN_ERD_MAX_ENTITIES", "40"))
+
+
+def mermaid_id(name: str) -> str:
+  """Entity name as a Mermaid identifier"""
+  return re.sub(r"[^A-Za-z0-9_-]+", "_", name.strip()) or "_"
+
+
+def build_entity_graph(idea: Idea) -> nx.MultiDiGraph:
+  """Directed multigraph of entities and their relationships
+
+  Relationships are inferred once from an index of lower-cased names, then
+  declared relationships are added. A declared relationship replaces the
+  inferred edges between its two entities, in either direction, but every
+  declared relationship is kept, so a pair can have several. Declared
+  entities missing from ``idea.entities`` are added as nodes.
+  """
+  graph = nx.MultiDiGraph()
+  index: Dict[str, List[str]] = {}
+  for entity in idea.entities:
+    if entity in graph:
+      continue
+    graph.add_node(entity, module=idea.entity_modules.get(entity))
+    index.setdefault(entity.lower(), []).append(entity)
+
+  for sources, targets, cardinality, label in _INFERRED:
+    for source in (e for name in sources for e in index.get(name, [])):
+      for target in (e for name in targets for e in index.get(name, [])):
+        if source != target:
+          graph.add_edge(source, target, cardinality=cardinality, label=label, declared=False)
+
+  for relationship in idea.relationships:
+    for entity in (relationship.source, relationship.target):
+      if entity not in graph:
+        graph.add_node(entity, module=idea.entity_modules.get(entity))
+    for source, target in ((relationship.source, relationship.target), (relationship.target, relationship.source)):
+      inferred = [key for key, data in graph.get_edge_data(source, target, default={}).items() if not data["declared"]]
+      graph.remove_edges_from((source, target, key) for key in inferred)
+    graph.add_edge(
+      relationship.source,
+      relationship.target,
+      cardinality=relationship.cardinality,
+      label=relationship.label,
+      declared=True
+    )
+  return graph
+
+
+def _groups(graph: nx.MultiDiGraph, by_module: bool) -> List[Tuple[str, List[str]]]:
+  order = {entity: i for i, entity in enumerate(graph.nodes)}
+  if by_module:
+    modules: Dict[str, List[str]] = {}
+    for entity, module in graph.nodes(data="module"):
+      modules.setdefault(module or UNASSIGNED_MODULE, []).append(entity)
+    return list(modules.items())
+
+  connected, standalone = [], []
+  for component in nx.connected_components(graph.to_undirected(as_view=True)):
+    members = sorted(component, key=order.__getitem__)
+    (standalone if len(members) == 1 else connected).append(members)
+  connected.sort(key=lambda members: (-len(members), order[members[0]]))
+  groups = [(f"Group {i + 1}", members) for i, members in enumerate(connected)]
+  if standalone:
+    groups.append(("Standalone entities", [members[0] for members in sorted(standalone, key=lambda m: order[m[0]])]))
+  return groups
+
+
+def _chunks(graph: nx.MultiDiGraph, members: List[str], cap: int) -> List[List[str]]:
+  if len(members) <= cap:
+    return [members]
+  # Walk the group breadth-first so related entities land in the same chunk
+  allowed = set(members)
+  ordered: List[str] = []
+  seen: Set[str] = set()
+  for start in members:
+    if start in seen:
+      continue
+    seen.add(start)
+    queue = deque([start])
+    while queue:
+      entity = queue.popleft()
+      ordered.append(entity)
+      for neighbor in itertools.chain(graph.succ[entity], graph.pred[entity]):
+        if neighbor in allowed and neighbor not in seen:
+          seen.add(neighbor)
+          queue.append(neighbor)
+  return [ordered[i:i + cap] for i in range(0, len(ordered), cap)]
+
+
+def split_diagrams(graph: nx.MultiDiGraph, max_entities: Optional[int] = None) -> List[Dict[str, Any]]:
+  """Split the entity graph into diagrams of at most ``max_entities`` entities
+
+  A schema within the cap stays one diagram. Larger ones are grouped per
+  module when any entity has one, otherwise per connected component, and
+  oversized groups are chunked. Relationships that cross diagrams are drawn
+  in the diagram of their source entity, with the target shown without
+  attributes.
+  """
+  cap = max(1, max_entities or default_max_entities())
+  if graph.number_of_nodes() <= cap:
+    groups = [("All entities", list(graph.nodes))]
+  else:
+    groups = _groups(graph, any(module for _, module in graph.nodes(data="module")))
+  diagrams = []
+  for name, members in groups:
+    chunks = _chunks(graph, members, cap)
+    for i, chunk in enumerate(chunks):
+      members_set = set(chunk)
+      edges = list(graph.out_edges(chunk, data=True))
+      external = sorted({t for _, t, _ in edges if t not in members_set})
+      diagrams.append({
+        "name": name if len(chunks) == 1 else f"{name} ({i + 1}/{len(chunks)})",
+        "entities": chunk,
+        "external": external,
+        "relationships": len(edges),
+        "mermaid": render_mermaid(chunk, edges)
+      })
+  return diagrams
+
+
+def _label(text: str) -> str:
+  # A quote would end Mermaid's quoted label; #quot; is its entity code for one
+  return text.replace('"', "#quot;")
+
+
+def _attributes(entity: str) -> List[Tuple[str, ...]]:
+  return _BASE_ATTRIBUTES + _ATTRIBUTES_BY_NAME.get(entity.lower(), _DEFAULT_ATTRIBUTES)
+
+
+def render_mermaid(entities: List[str], edges: List[Tuple[str, str, Dict[str, Any]]]) -> str:
+  """Mermaid erDiagram source for some entities and the relationships leaving them"""
+  lines = ["erDiagram"]
+  for entity in entities:
+    lines.append(f"  {mermaid_id(entity)} {{")
+    lines.extend(f"    {' '.join(part for part in attribute if part)}" for attribute in _attributes(entity))
+    lines.append("  }")
+  for source, target, data in edges:
+    symbol = CARDINALITY_SYMBOLS[data["cardinality"]]
+    lines.append(f'  {mermaid_id(source)} {symbol} {mermaid_id(target)} : "{_label(data["label"])}"')
+  return "\n".join(lines)
+
+
+def describe_relationships(graph: nx.MultiDiGraph) -> Dict[str, List[str]]:
+  """Human-readable relationships per entity, for the entity descriptions"""
+  described: Dict[str, List[str]] = {entity: [] for entity in graph.nodes}
+  for source, target, data in graph.edges(data=True):
+    described[source].append(f"{data['label']} {target}")
+    described[target].append(f"{source} {data['label']} it")
+  return described
+
+
+def erd_context(idea: Idea, max_entities: Optional[int] = None) -> Dict[str, Any]:
+  """Template context for erd.mmd.jinja"""
+  graph = build_entity_graph(idea)
+  diagrams = split_diagrams(graph, max_entities)
+  return {
+    "diagrams": diagrams,
+    "entities": list(graph.nodes),
+    "entity_count": graph.number_of_nodes(),
+    "relationship_count": graph.number_of_edges(),
+    "relationships": describe_relationships(graph)
+  }
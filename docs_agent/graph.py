@@ -1,118 +1,443 @@
 """LangGraph for DocGen Suite"""
 
-from typing import Dict, Any, List
+import contextlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, FrozenSet, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
+from langchain_core.runnables import RunnableConfig
 from .state import Idea, DocRequest, DocArtifacts
-from .nodes import (
-  generate_brd_prd,
-  generate_frd,
-  generate_srd,
-  generate_trd_tdd,
-  generate_erd_api,
-  generate_ui_wireframes,
-  generate_project_plan,
-  generate_test_strategy,
-  generate_cicd_env,
-  generate_release_runbook
-)
-
-
-def create_docs_graph() -> StateGraph:
-  """Create the document generation graph"""
-  
+from .metrics import RunMetrics, artifact_bytes, get_metrics_registry
+from .utils.storage import MemoryStorage
+from .utils.writer import ArtifactWriter, use_writer
+from .utils.catalog import record_writes
+from .utils.incremental import compute_idea_hash
+from .registry import doc_types, get_doc_spec, node_dependencies, node_documents, canonical_docs, unknown_doc_types
+from .nodes.base import node_function
+from .render_pool import ProcessRenderer, resolve_backend
+
+
+# Node functions in serial chain order, one generic node per registered node
+NODE_FUNCTIONS: Dict[str, Callable[[Idea], Dict[str, Any]]] = {
+  name: node_function(name) for name in node_documents()
+}
+
+# Document type -> node that renders it
+DOC_NODES: Dict[str, str] = {doc: get_doc_spec(doc).node for doc in doc_types()}
+
+
+def _as_update(node: Callable[[Idea], Dict[str, Any]]) -> Callable[[Idea], Dict[str, Any]]:
+  """Wrap a node so its artifact is merged into the state's artifact list"""
+  def run(state: Idea, config: RunnableConfig) -> Dict[str, Any]:
+    configurable = config.get("configurable") or {}
+    metrics = configurable.get("metrics")
+    renderer = configurable.get("renderer")
+    start = time.perf_counter()
+    with use_writer(configurable.get("writer")), \
+        (metrics.node(node.__name__) if metrics else contextlib.nullcontext({})) as sample:
+      if renderer is not None:
+        artifact = renderer.render(node.__name__, configurable["writer"], sample)
+      else:
+        artifact = node(state)
+      sample["bytes"] = artifact_bytes(artifact)
+    artifact["elapsed"] = round(time.perf_counter() - start, 6)
+    return {"artifacts": [artifact]}
+  run.__name__ = node.__name__
+  return run
+
+
+def requested_nodes(docs: List[str]) -> List[str]:
+  """Map requested document types to the nodes that render them"""
+  wanted = {DOC_NODES[doc] for doc in docs if doc in DOC_NODES}
+  return [name for name in NODE_FUNCTIONS if name in wanted]
+
+
+def _dispatch(state: Idea) -> Dict[str, Any]:
+  """Fan-out entry point; routing happens on its outgoing edges"""
+  return {}
+
+
+def _collect(state: Idea) -> Dict[str, Any]:
+  """Join point for the parallel branches"""
+  return {}
+
+
+def _route_requested(state: Idea) -> List[str]:
+  return requested_nodes(getattr(state, 'docs', None) or []) or ["collect"]
+
+
+def _route_after(nodes: List[str], current: Optional[str]) -> Callable[[Idea], str]:
+  later = nodes[nodes.index(current) + 1:] if current else nodes
+
+  def route(state: Idea) -> str:
+    wanted = set(requested_nodes(getattr(state, 'docs', None) or []))
+    return next((name for name in later if name in wanted), END)
+  return route
+
+
+def create_docs_graph(parallel: bool = False, docs: Optional[Iterable[str]] = None) -> StateGraph:
+  """Create the document generation graph from the document registry
+
+  With ``parallel`` set, a dispatcher fans out to exactly the requested nodes
+  as concurrent branches that join on a collector node; a node whose
+  documents come ``after`` others waits for those nodes. Otherwise the
+  requested nodes run as a serial chain in registry order. Passing ``docs``
+  to a parallel graph wires only the nodes for those documents, so no
+  routing happens at run time; without it, ordering between nodes is not
+  enforced.
+  """
+
   # Create the graph with Idea as state
   workflow = StateGraph(Idea)
-  
-  # Add nodes
-  workflow.add_node("generate_brd_prd", generate_brd_prd)
-  workflow.add_node("generate_frd", generate_frd)
-  workflow.add_node("generate_srd", generate_srd)
-  workflow.add_node("generate_trd_tdd", generate_trd_tdd)
-  workflow.add_node("generate_erd_api", generate_erd_api)
-  workflow.add_node("generate_ui_wireframes", generate_ui_wireframes)
-  workflow.add_node("generate_project_plan", generate_project_plan)
-  workflow.add_node("generate_test_strategy", generate_test_strategy)
-  workflow.add_node("generate_cicd_env", generate_cicd_env)
-  workflow.add_node("generate_release_runbook", generate_release_runbook)
-  
-  # Define the workflow
-  workflow.set_entry_point("generate_brd_prd")
-  
-  # Add conditional edges based on requested documents
-  workflow.add_conditional_edges(
-    "generate_brd_prd",
-    lambda state: "generate_frd" if "frd" in getattr(state, 'docs', []) else "generate_srd"
-  )
-  
-  workflow.add_conditional_edges(
-    "generate_frd",
-    lambda state: "generate_srd" if "srd" in getattr(state, 'docs', []) else "generate_trd_tdd"
-  )
-  
-  workflow.add_conditional_edges(
-    "generate_srd",
-    lambda state: "generate_trd_tdd" if "trd_tdd" in getattr(state, 'docs', []) else "generate_erd_api"
-  )
-  
-  workflow.add_conditional_edges(
-    "generate_trd_tdd",
-    lambda state: "generate_erd_api" if "erd" in getattr(state, 'docs', []) or "openapi" in getattr(state, 'docs', []) else "generate_ui_wireframes"
-  )
-  
-  workflow.add_conditional_edges(
-    "generate_erd_api",
-    lambda state: "generate_ui_wireframes" if "wireframes" in getattr(state, 'docs', []) else "generate_project_plan"
-  )
-  
-  workflow.add_conditional_edges(
-    "generate_ui_wireframes",
-    lambda state: "generate_project_plan" if "project_plan" in getattr(state, 'docs', []) else "generate_test_strategy"
-  )
-  
-  workflow.add_conditional_edges(
-    "generate_project_plan",
-    lambda state: "generate_test_strategy" if "test_strategy" in getattr(state, 'docs', []) else "generate_cicd_env"
-  )
-  
-  workflow.add_conditional_edges(
-    "generate_test_strategy",
-    lambda state: "generate_cicd_env" if "cicd_env" in getattr(state, 'docs', []) else "generate_release_runbook"
-  )
-  
-  workflow.add_conditional_edges(
-    "generate_cicd_env",
-    lambda state: "generate_release_runbook" if "release_runbook" in getattr(state, 'docs', []) else END
-  )
-  
-  workflow.add_edge("generate_release_runbook", END)
-  
+
+  if parallel:
+    nodes = list(NODE_FUNCTIONS) if docs is None else requested_nodes(list(docs))
+    for name in nodes:
+      workflow.add_node(name, _as_update(NODE_FUNCTIONS[name]))
+    workflow.add_node("dispatch", _dispatch)
+    workflow.add_node("collect", _collect)
+    workflow.set_entry_point("dispatch")
+    if docs is None:
+      workflow.add_conditional_edges("dispatch", _route_requested, nodes + ["collect"])
+    elif not nodes:
+      workflow.add_edge("dispatch", "collect")
+    else:
+      for name in nodes:
+        before = [dep for dep in node_dependencies(name) if dep in nodes]
+        # A list of sources waits for all of them
+        workflow.add_edge(before or "dispatch", name)
+    for name in nodes:
+      workflow.add_edge(name, "collect")
+    workflow.add_edge("collect", END)
+    return workflow
+
+  # Each node routes to the next requested node in registry order
+  nodes = list(NODE_FUNCTIONS)
+  for name in nodes:
+    workflow.add_node(name, _as_update(NODE_FUNCTIONS[name]))
+  workflow.add_conditional_edges(START, _route_after(nodes, None), nodes + [END])
+  for i, name in enumerate(nodes):
+    workflow.add_conditional_edges(name, _route_after(nodes, name), nodes[i + 1:] + [END])
+
   return workflow
 
 
-def run_docs_generation(idea: Idea, docs: List[str], overwrite: bool = False) -> Dict[str, Any]:
-  """Run document generation workflow"""
-  
+def default_max_workers() -> Optional[int]:
+  """Thread pool size for parallel runs, from DOCGEN_MAX_WORKERS"""
+  value = os.getenv("DOCGEN_MAX_WORKERS")
+  return int(value) if value else None
+
+
+def default_fsync() -> bool:
+  """Whether runs fsync their artifacts, from DOCGEN_FSYNC"""
+  return os.getenv("DOCGEN_FSYNC", "false").lower() in ("1", "true", "yes")
+
+
+# Where a run's artifacts go: the configured storage, or back in the result
+SINKS = ("storage", "memory")
+
+
+GraphKey = Tuple[Optional[FrozenSet[str]], bool]
+
+GRAPH_CACHE_SIZE = int(os.getenv("DOCGEN_GRAPH_CACHE_SIZE", "32"))
+
+_compiled_graphs: "OrderedDict[GraphKey, Any]" = OrderedDict()
+_graph_cache_lock = threading.Lock()
+# One lock per graph being compiled, so a slow compile only holds up its own key
+_graph_build_locks: Dict[GraphKey, threading.Lock] = {}
+_graph_cache_counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def normalize_docs(docs: Iterable[str]) -> FrozenSet[str]:
+  """Normalize a document list into a hashable cache key"""
+  return frozenset(canonical_docs(docs))
+
+
+def _graph_key(docs: Iterable[str], parallel: bool) -> GraphKey:
+  # The serial chain routes on state at run time, so one compiled graph
+  # serves every document set
+  return (normalize_docs(docs) if parallel else None, parallel)
+
+
+def _cached_graph(key: GraphKey) -> Optional[Any]:
+  with _graph_cache_lock:
+    app = _compiled_graphs.get(key)
+    if app is not None:
+      _compiled_graphs.move_to_end(key)
+      _graph_cache_counters["hits"] += 1
+    return app
+
+
+def get_compiled_graph(docs: Iterable[str], parallel: bool = False) -> Any:
+  """Get a compiled graph for the document set, compiling it at most once
+
+  Compilation runs outside the cache lock, under a lock for its key only;
+  callers asking for the same graph meanwhile wait for it and reuse it.
+  """
+  key = _graph_key(docs, parallel)
+  app = _cached_graph(key)
+  if app is not None:
+    return app
+  with _graph_cache_lock:
+    build_lock = _graph_build_locks.setdefault(key, threading.Lock())
+  with build_lock:
+    app = _cached_graph(key)
+    if app is not None:
+      return app
+    app = create_docs_graph(parallel=parallel, docs=key[0]).compile()
+    with _graph_cache_lock:
+      _graph_cache_counters["misses"] += 1
+      _compiled_graphs[key] = app
+      while len(_compiled_graphs) > GRAPH_CACHE_SIZE:
+        _compiled_graphs.popitem(last=False)
+        _graph_cache_counters["evictions"] += 1
+      _graph_build_locks.pop(key, None)
+  return app
+
+
+def prebuild_graphs(doc_sets: Iterable[Iterable[str]], parallel: bool = False) -> int:
+  """Compile graphs ahead of time and return how many distinct graphs that is
+
+  Serial runs share one graph whatever their documents, so several serial
+  document sets compile just one; parallel ones get a graph per set.
+  """
+  keys = {_graph_key(docs, parallel): docs for docs in doc_sets}
+  for docs in keys.values():
+    get_compiled_graph(docs, parallel)
+  return len(keys)
+
+
+def graph_cache_stats() -> Dict[str, Any]:
+  """Get compiled graph cache statistics"""
+  with _graph_cache_lock:
+    return {
+      **_graph_cache_counters,
+      "size": len(_compiled_graphs),
+      "maxsize": GRAPH_CACHE_SIZE,
+      "keys": [
+        {"docs": sorted(docs) if docs is not None else None, "parallel": parallel}
+        for docs, parallel in _compiled_graphs
+      ]
+    }
+
+
+def clear_graph_cache() -> None:
+  """Drop all compiled graphs and reset counters"""
+  with _graph_cache_lock:
+    _compiled_graphs.clear()
+    for counter in _graph_cache_counters:
+      _graph_cache_counters[counter] = 0
+
+
+def run_docs_generation(
+  idea: Idea,
+  docs: List[str],
+  overwrite: bool = False,
+  parallel: bool = False,
+  max_workers: Optional[int] = None,
+  incremental: bool = False,
+  fsync: Optional[bool] = None,
+  timings: bool = False,
+  backend: Optional[str] = None,
+  sink: str = "storage"
+) -> Dict[str, Any]:
+  """Run document generation workflow
+
+  Nodes stage their artifacts; they are written together, atomically, once
+  the whole graph has succeeded. The result's ``writes`` entry reports it.
+  With ``timings`` the per-node measurements are included as well; they
+  are always published to the metrics registry.
+
+  ``backend`` is "thread" or "process" (default DOCGEN_RENDER_BACKEND). The
+  process backend renders every requested node concurrently in the shared
+  render pool; Ideas smaller than DOCGEN_PROCESS_MIN_ITEMS stay in-process.
+
+  With ``sink="memory"`` nothing is read from or written to storage: the
+  result's ``documents`` list carries each rendered file's path, text,
+  size and hash, and the paths only name where the files would go.
+  """
+
+  app, config = _prepare_run(idea, docs, overwrite, parallel, max_workers, incremental, fsync, backend, sink)
+
+  # Execute workflow
+  try:
+    result = app.invoke(idea, config=config)
+  except BaseException:
+    _discard(config)
+    raise
+
+  summary = _commit(config, idea, result)
+  if timings:
+    result["timings"] = summary
+  return result
+
+
+def _prepare_run(
+  idea: Idea,
+  docs: List[str],
+  overwrite: bool,
+  parallel: bool,
+  max_workers: Optional[int],
+  incremental: bool,
+  fsync: Optional[bool],
+  backend: Optional[str] = None,
+  sink: str = "storage"
+) -> Tuple[Any, Dict[str, Any]]:
+  if sink not in SINKS:
+    raise ValueError(f"Unknown sink '{sink}'. Available: {', '.join(SINKS)}")
+  if sink == "memory" and incremental:
+    raise ValueError("Incremental builds compare against stored outputs; they cannot use the memory sink")
+  # The graph is wired and the nodes filter from the same names
+  docs = canonical_docs(docs)
+  unknown = unknown_doc_types(docs)
+  if unknown:
+    raise ValueError(f"Unknown document types: {', '.join(unknown)}. Available: {', '.join(doc_types())}")
+
   # Add docs to idea for conditional logic
   idea.docs = docs
   idea.overwrite = overwrite
-  
-  # Create and run graph
-  graph = create_docs_graph()
-  app = graph.compile()
-  
-  # Execute workflow
-  result = app.invoke(idea)
-  
-  return result
+  idea.incremental = incremental
+  idea.artifacts = []
+
+  backend = resolve_backend(idea, backend, sink)
+  if backend == "process":
+    # Worker processes only pay off when the nodes run side by side
+    parallel = True
+
+  # Reuse the compiled graph for this document set
+  app = get_compiled_graph(docs, parallel)
+
+  # max_concurrency sizes the thread pool used for parallel branches
+  # An empty private store makes the memory sink stage every file as new
+  storage = MemoryStorage(idea.output_dir) if sink == "memory" else None
+  writer = ArtifactWriter(fsync=default_fsync() if fsync is None else fsync, storage=storage)
+  config: Dict[str, Any] = {
+    "configurable": {"writer": writer, "metrics": RunMetrics(docs, parallel, backend), "sink": sink}
+  }
+  if backend == "process":
+    config["configurable"]["renderer"] = ProcessRenderer(idea, writer.fsync, sink)
+  workers = max_workers or default_max_workers()
+  if workers:
+    config["max_concurrency"] = workers
+  return app, config
+
+
+def _discard(config: Dict[str, Any]) -> None:
+  """Drop a failed run's staged artifacts, including files rendered in workers"""
+  renderer = config["configurable"].get("renderer")
+  if renderer is not None:
+    renderer.discard()
+  config["configurable"]["writer"].discard()
+
+
+def _commit(config: Dict[str, Any], idea: Idea, result: Dict[str, Any]) -> Dict[str, Any]:
+  """Write the run's staged artifacts, catalog them and publish the run's metrics
+
+  The memory sink collects the artifacts into ``result["documents"]`` instead.
+  """
+  configurable = config["configurable"]
+  if configurable["sink"] == "memory":
+    report = configurable["writer"].collect()
+    result["documents"] = [
+      {"path": entry["path"], "content": entry.pop("content"), "size": entry["size"], "hash": entry["hash"]}
+      for entry in report["files"]
+    ]
+  else:
+    report = configurable["writer"].commit()
+    record_writes(report["files"], compute_idea_hash(idea))
+  result["writes"] = report
+  summary = configurable["metrics"].finish(report)
+  get_metrics_registry().publish(summary)
+  return summary
+
 
+def commit_documents(
+  idea: Idea,
+  documents: List[Dict[str, Any]],
+  overwrite: bool = False,
+  fsync: Optional[bool] = None
+) -> Dict[str, Any]:
+  """Write a memory sink run's documents, edited or not, as a run would
 
-def generate_all_documents(idea: Idea, overwrite: bool = False) -> Dict[str, Any]:
+  They are staged under the ``.new`` collision rule, written together
+  through the configured storage and cataloged; the commit report is returned.
+  """
+  writer = ArtifactWriter(fsync=default_fsync() if fsync is None else fsync)
+  for document in documents:
+    writer.stage(Path(document["path"]), document["content"], overwrite)
+  report = writer.commit()
+  record_writes(report["files"], compute_idea_hash(idea))
+  return report
+
+
+def stream_docs_generation(
+  idea: Idea,
+  docs: List[str],
+  overwrite: bool = False,
+  parallel: bool = False,
+  max_workers: Optional[int] = None,
+  incremental: bool = False,
+  fsync: Optional[bool] = None,
+  timings: bool = False,
+  backend: Optional[str] = None,
+  sink: str = "storage"
+) -> Iterator[Dict[str, Any]]:
+  """Run document generation, yielding an event as each node finishes
+
+  ``node_finished`` events carry the node name, artifact paths, bytes
+  written, the node's own duration and the elapsed run time. A final
+  ``completed`` event carries the same result run_docs_generation returns.
+  """
+  app, config = _prepare_run(idea, docs, overwrite, parallel, max_workers, incremental, fsync, backend, sink)
+  start = time.perf_counter()
+  result: Dict[str, Any] = {}
+
+  try:
+    for mode, chunk in app.stream(idea, config=config, stream_mode=["updates", "values"]):
+      if mode == "values":
+        result = chunk
+        continue
+      for node, update in chunk.items():
+        for artifact in (update or {}).get("artifacts", []):
+          documents = artifact.get("artifacts", [artifact])
+          yield {
+            "event": "node_finished",
+            "node": node,
+            "name": artifact["name"],
+            "paths": [doc["path"] for doc in documents],
+            "bytes": sum(doc.get("bytes", 0) for doc in documents),
+            "duration": artifact.get("elapsed"),
+            "elapsed": round(time.perf_counter() - start, 6)
+          }
+  except BaseException:
+    _discard(config)
+    raise
+
+  summary = _commit(config, idea, result)
+  if timings:
+    result["timings"] = summary
+  yield {"event": "completed", "elapsed": round(time.perf_counter() - start, 6), "result": result}
+
+
+ALL_DOCS = doc_types()
+
+
+def generate_all_documents(
+  idea: Idea,
+  overwrite: bool = False,
+  parallel: bool = False,
+  max_workers: Optional[int] = None,
+  incremental: bool = False,
+  fsync: Optional[bool] = None,
+  timings: bool = False,
+  backend: Optional[str] = None,
+  sink: str = "storage"
+) -> Dict[str, Any]:
   """Generate all document types"""
-  
-  all_docs = [
-    "brd_prd", "frd", "srd", "trd_tdd", "erd", "openapi",
-    "wireframes", "project_plan", "test_strategy", "cicd_env", "release_runbook"
-  ]
-  
-  return run_docs_generation(idea, all_docs, overwrite)
+
+  return run_docs_generation(
+    idea, ALL_DOCS, overwrite, parallel, max_workers, incremental, fsync, timings, backend, sink
+  )
@@ -0,0 +1,122 @@
+"""Idea ingestion: parsing, validation and a cache of validated Ideas"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Tuple, Union
+from .state import Idea
+
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+
+IdeaPayload = Union[str, bytes, Dict[str, Any], Idea]
+
+_cache: "OrderedDict[str, Idea]" = OrderedDict()
+_cache_lock = threading.Lock()
+_counters = {"hits": 0, "misses": 0, "evictions": 0, "parse": 0.0, "validate": 0.0}
+
+
+def default_cache_size() -> int:
+  """Validated Ideas kept by payload hash, from DOCGEN_IDEA_CACHE_SIZE (0 disables)"""
+  return int(os.getenv("DOCGEN_IDEA_CACHE_SIZE", "64"))
+
+
+def parse_json(payload: Union[str, bytes]) -> Any:
+  """Decode JSON, with orjson when it is installed"""
+  if orjson is not None:
+    return orjson.loads(payload)
+  return json.loads(payload)
+
+
+def _as_bytes(payload: Union[str, bytes]) -> bytes:
+  return payload.encode("utf-8") if isinstance(payload, str) else payload
+
+
+def ingest_idea(payload: IdeaPayload, cache: bool = True) -> Tuple[Idea, Dict[str, Any]]:
+  """Validate an Idea payload and report how long each step took
+
+  JSON text is parsed first and the resulting data validated, so the two
+  timings are separate. Validated Ideas are cached by the SHA256 of the raw
+  payload; a repeated payload skips both steps. Every caller gets its own
+  shallow copy, since runs set docs, output_dir and artifacts on the Idea
+  they are given.
+  """
+  if isinstance(payload, Idea):
+    return payload, {"parse": 0.0, "validate": 0.0, "cached": False}
+  if isinstance(payload, dict):
+    start = time.perf_counter()
+    idea = Idea.model_validate(payload)
+    return idea, {"parse": 0.0, "validate": round(time.perf_counter() - start, 6), "cached": False}
+
+  raw = _as_bytes(payload)
+  size = default_cache_size() if cache else 0
+  key = hashlib.sha256(raw).hexdigest() if size else ""
+  if size:
+    with _cache_lock:
+      idea = _cache.get(key)
+      if idea is not None:
+        _cache.move_to_end(key)
+        _counters["hits"] += 1
+        return idea.model_copy(), {"parse": 0.0, "validate": 0.0, "cached": True, "bytes": len(raw)}
+
+  start = time.perf_counter()
+  data = parse_json(raw)
+  parsed = time.perf_counter()
+  idea = Idea.model_validate(data)
+  timings = {
+    "parse": round(parsed - start, 6),
+    "validate": round(time.perf_counter() - parsed, 6),
+    "cached": False,
+    "bytes": len(raw)
+  }
+
+  with _cache_lock:
+    _counters["parse"] += timings["parse"]
+    _counters["validate"] += timings["validate"]
+    if size:
+      _counters["misses"] += 1
+      _cache[key] = idea
+      while len(_cache) > size:
+        _cache.popitem(last=False)
+        _counters["evictions"] += 1
+  return (idea.model_copy() if size else idea), timings
+
+
+def load_idea(payload: IdeaPayload, cache: bool = True) -> Idea:
+  """Validate an Idea payload, reusing the cached Idea for a repeated payload"""
+  return ingest_idea(payload, cache)[0]
+
+
+def load_idea_file(path: Union[str, Path]) -> Tuple[Idea, Dict[str, Any]]:
+  """Read and validate an Idea JSON file"""
+  return ingest_idea(Path(path).read_bytes(), cache=False)
+
+
+def idea_cache_stats() -> Dict[str, Any]:
+  """Idea cache counters and the total parse and validation time spent"""
+  with _cache_lock:
+    return {
+      "hits": _counters["hits"],
+      "misses": _counters["misses"],
+      "evictions": _counters["evictions"],
+      "size": len(_cache),
+      "maxsize": default_cache_size(),
+      "parse_seconds": round(_counters["parse"], 6),
+      "validate_seconds": round(_counters["validate"], 6),
+      "orjson": orjson is not None
+    }
+
+
+def clear_idea_cache() -> None:
+  """Drop cached Ideas and reset counters"""
+  with _cache_lock:
+    _cache.clear()
+    for counter in _counters:
+      _counters[counter] = 0 if counter in ("hits", "misses", "evictions") else 0.0
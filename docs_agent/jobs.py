@@ -0,0 +1,148 @@
+"""Bounded background job queue for DocGen Suite"""
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class QueueFullError(RuntimeError):
+  """Raised when the job queue cannot accept more work"""
+
+
+class Job:
+  """A unit of work submitted to the job queue"""
+
+  def __init__(self, kind: str):
+    self.id = uuid.uuid4().hex
+    self.kind = kind
+    self.future: Future = Future()
+    self.submitted_at = time.time()
+    self.started_at: Optional[float] = None
+    self.finished_at: Optional[float] = None
+
+  @property
+  def status(self) -> str:
+    if self.future.cancelled():
+      return "cancelled"
+    if self.future.done():
+      return "failed" if self.future.exception() is not None else "succeeded"
+    return "running" if self.started_at is not None else "queued"
+
+  def describe(self) -> Dict[str, Any]:
+    return {
+      "job_id": self.id,
+      "kind": self.kind,
+      "status": self.status,
+      "submitted_at": self.submitted_at,
+      "started_at": self.started_at,
+      "finished_at": self.finished_at
+    }
+
+
+class JobQueue:
+  """Thread pool with a hard cap on in-flight work
+
+  At most ``max_workers`` jobs run at once and at most ``max_pending`` more
+  wait for a worker. Submissions beyond that raise QueueFullError instead of
+  piling up, so callers get immediate backpressure.
+  """
+
+  def __init__(self, max_workers: int = 4, max_pending: int = 16, max_finished: int = 1000):
+    self.max_workers = max_workers
+    self.max_pending = max_pending
+    self.max_finished = max_finished
+    self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="docgen-job")
+    self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+    self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+    self._lock = threading.Lock()
+    self.rejected = 0
+
+  def _acquire_slot(self) -> None:
+    if not self._slots.acquire(blocking=False):
+      with self._lock:
+        self.rejected += 1
+      raise QueueFullError(
+        f"Job queue is saturated ({self.max_workers} running, {self.max_pending} pending); retry later"
+      )
+
+  def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+    job.started_at = time.time()
+    try:
+      return fn(*args, **kwargs)
+    finally:
+      job.finished_at = time.time()
+
+  def submit(self, kind: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Job:
+    """Queue a call and return its job immediately"""
+    self._acquire_slot()
+    job = Job(kind)
+    try:
+      inner = self._executor.submit(self._run, job, fn, args, kwargs)
+    except BaseException:
+      self._slots.release()
+      raise
+    job.future = inner
+    inner.add_done_callback(lambda _: self._slots.release())
+    with self._lock:
+      self._jobs[job.id] = job
+      self._prune()
+    return job
+
+  async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a call on the pool without blocking the event loop"""
+    self._acquire_slot()
+    try:
+      future = self._executor.submit(fn, *args, **kwargs)
+    except BaseException:
+      self._slots.release()
+      raise
+    future.add_done_callback(lambda _: self._slots.release())
+    return await asyncio.wrap_future(future)
+
+  def _prune(self) -> None:
+    finished = [job_id for job_id, job in self._jobs.items() if job.future.done()]
+    for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+      del self._jobs[job_id]
+
+  def get(self, job_id: str) -> Optional[Job]:
+    with self._lock:
+      return self._jobs.get(job_id)
+
+  def cancel(self, job_id: str) -> bool:
+    """Cancel a job that has not started yet"""
+    job = self.get(job_id)
+    return job is not None and job.future.cancel()
+
+  def stats(self) -> Dict[str, Any]:
+    with self._lock:
+      counts: Dict[str, int] = {}
+      for job in self._jobs.values():
+        counts[job.status] = counts.get(job.status, 0) + 1
+      return {
+        "max_workers": self.max_workers,
+        "max_pending": self.max_pending,
+        "rejected": self.rejected,
+        "jobs": counts
+      }
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+  """Get the shared job queue sized from DOCGEN_JOB_WORKERS / DOCGEN_JOB_QUEUE_SIZE"""
+  global _queue
+  if _queue is None:
+    with _queue_lock:
+      if _queue is None:
+        _queue = JobQueue(
+          max_workers=int(os.getenv("DOCGEN_JOB_WORKERS", "4")),
+          max_pending=int(os.getenv("DOCGEN_JOB_QUEUE_SIZE", "16"))
+        )
+  return _queue
@@ -0,0 +1,324 @@
+"""Per-node timing and resource instrumentation for the docs graph"""
+
+import abc
+import contextlib
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+try:
+  import resource
+except ImportError:  # Windows
+  resource = None
+
+try:
+  from opentelemetry import metrics as otel_metrics
+except ImportError:
+  otel_metrics = None
+
+
+logger = logging.getLogger(__name__)
+
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def peak_rss() -> int:
+  """Peak resident set size of this process in bytes, or 0 where unavailable"""
+  if resource is None:
+    return 0
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+
+_current_sample: ContextVar[Optional[Dict[str, Any]]] = ContextVar("docgen_node_sample", default=None)
+
+
+@contextlib.contextmanager
+def timed(phase: str) -> Iterator[None]:
+  """Add the time spent in the block to the running node's ``<phase>`` timing"""
+  sample = _current_sample.get()
+  if sample is None:
+    yield
+    return
+  start = time.perf_counter()
+  try:
+    yield
+  finally:
+    sample[phase] = sample.get(phase, 0.0) + time.perf_counter() - start
+
+
+def artifact_bytes(artifact: Dict[str, Any]) -> int:
+  """Bytes written for a node's artifact, including nested artifacts"""
+  return sum(doc.get("bytes", 0) for doc in artifact.get("artifacts", [artifact]))
+
+
+class RunMetrics:
+  """Measurements collected while one graph run executes
+
+  Node wall and CPU time are per node thread. Peak RSS is process-wide, so
+  with parallel branches an increase is attributed to whichever node
+  raised the peak. With the process backend, a node's CPU, RSS, render and
+  write figures come from the worker that rendered it; run CPU and RSS
+  cover only this process.
+  """
+
+  def __init__(self, docs: List[str], parallel: bool, backend: str = "thread"):
+    self.docs = list(docs)
+    self.parallel = parallel
+    self.backend = backend
+    self.nodes: List[Dict[str, Any]] = []
+    self._lock = threading.Lock()
+    self._start = time.perf_counter()
+    self._cpu_start = time.process_time()
+    self._rss_start = peak_rss()
+
+  @contextlib.contextmanager
+  def node(self, name: str) -> Iterator[Dict[str, Any]]:
+    """Measure one node; render/write time is added by ``timed`` inside it"""
+    sample: Dict[str, Any] = {"node": name, "render": 0.0, "write": 0.0, "bytes": 0}
+    token = _current_sample.set(sample)
+    rss_before = peak_rss()
+    cpu_start = time.thread_time()
+    start = time.perf_counter()
+    try:
+      yield sample
+    finally:
+      sample["wall"] = time.perf_counter() - start
+      # A node rendered in a worker process already holds the worker's figures
+      sample["cpu"] = sample.get("cpu", 0.0) + time.thread_time() - cpu_start
+      sample["rss_delta"] = max(sample.get("rss_delta", 0), peak_rss() - rss_before)
+      _current_sample.reset(token)
+      with self._lock:
+        self.nodes.append(sample)
+
+  def finish(self, writes: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Summarize the run once its artifacts are committed"""
+    writes = writes or {}
+    with self._lock:
+      nodes = [{key: round(value, 6) if isinstance(value, float) else value for key, value in n.items()} for n in self.nodes]
+    return {
+      "docs": self.docs,
+      "parallel": self.parallel,
+      "backend": self.backend,
+      "wall": round(time.perf_counter() - self._start, 6),
+      "cpu": round(time.process_time() - self._cpu_start, 6),
+      "rss_delta": max(0, peak_rss() - self._rss_start),
+      "bytes": sum(n["bytes"] for n in nodes),
+      "commit": writes.get("elapsed", 0.0),
+      "nodes": nodes
+    }
+
+
+class MetricsExporter(abc.ABC):
+  """Receives every finished run summary; subclasses implement export"""
+
+  @abc.abstractmethod
+  def export(self, run: Dict[str, Any]) -> None:
+    """Handle one run summary"""
+
+
+class LogExporter(MetricsExporter):
+  """One log line per node and per run"""
+
+  def __init__(self, log: Optional[logging.Logger] = None, level: int = logging.INFO):
+    self.log = log or logger
+    self.level = level
+
+  def export(self, run: Dict[str, Any]) -> None:
+    for n in run["nodes"]:
+      self.log.log(
+        self.level,
+        "docgen node=%s wall=%.6f cpu=%.6f render=%.6f write=%.6f bytes=%d rss_delta=%d",
+        n["node"], n["wall"], n["cpu"], n["render"], n["write"], n["bytes"], n["rss_delta"]
+      )
+    self.log.log(
+      self.level,
+      "docgen run nodes=%d wall=%.6f cpu=%.6f commit=%.6f bytes=%d",
+      len(run["nodes"]), run["wall"], run["cpu"], run["commit"], run["bytes"]
+    )
+
+
+class PrometheusTextfileExporter(MetricsExporter):
+  """Rewrites a node_exporter textfile with the rolling aggregates after each run"""
+
+  def __init__(self, path: Path, registry: Optional["MetricsRegistry"] = None):
+    self.path = Path(path)
+    self.registry = registry
+
+  def export(self, run: Dict[str, Any]) -> None:
+    from .utils.writer import atomic_write
+
+    stats = (self.registry or get_metrics_registry()).stats()
+    nodes = sorted(stats["nodes"].items())
+    lines = [
+      "# HELP docgen_runs_total Document generation runs since process start",
+      "# TYPE docgen_runs_total counter",
+      f"docgen_runs_total {stats['runs_total']}"
+    ]
+    for metric, key, help_text in (
+      ("docgen_node_wall_seconds", "wall", "Node wall time over the rolling window"),
+      ("docgen_node_cpu_seconds", "cpu", "Node CPU time over the rolling window")
+    ):
+      lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} summary"]
+      for name, node in nodes:
+        lines += [
+          f'{metric}{{node="{name}",quantile="0.5"}} {node[key]["p50"]}',
+          f'{metric}{{node="{name}",quantile="0.95"}} {node[key]["p95"]}',
+          f'{metric}_sum{{node="{name}"}} {node[key]["sum"]}',
+          f'{metric}_count{{node="{name}"}} {node["count"]}'
+        ]
+    lines += [
+      "# HELP docgen_node_bytes_total Bytes written by each node since process start",
+      "# TYPE docgen_node_bytes_total counter"
+    ]
+    lines += [f'docgen_node_bytes_total{{node="{name}"}} {node["bytes_total"]}' for name, node in nodes]
+    atomic_write(self.path, ("\n".join(lines) + "\n").encode("utf-8"))
+
+
+class OpenTelemetryExporter(MetricsExporter):
+  """Records node measurements as OpenTelemetry histograms and counters"""
+
+  def __init__(self, meter_name: str = "docgen"):
+    if otel_metrics is None:
+      raise RuntimeError("opentelemetry-api is not installed")
+    meter = otel_metrics.get_meter(meter_name)
+    self._wall = meter.create_histogram("docgen.node.duration", unit="s", description="Node wall time")
+    self._cpu = meter.create_histogram("docgen.node.cpu_time", unit="s", description="Node CPU time")
+    self._render = meter.create_histogram("docgen.node.render_time", unit="s", description="Template render time")
+    self._bytes = meter.create_counter("docgen.node.bytes", unit="By", description="Bytes written")
+    self._runs = meter.create_histogram("docgen.run.duration", unit="s", description="Run wall time")
+
+  def export(self, run: Dict[str, Any]) -> None:
+    for n in run["nodes"]:
+      attributes = {"node": n["node"]}
+      self._wall.record(n["wall"], attributes)
+      self._cpu.record(n["cpu"], attributes)
+      self._render.record(n["render"], attributes)
+      self._bytes.add(n["bytes"], attributes)
+    self._runs.record(run["wall"], {"parallel": run["parallel"]})
+
+
+def _aggregate(values: List[float]) -> Dict[str, float]:
+  ordered = sorted(values)
+  return {
+    "mean": round(statistics.fmean(ordered), 6),
+    "p50": round(statistics.median(ordered), 6),
+    "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 6),
+    "max": round(ordered[-1], 6),
+    "sum": round(sum(ordered), 6)
+  }
+
+
+class MetricsRegistry:
+  """Rolling window of recent runs plus the exporters they are sent to"""
+
+  def __init__(self, window: int = 500):
+    self.window = window
+    self._runs: Deque[Dict[str, Any]] = deque(maxlen=window)
+    self._exporters: List[MetricsExporter] = []
+    self._bytes_total: Dict[str, int] = {}
+    self._runs_total = 0
+    self._lock = threading.Lock()
+
+  def add_exporter(self, exporter: MetricsExporter) -> None:
+    with self._lock:
+      self._exporters.append(exporter)
+
+  def remove_exporter(self, exporter: MetricsExporter) -> None:
+    with self._lock:
+      self._exporters.remove(exporter)
+
+  def publish(self, run: Dict[str, Any]) -> None:
+    """Record a finished run and hand it to every exporter"""
+    with self._lock:
+      self._runs.append(run)
+      self._runs_total += 1
+      for n in run["nodes"]:
+        self._bytes_total[n["node"]] = self._bytes_total.get(n["node"], 0) + n["bytes"]
+      exporters = list(self._exporters)
+    for exporter in exporters:
+      try:
+        exporter.export(run)
+      except Exception as e:
+        logger.warning("Metrics exporter %s failed: %s", type(exporter).__name__, e)
+
+  def stats(self) -> Dict[str, Any]:
+    """Per-node and per-run aggregates over the rolling window"""
+    with self._lock:
+      runs = list(self._runs)
+      bytes_total = dict(self._bytes_total)
+      runs_total = self._runs_total
+
+    samples: Dict[str, List[Dict[str, Any]]] = {}
+    for run in runs:
+      for n in run["nodes"]:
+        samples.setdefault(n["node"], []).append(n)
+    nodes = {
+      name: {
+        "count": len(items),
+        "wall": _aggregate([n["wall"] for n in items]),
+        "cpu": _aggregate([n["cpu"] for n in items]),
+        "render": _aggregate([n["render"] for n in items]),
+        "write": _aggregate([n["write"] for n in items]),
+        "rss_delta_max": max(n["rss_delta"] for n in items),
+        "bytes_total": bytes_total.get(name, 0)
+      }
+      for name, items in samples.items()
+    }
+    return {
+      "window": self.window,
+      "runs_total": runs_total,
+      "runs": _aggregate([run["wall"] for run in runs]) if runs else {},
+      "commit": _aggregate([run["commit"] for run in runs]) if runs else {},
+      "nodes": nodes
+    }
+
+  def reset(self) -> None:
+    with self._lock:
+      self._runs.clear()
+      self._bytes_total.clear()
+      self._runs_total = 0
+
+
+def exporters_from_env(registry: MetricsRegistry) -> List[MetricsExporter]:
+  """Exporters named in DOCGEN_METRICS_EXPORTERS (log, prometheus, otel)"""
+  exporters: List[MetricsExporter] = []
+  names = [name.strip() for name in os.getenv("DOCGEN_METRICS_EXPORTERS", "").split(",") if name.strip()]
+  for name in names:
+    if name == "log":
+      exporters.append(LogExporter())
+    elif name == "prometheus":
+      path = os.getenv("DOCGEN_METRICS_TEXTFILE", "docgen.prom")
+      exporters.append(PrometheusTextfileExporter(Path(path), registry))
+    elif name == "otel":
+      try:
+        exporters.append(OpenTelemetryExporter())
+      except RuntimeError as e:
+        logger.warning("Skipping OpenTelemetry exporter: %s", e)
+    else:
+      logger.warning("Unknown metrics exporter '%s'", name)
+  return exporters
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+  """Shared registry sized by DOCGEN_METRICS_WINDOW, with exporters from the environment"""
+  global _registry
+  if _registry is None:
+    with _registry_lock:
+      if _registry is None:
+        registry = MetricsRegistry(window=int(os.getenv("DOCGEN_METRICS_WINDOW", "500")))
+        for exporter in exporters_from_env(registry):
+          registry.add_exporter(exporter)
+        _registry = registry
+  return _registry
@@ -0,0 +1,131 @@
+"""Shared rendering step for document generation nodes"""
+
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+from ..state import Idea
+from ..registry import NODE_LABELS, get_doc_spec, node_documents
+from ..metrics import timed
+from ..utils.render import render_template
+from ..utils.safety import safe_write, content_hash
+from ..utils.writer import current_writer
+from ..utils.incremental import (
+  compute_idea_hash,
+  document_inputs,
+  manifest_entry,
+  rebuild_reason,
+  record_manifest_entry
+)
+
+
+def render_artifact(
+  state: Idea,
+  name: str,
+  template: str,
+  filename: str,
+  artifact_type: str,
+  context: Optional[Callable[[], Dict[str, Any]]] = None,
+  depends_on: Optional[List[str]] = None,
+  render: Optional[Callable[[], Optional[Dict[str, str]]]] = None,
+  code: Optional[List[str]] = None
+) -> Dict[str, Any]:
+  """Render a template into the output directory and describe the artifact
+
+  In incremental mode the document is skipped, without rendering or writing,
+  when its inputs hash matches the manifest and the recorded file is intact.
+  The artifact then carries the reason it was rebuilt or skipped.
+
+  ``context`` builds extra template variables and is only called when the
+  document is actually rendered; ``depends_on`` names the Idea fields it
+  reads so incremental builds notice their changes, and ``code`` names the
+  modules whose source counts as an input. ``render`` replaces the template
+  with code that returns the document keyed by ``filename``, plus any
+  companion files to write next to it, or None to use the template after
+  all. Incremental builds record and verify those companions too.
+  """
+  dest_dir = state.output_dir
+
+  def describe(path: Path, **extra: Any) -> Dict[str, Any]:
+    return {"name": name, "path": str(path), "type": artifact_type, "template": template, **extra}
+
+  inputs = None
+  if state.incremental:
+    inputs = document_inputs(template, state, depends_on, code)
+    entry = manifest_entry(dest_dir, filename)
+    reason, changed = rebuild_reason(entry, inputs)
+    if reason == "up_to_date":
+      parts = {"parts": [part["path"] for part in entry["parts"]]} if entry.get("parts") else {}
+      return describe(Path(entry["path"]), bytes=0, skipped=True, reason=reason, **parts)
+
+  with timed("render"):
+    files = render() if render is not None else None
+    if files is None:
+      files = {filename: render_template(template, {"idea": state, **(context() if context else {})})}
+  content = files[filename]
+  # Inside a graph run the writer commits all artifacts together at the end
+  writer = current_writer()
+  paths = {}
+  with timed("write"):
+    for file_name, text in files.items():
+      if writer is not None:
+        paths[file_name] = writer.stage(dest_dir / file_name, text, state.overwrite or False)
+      else:
+        paths[file_name] = safe_write(dest_dir / file_name, text, state.overwrite or False)
+  final_path = paths.pop(filename)
+  written = sum(len(text.encode("utf-8")) for text in files.values())
+  extra = {"parts": [str(path) for path in paths.values()]} if paths else {}
+
+  if inputs is None:
+    return describe(final_path, bytes=written, **extra)
+
+  record = {
+    "template": template,
+    **inputs,
+    "content_hash": content_hash(content),
+    "path": str(final_path),
+    "parts": [{"path": str(path), "content_hash": content_hash(files[name])} for name, path in paths.items()]
+  }
+  # A run's writer records it once the file is written
+  if writer is not None:
+    writer.stage_manifest_entry(dest_dir, filename, record, compute_idea_hash(state))
+  else:
+    record_manifest_entry(dest_dir, filename, record, compute_idea_hash(state))
+  return describe(final_path, bytes=written, skipped=False, reason=reason, changed_fields=changed, **extra)
+
+
+def render_document(state: Idea, doc_type: str) -> Dict[str, Any]:
+  """Render one registered document type"""
+  spec = get_doc_spec(doc_type)
+  return render_artifact(
+    state, spec.name, spec.template, spec.filename, spec.artifact_type,
+    context=(lambda: spec.context(state)) if spec.context else None,
+    depends_on=list(spec.depends_on),
+    render=(lambda: spec.render(state)) if spec.render else None,
+    code=list(spec.code)
+  )
+
+
+def render_node(state: Idea, node: str) -> Dict[str, Any]:
+  """Render the documents of a registered node
+
+  Only the requested documents are rendered when ``state.docs`` is set. A
+  node with several documents returns them as one ``multiple`` artifact.
+  """
+  docs = node_documents()[node]
+  requested = [doc for doc in docs if doc in state.docs] if state.docs else docs
+  if len(docs) == 1:
+    return render_document(state, docs[0])
+  return {
+    "name": NODE_LABELS.get(node, node),
+    "artifacts": [render_document(state, doc) for doc in requested or docs],
+    "type": "multiple",
+    "templates": [get_doc_spec(doc).template for doc in requested or docs]
+  }
+
+
+def node_function(node: str) -> Callable[[Idea], Dict[str, Any]]:
+  """A graph node function that renders a registered node's documents"""
+  def run(state: Idea) -> Dict[str, Any]:
+    return render_node(state, node)
+  run.__name__ = node
+  run.__doc__ = f"Generate {', '.join(get_doc_spec(doc).name for doc in node_documents()[node])}"
+  return run
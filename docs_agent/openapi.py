@@ -0,0 +1,475 @@
+"""OpenAPI specification builder behind the openapi.yaml document"""
+
+import functools
+import json
+import math
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from .state import Idea
+
+
+
+OPENAPI_VERSION = "3.0.3"
+SPEC_FILENAME = "openapi.yaml"
+PATHS_FILENAME = "openapi.paths-{n}.yaml"
+
+
+class OpenAPIValidationError(ValueError):
+  """Raised when a built specification fails the structural checks"""
+
+  def __init__(self, errors: List[str]):
+    self.errors = errors
+    shown = "; ".join(errors[:5])
+    more = f" (and {len(errors) - 5} more)" if len(errors) > 5 else ""
+    super().__init__(f"Invalid OpenAPI specification: {shown}{more}")
+
+
+def builder_enabled() -> bool:
+  """Whether openapi.yaml is built in code, from DOCGEN_OPENAPI_BUILDER; off renders the template"""
+  return os.getenv("DOCGEN_OPENAPI_BUILDER", "true").lower() not in ("0", "false", "no")
+
+
+def default_max_paths() -> int:
+  """Paths kept in openapi.yaml before they move to separate files, from DOCGEN_OPENAPI_MAX_PATHS (0 never splits)"""
+  return int(os.getenv("DOCGEN_OPENAPI_MAX_PATHS", "500"))
+
+
+def _string(description: str, **extra: Any) -> Dict[str, Any]:
+  return {"type": "string", **extra, "description": description}
+
+
+def _decimal(description: str) -> Dict[str, Any]:
+  return {"type": "number", "format": "decimal", "description": description}
+
+
+_AUDIT_PROPERTIES = {
+  "id": _string("Unique identifier", format="uuid"),
+  "created_at": _string("Creation timestamp", format="date-time"),
+  "updated_at": _string("Last update timestamp", format="date-time")
+}
+_CURRENCY = _string("Currency code (ISO 4217)", pattern="^[A-Z]{3}$")
+
+# Resource kinds by entity or API name: (kind, properties, request fields, required request fields)
+_KINDS = {
+  "account": (("user", "customer", "account"), {
+    "email": _string("Email address", format="email"),
+    "name": _string("Full name"),
+    "status": _string("Account status", enum=["active", "inactive", "suspended"])
+  }, ["email", "name"], ["email", "name"]),
+  "transaction": (("order", "transaction", "payment"), {
+    "amount": _decimal("Transaction amount"),
+    "currency": _CURRENCY,
+    "status": _string("Transaction status", enum=["pending", "completed", "failed", "cancelled"])
+  }, ["amount", "currency"], ["amount", "currency"]),
+  "product": (("product", "item", "service"), {
+    "name": _string("Product name"),
+    "description": _string("Product description"),
+    "price": _decimal("Product price")
+  }, ["name", "description", "price"], ["name", "price"]),
+  "resource": ((), {
+    "name": _string("Entity name"),
+    "description": _string("Entity description")
+  }, ["name", "description"], ["name"])
+}
+_KIND_BY_NAME = {name: kind for kind, (names, _, _, _) in _KINDS.items() for name in names}
+
+_API_SUFFIXES = ("api", "apis", "service", "endpoint", "endpoints")
+
+_ERROR_RESPONSES = {
+  "BadRequest": ("Bad request", "Validation failed"),
+  "Unauthorized": ("Unauthorized", "Authentication required"),
+  "NotFound": ("Not found", "Resource not found")
+}
+
+
+def _kind(name: str) -> str:
+  return _KIND_BY_NAME.get(name.lower(), "resource")
+
+
+def component_name(name: str) -> str:
+  """Name as an OpenAPI component key"""
+  return re.sub(r"[^A-Za-z0-9._-]+", "", name.replace(" ", "")) or "Unnamed"
+
+
+def _unique(name: str, taken: Dict[str, Any]) -> str:
+  candidate, n = name, 2
+  while candidate in taken:
+    candidate, n = f"{name}{n}", n + 1
+  return candidate
+
+
+def _slug(api: str) -> str:
+  return re.sub(r"[^a-z0-9]+", "-", api.lower()).strip("-") or "resource"
+
+
+def _resource_name(api: str) -> str:
+  """An API name without a trailing 'API'/'service' word, to match it with an entity"""
+  words = api.split()
+  if len(words) > 1 and words[-1].lower() in _API_SUFFIXES:
+    words = words[:-1]
+  return " ".join(words)
+
+
+def _ref(base: str, section: str, name: str) -> Dict[str, str]:
+  return {"$ref": f"{base}#/components/{section}/{name}"}
+
+
+class _Components:
+  """Component schemas, each added once and referenced by ``$ref`` everywhere else"""
+
+  def __init__(self, idea: Idea):
+    self.schemas: Dict[str, Any] = {}
+    self._by_kind: Dict[str, Dict[str, Any]] = {}
+    self._entities: Dict[str, str] = {}
+    self._shared: Dict[Tuple[str, str], str] = {}
+    for entity in idea.entities:
+      key = entity.lower()
+      if key in self._entities:
+        continue
+      name = _unique(component_name(entity), self.schemas)
+      self.schemas[name] = self._resource_schema(_kind(entity))
+      self._entities[key] = name
+
+  def _resource_schema(self, kind: str) -> Dict[str, Any]:
+    # Entities of one kind share a schema object, which dump_yaml emits once
+    if kind not in self._by_kind:
+      self._by_kind[kind] = {
+        "type": "object",
+        "properties": {**_AUDIT_PROPERTIES, **_KINDS[kind][1]},
+        "required": list(_AUDIT_PROPERTIES),
+        "additionalProperties": False
+      }
+    return self._by_kind[kind]
+
+  def _shared_schema(self, role: str, key: str, name: str, build) -> str:
+    if (role, key) not in self._shared:
+      self._shared[role, key] = _unique(name, self.schemas)
+      self.schemas[self._shared[role, key]] = build()
+    return self._shared[role, key]
+
+  def resource(self, api: str) -> Tuple[str, str]:
+    """Schema name of the resource an API serves, and its kind"""
+    resource = _resource_name(api)
+    key = resource.lower()
+    for candidate in (key, key[:-1] if key.endswith("s") else key):
+      if candidate in self._entities:
+        return self._entities[candidate], _kind(candidate)
+    kind = _kind(resource)
+    return self._shared_schema("resource", kind, kind.title(), lambda: self._resource_schema(kind)), kind
+
+  def request(self, kind: str) -> str:
+    """Request body schema shared by every API of one kind"""
+    def build() -> Dict[str, Any]:
+      _, properties, fields, required = _KINDS[kind]
+      return {
+        "type": "object",
+        "properties": {field: properties[field] for field in fields},
+        "required": required,
+        "additionalProperties": False
+      }
+    return self._shared_schema("request", kind, f"{kind.title()}Request", build)
+
+  def response(self, schema: str) -> str:
+    """Success envelope around a resource schema"""
+    def build() -> Dict[str, Any]:
+      return {
+        "type": "object",
+        "properties": {
+          "success": {"type": "boolean"},
+          "data": _ref("", "schemas", schema),
+          "message": {"type": "string"}
+        },
+        "required": ["success", "data"]
+      }
+    return self._shared_schema("response", schema, f"{schema}Response", build)
+
+
+def _json_content(schema: Dict[str, Any]) -> Dict[str, Any]:
+  return {"application/json": {"schema": schema}}
+
+
+def _path_item(api: str, operation: str, request: Dict[str, Any], response: Dict[str, Any], shared: Dict[str, Any]) -> Dict[str, Any]:
+  security = shared["security"]
+  return {
+    "get": {
+      "summary": f"Get {api}",
+      "description": f"Retrieve {api.lower()} information",
+      "operationId": f"get{operation}",
+      "tags": [api],
+      "security": security,
+      "responses": {
+        "200": {"description": "Successful response", "content": response},
+        "401": shared["Unauthorized"],
+        "404": shared["NotFound"]
+      }
+    },
+    "post": {
+      "summary": f"Create {api}",
+      "description": f"Create a new {api.lower()}",
+      "operationId": f"create{operation}",
+      "tags": [api],
+      "security": security,
+      "requestBody": {"required": True, "content": request},
+      "responses": {
+        "201": {"description": f"{api} created successfully", "content": response},
+        "400": shared["BadRequest"],
+        "401": shared["Unauthorized"]
+      }
+    }
+  }
+
+
+def _error_response(description: str, example: str) -> Dict[str, Any]:
+  return {
+    "description": description,
+    "content": _json_content({
+      "type": "object",
+      "properties": {
+        "success": {"type": "boolean", "example": False},
+        "error": {"type": "string", "example": example}
+      }
+    })
+  }
+
+
+def _pointer(key: str) -> str:
+  return key.replace("~", "~0").replace("/", "~1")
+
+
+def build_spec(idea: Idea, max_paths: Optional[int] = None) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+  """OpenAPI document for an Idea, plus any path files split out of it
+
+  Entities become component schemas. Request bodies and response envelopes
+  are shared per resource and referenced with ``$ref``. When there are more
+  than ``max_paths`` APIs, the path items move to ``openapi.paths-N.yaml``
+  files that the main document references.
+  """
+  max_paths = default_max_paths() if max_paths is None else max_paths
+  split = bool(max_paths) and len(idea.apis) > max_paths
+  base = SPEC_FILENAME if split else ""
+  components = _Components(idea)
+  # Repeated fragments are shared objects, which dump_yaml emits once
+  shared: Dict[str, Any] = {"security": [{"BearerAuth": []}]}
+  shared.update((name, _ref(base, "responses", name)) for name in _ERROR_RESPONSES)
+  contents: Dict[str, Dict[str, Any]] = {}
+
+  def content(schema: str) -> Dict[str, Any]:
+    if schema not in contents:
+      contents[schema] = _json_content(_ref(base, "schemas", schema))
+    return contents[schema]
+
+  items: Dict[str, Dict[str, Any]] = {}
+  operations: Dict[str, None] = {}
+  for api in idea.apis:
+    path = _unique("/" + _slug(api), items)
+    operation = _unique(re.sub(r"[^A-Za-z0-9]+", "", api) or "Resource", operations)
+    operations[operation] = None
+    resource, kind = components.resource(api)
+    items[path] = _path_item(api, operation, content(components.request(kind)), content(components.response(resource)), shared)
+
+  parts: Dict[str, Dict[str, Any]] = {}
+  if split:
+    paths = {}
+    keys = list(items)
+    for n, start in enumerate(range(0, len(keys), max_paths), 1):
+      filename = PATHS_FILENAME.format(n=n)
+      parts[filename] = {key: items[key] for key in keys[start:start + max_paths]}
+      paths.update((key, {"$ref": f"{filename}#/{_pointer(key)}"}) for key in parts[filename])
+  else:
+    paths = items
+
+  host = idea.context.project_name.lower().replace(" ", "")
+  spec = {
+    "openapi": OPENAPI_VERSION,
+    "info": {
+      "title": f"{idea.title} API",
+      "description": idea.description,
+      "version": idea.version,
+      "contact": {"name": "API Team", "email": f"api@{host}.com"}
+    },
+    "servers": [
+      {"url": f"https://api.{host}.com/v1", "description": "Production server"},
+      {"url": f"https://staging-api.{host}.com/v1", "description": "Staging server"},
+      {"url": "http://localhost:8000/v1", "description": "Local development server"}
+    ],
+    "paths": paths,
+    "components": {
+      "securitySchemes": {
+        "BearerAuth": {
+          "type": "http",
+          "scheme": "bearer",
+          "bearerFormat": "JWT",
+          "description": "JWT token for authentication"
+        }
+      },
+      "schemas": components.schemas,
+      "responses": {name: _error_response(*texts) for name, texts in _ERROR_RESPONSES.items()}
+    },
+    "tags": [{"name": api, "description": f"{api} management operations"} for api in dict.fromkeys(idea.apis)]
+  }
+  return spec, parts
+
+
+def _refs(node: Any) -> Iterator[str]:
+  stack, visited = [node], set()
+  while stack:
+    node = stack.pop()
+    # Shared subtrees are checked once
+    if id(node) in visited:
+      continue
+    visited.add(id(node))
+    if isinstance(node, dict):
+      ref = node.get("$ref")
+      if isinstance(ref, str):
+        yield ref
+      stack.extend(value for value in node.values() if isinstance(value, (dict, list)))
+    else:
+      stack.extend(value for value in node if isinstance(value, (dict, list)))
+
+
+def _resolve(document: Any, pointer: str) -> bool:
+  for token in pointer.lstrip("/").split("/") if pointer.strip("/") else []:
+    token = token.replace("~1", "/").replace("~0", "~")
+    if not isinstance(document, dict) or token not in document:
+      return False
+    document = document[token]
+  return True
+
+
+_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+
+def validate_spec(spec: Dict[str, Any], parts: Optional[Dict[str, Dict[str, Any]]] = None) -> List[str]:
+  """Structural checks of an OpenAPI 3 document; returns the problems found
+
+  Checks required fields, path and operation shape, unique operation ids,
+  declared tags and that every ``$ref`` resolves, including refs between
+  the main document and its split path files. Needs no network or schema
+  downloads.
+  """
+  parts = parts or {}
+  documents = {SPEC_FILENAME: spec, **parts}
+  errors = []
+  if not str(spec.get("openapi", "")).startswith("3."):
+    errors.append("'openapi' must be a 3.x version")
+  info = spec.get("info")
+  if not isinstance(info, dict) or not info.get("title") or not info.get("version"):
+    errors.append("'info' needs a title and a version")
+  if not isinstance(spec.get("paths"), dict):
+    errors.append("'paths' must be a mapping")
+    return errors
+
+  tags = {tag.get("name") for tag in spec.get("tags", [])}
+  operation_ids = set()
+  items = {}
+  for document in parts.values():
+    items.update(document)
+  for path, item in spec["paths"].items():
+    if not path.startswith("/"):
+      errors.append(f"path '{path}' must start with '/'")
+    if "$ref" not in item:
+      items[path] = item
+  for path, item in items.items():
+    for method in _METHODS:
+      operation = item.get(method)
+      if operation is None:
+        continue
+      where = f"{method.upper()} {path}"
+      if not operation.get("responses"):
+        errors.append(f"{where} has no responses")
+      for code in operation.get("responses", {}):
+        if code != "default" and not re.fullmatch(r"[1-5](\d\d|XX)", str(code)):
+          errors.append(f"{where} has invalid response code '{code}'")
+      operation_id = operation.get("operationId")
+      if operation_id in operation_ids:
+        errors.append(f"{where} reuses operationId '{operation_id}'")
+      operation_ids.add(operation_id)
+      for tag in operation.get("tags", []):
+        if tag not in tags:
+          errors.append(f"{where} uses undeclared tag '{tag}'")
+
+  for name, document in documents.items():
+    for ref in set(_refs(document)):
+      target, _, pointer = ref.partition("#")
+      if not _resolve(documents.get(target or name), pointer):
+        errors.append(f"unresolved $ref '{ref}' in {name}")
+  return errors
+
+
+# Strings that read back as the same string when written unquoted
+_PLAIN = re.compile(r"[A-Za-z/_][A-Za-z0-9 _./@()-]*")
+_RESERVED = {"y", "n", "yes", "no", "on", "off", "true", "false", "null", "~"}
+
+
+@functools.lru_cache(maxsize=8192, typed=True)
+def _scalar(value: Any) -> str:
+  if value is True or value is False:
+    return "true" if value else "false"
+  if value is None:
+    return "null"
+  if isinstance(value, float) and not math.isfinite(value):
+    return ".nan" if math.isnan(value) else (".inf" if value > 0 else "-.inf")
+  if isinstance(value, float):
+    # YAML 1.1 readers such as PyYAML need a dot in a float, even with an exponent
+    text = repr(value)
+    return text.replace("e", ".0e", 1) if "e" in text and "." not in text else text
+  if isinstance(value, int):
+    return repr(value)
+  if _PLAIN.fullmatch(value) and not value.endswith(" ") and value.lower() not in _RESERVED:
+    return value
+  # A JSON string is a valid double-quoted YAML scalar
+  return json.dumps(value, ensure_ascii=False)
+
+
+def _emit(node: Any, indent: str, lines: List[str], seen: Set[Tuple[int, str]], memo: Dict[Tuple[int, str], List[str]]) -> None:
+  items = node.items() if type(node) is dict else ((None, value) for value in node)
+  for key, value in items:
+    prefix = f"{indent}-" if key is None else f"{indent}{_scalar(key)}:"
+    kind = type(value)
+    if kind is not dict and kind is not list:
+      lines.append(f"{prefix} {_scalar(value)}")
+    elif not value:
+      lines.append(f"{prefix} {'{}' if kind is dict else '[]'}")
+    else:
+      start = len(lines)
+      if key is not None:
+        lines.append(prefix)
+      # A subtree reached a second time is kept, so later occurrences are copied
+      ident = (id(value), indent)
+      cached = memo.get(ident)
+      if cached is not None:
+        lines.extend(cached)
+      elif ident in seen:
+        start = len(lines)
+        _emit(value, indent + "  ", lines, seen, memo)
+        memo[ident] = lines[start:]
+      else:
+        seen.add(ident)
+        _emit(value, indent + "  ", lines, seen, memo)
+      if key is None:
+        # "- " takes the place of the item's indent, giving the usual "- key: value" form
+        lines[start] = f"{indent}- {lines[start][len(indent) + 2:]}"
+
+
+def dump_yaml(document: Dict[str, Any]) -> str:
+  """Serialize a document of mappings, lists and scalars to block YAML in one pass
+
+  PyYAML's emitter, even with libyaml, is about ten times slower and takes
+  seconds on specs with thousands of paths; the spec only holds plain JSON
+  types, so a direct emitter is enough. Strings are written plain only
+  when they read back unchanged, otherwise double-quoted. Objects that
+  appear more than once are serialized once and copied.
+  """
+  lines: List[str] = []
+  _emit(document, "", lines, set(), {})
+  return "\n".join(lines) + "\n"
+
+
+def render_openapi(idea: Idea, max_paths: Optional[int] = None) -> Dict[str, str]:
+  """Validated openapi.yaml, and any split path files, keyed by file name"""
+  spec, parts = build_spec(idea, max_paths)
+  errors = validate_spec(spec, parts)
+  if errors:
+    raise OpenAPIValidationError(errors)
+  return {SPEC_FILENAME: dump_yaml(spec), **{name: dump_yaml(part) for name, part in parts.items()}}
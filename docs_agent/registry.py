@@ -0,0 +1,152 @@
+"""Declarative registry of the document types DocGen Suite generates"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from pydantic import BaseModel, ConfigDict, Field
+from .openapi import builder_enabled as openapi_builder_enabled, render_openapi
+from .state import Idea
+
+
+FULL_PROFILE = "full"
+PROFILE_NAMES = (FULL_PROFILE, "lean", "tech_only", "pm_only")
+
+
+class DocSpec(BaseModel):
+  """How one document type is rendered, written and scheduled"""
+  model_config = ConfigDict(frozen=True)
+
+  doc_type: str = Field(..., description="Document type callers request")
+  name: str = Field(..., description="Artifact display name")
+  template: str = Field(..., description="Jinja template; also the document's identity for incremental builds")
+  filename: str = Field(..., description="Output file name")
+  artifact_type: str = Field(..., description="Output format: markdown, mermaid or yaml")
+  node: str = Field(default="", description="Graph node that renders it, generate_<doc_type> by default")
+  after: Tuple[str, ...] = Field(default=(), description="Document types rendered first when both are requested")
+  depends_on: Tuple[str, ...] = Field(default=(), description="Idea fields read by code outside the template")
+  code: Tuple[str, ...] = Field(
+    default=(), description="Modules whose code builds the document; incremental builds hash their source"
+  )
+  profiles: Tuple[str, ...] = Field(default=(), description="Orchestration profiles besides 'full' that include it")
+  context: Optional[Callable[[Idea], Dict[str, Any]]] = Field(default=None, description="Builds extra template variables")
+  render: Optional[Callable[[Idea], Optional[Dict[str, str]]]] = Field(
+    default=None, description="Builds the files in code; returning None renders the template"
+  )
+
+
+_DOCUMENTS: Dict[str, DocSpec] = {}
+
+# Display names of nodes that render more than one document
+NODE_LABELS: Dict[str, str] = {"generate_erd_api": "ERD and API"}
+
+
+def register(spec: DocSpec) -> DocSpec:
+  """Add a document type; registration order is the serial rendering order
+
+  The table at the bottom of this module registers every type on import,
+  and the graph, profiles and servers read it once when they load.
+  """
+  if spec.doc_type in _DOCUMENTS:
+    raise ValueError(f"Document type '{spec.doc_type}' is already registered")
+  missing = [doc for doc in spec.after if doc not in _DOCUMENTS]
+  if missing:
+    raise ValueError(f"'{spec.doc_type}' must be registered after {', '.join(missing)}")
+  unknown = [profile for profile in spec.profiles if profile not in PROFILE_NAMES]
+  if unknown:
+    raise ValueError(f"Unknown profiles for '{spec.doc_type}': {', '.join(unknown)}")
+  if not spec.node:
+    spec = spec.model_copy(update={"node": f"generate_{spec.doc_type}"})
+  _DOCUMENTS[spec.doc_type] = spec
+  return spec
+
+
+def get_doc_spec(doc_type: str) -> DocSpec:
+  try:
+    return _DOCUMENTS[doc_type]
+  except KeyError:
+    raise ValueError(f"Unknown document type '{doc_type}'. Available: {', '.join(_DOCUMENTS)}") from None
+
+
+def doc_types() -> List[str]:
+  """Every registered document type, in rendering order"""
+  return list(_DOCUMENTS)
+
+
+def canonical_docs(docs: Iterable[str]) -> List[str]:
+  """Document type names as registered: stripped, lowercased and without repeats"""
+  return list(dict.fromkeys(doc.strip().lower() for doc in docs if doc and doc.strip()))
+
+
+def unknown_doc_types(docs: Iterable[str]) -> List[str]:
+  return [doc for doc in canonical_docs(docs) if doc not in _DOCUMENTS]
+
+
+def node_documents() -> Dict[str, List[str]]:
+  """Graph nodes in rendering order, with the document types each renders"""
+  nodes: Dict[str, List[str]] = {}
+  for spec in _DOCUMENTS.values():
+    nodes.setdefault(spec.node, []).append(spec.doc_type)
+  return nodes
+
+
+def node_dependencies(node: str) -> List[str]:
+  """Nodes whose documents must be rendered before this node's"""
+  own = node_documents()[node]
+  found = {_DOCUMENTS[doc].node for doc_type in own for doc in _DOCUMENTS[doc_type].after}
+  return [name for name in node_documents() if name in found and name != node]
+
+
+def profiles() -> Dict[str, List[str]]:
+  """Document types per orchestration profile; 'full' has every type"""
+  result: Dict[str, List[str]] = {name: [] for name in PROFILE_NAMES}
+  for spec in _DOCUMENTS.values():
+    for profile in (FULL_PROFILE, *spec.profiles):
+      result[profile].append(spec.doc_type)
+  return result
+
+
+def describe_documents() -> List[Dict[str, Any]]:
+  """JSON-friendly view of the registry"""
+  return [
+    spec.model_dump(include={"doc_type", "name", "template", "filename", "artifact_type", "node", "after", "profiles"})
+    for spec in _DOCUMENTS.values()
+  ]
+
+
+def _erd_context(idea: Idea) -> Dict[str, Any]:
+  # networkx is only loaded once an ERD is actually rendered
+  from .erd import erd_context
+  return {"erd": erd_context(idea)}
+
+
+def _openapi_files(idea: Idea) -> Optional[Dict[str, str]]:
+  return render_openapi(idea) if openapi_builder_enabled() else None
+
+
+for _spec in (
+  DocSpec(doc_type="brd_prd", name="BRD/PRD", template="brd_prd.md.jinja", filename="brd_prd.md",
+          artifact_type="markdown", profiles=("lean", "pm_only")),
+  DocSpec(doc_type="frd", name="FRD", template="frd.md.jinja", filename="frd.md",
+          artifact_type="markdown", profiles=("pm_only",)),
+  DocSpec(doc_type="srd", name="SRD", template="srd.md.jinja", filename="srd.md",
+          artifact_type="markdown", profiles=("lean", "tech_only")),
+  DocSpec(doc_type="trd_tdd", name="TRD/TDD", template="trd_tdd.md.jinja", filename="trd_tdd.md",
+          artifact_type="markdown", profiles=("tech_only",)),
+  DocSpec(doc_type="erd", name="ERD", template="erd.mmd.jinja", filename="erd.mmd", artifact_type="mermaid",
+          node="generate_erd_api", depends_on=("entities", "relationships", "entity_modules"),
+          code=("docs_agent.erd",), profiles=("lean", "tech_only"), context=_erd_context),
+  DocSpec(doc_type="openapi", name="OpenAPI", template="openapi.yaml.jinja", filename="openapi.yaml",
+          artifact_type="yaml", node="generate_erd_api", code=("docs_agent.openapi",), profiles=("tech_only",),
+          render=_openapi_files),
+  DocSpec(doc_type="wireframes", name="UI Wireframes", template="wireframes.mmd.jinja", filename="wireframes.mmd",
+          artifact_type="mermaid", node="generate_ui_wireframes"),
+  DocSpec(doc_type="design_system", name="Design System", template="design_system.md.jinja",
+          filename="design_system.md", artifact_type="markdown"),
+  DocSpec(doc_type="project_plan", name="Project Plan", template="project_plan.md.jinja", filename="project_plan.md",
+          artifact_type="markdown", profiles=("lean", "pm_only")),
+  DocSpec(doc_type="test_strategy", name="Test Strategy", template="test_strategy.md.jinja",
+          filename="test_strategy.md", artifact_type="markdown", profiles=("lean", "pm_only")),
+  DocSpec(doc_type="cicd_env", name="CI/CD Environment", template="cicd_env.md.jinja", filename="cicd_env.md",
+          artifact_type="markdown", profiles=("tech_only",)),
+  DocSpec(doc_type="release_runbook", name="Release Runbook", template="release_runbook.md.jinja",
+          filename="release_runbook.md", artifact_type="markdown", profiles=("pm_only",))
+):
+  register(_spec)
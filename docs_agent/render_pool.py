@@ -0,0 +1,198 @@
+"""Process-pool rendering backend for large Ideas
+
+Template rendering is CPU-bound and holds the GIL, so parallel graph
+branches on threads stop scaling once an Idea has thousands of entities and
+APIs. With the ``process`` backend each graph node hands its documents to a
+pool of worker processes that compiled the templates when they started. The
+Idea is serialized once per run; workers render, write their files next to
+the targets and send back only artifact metadata, and the run's writer
+renames those files into place when it commits.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+from .state import Idea
+from .metrics import RunMetrics
+from .nodes.base import render_node
+from .utils.render import warm_templates
+from .utils.storage import MemoryStorage, get_storage
+from .utils.writer import ArtifactWriter, discard_exported, use_writer
+
+
+BACKENDS = ("thread", "process")
+
+# Parsed Ideas kept per worker, so a run's nodes share one parse
+_IDEA_CACHE_SIZE = 4
+
+
+def default_backend() -> str:
+  """Rendering backend, from DOCGEN_RENDER_BACKEND"""
+  return os.getenv("DOCGEN_RENDER_BACKEND", "thread").lower()
+
+
+def default_processes() -> int:
+  """Worker processes in the render pool, from DOCGEN_RENDER_PROCESSES"""
+  value = os.getenv("DOCGEN_RENDER_PROCESSES")
+  return int(value) if value else os.cpu_count() or 1
+
+
+def default_min_items() -> int:
+  """Smallest Idea worth sending to worker processes, from DOCGEN_PROCESS_MIN_ITEMS"""
+  return int(os.getenv("DOCGEN_PROCESS_MIN_ITEMS", "2000"))
+
+
+def idea_size(idea: Idea) -> int:
+  """Rough rendering cost of an Idea: its modules, entities, relationships and APIs"""
+  return len(idea.modules) + len(idea.entities) + len(idea.relationships) + len(idea.apis)
+
+
+def resolve_backend(idea: Idea, backend: Optional[str] = None, sink: str = "storage") -> str:
+  """The backend a run uses
+
+  Ideas below the size threshold render in-process, and so does every run
+  whose storage other processes cannot see. Memory sink runs never touch
+  storage, so workers just send their content back.
+  """
+  backend = (backend or default_backend()).lower()
+  if backend not in BACKENDS:
+    raise ValueError(f"Unknown rendering backend '{backend}'. Available: {', '.join(BACKENDS)}")
+  if backend == "process" and (
+    idea_size(idea) < default_min_items() or (sink != "memory" and not get_storage().shared)
+  ):
+    return "thread"
+  return backend
+
+
+_ideas: "OrderedDict[str, Idea]" = OrderedDict()
+
+
+def _init_worker() -> None:
+  warm_templates()
+
+
+def _ready() -> int:
+  return os.getpid()
+
+
+def _load_idea(digest: str, payload: str) -> Idea:
+  idea = _ideas.get(digest)
+  if idea is not None:
+    _ideas.move_to_end(digest)
+    return idea
+  idea = Idea.model_validate_json(payload)
+  _ideas[digest] = idea
+  while len(_ideas) > _IDEA_CACHE_SIZE:
+    _ideas.popitem(last=False)
+  return idea
+
+
+def _render_in_worker(digest: str, payload: str, node: str, fsync: bool, sink: str = "storage") -> Dict[str, Any]:
+  """Render one node in a worker and export its files for the parent's writer"""
+  idea = _load_idea(digest, payload)
+  # Memory storage exports the content itself rather than temp files
+  writer = ArtifactWriter(fsync=fsync, storage=MemoryStorage(idea.output_dir) if sink == "memory" else None)
+  metrics = RunMetrics([node], False, "process")
+  with use_writer(writer), metrics.node(node):
+    artifact = render_node(idea, node)
+  return {
+    "artifact": artifact,
+    "files": writer.export(),
+    "manifest": writer.take_manifest_entries(),
+    "sample": metrics.nodes[0]
+  }
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def pool_context() -> multiprocessing.context.BaseContext:
+  """Start method for worker pools: forkserver where available, else spawn
+
+  Callers such as the servers are multi-threaded, which rules out fork.
+  """
+  method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+  return multiprocessing.get_context(method)
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+  """Shared render pool, with every worker started and warmed on first use"""
+  global _pool
+  with _pool_lock:
+    if _pool is None:
+      workers = default_processes()
+      pool = ProcessPoolExecutor(max_workers=workers, mp_context=pool_context(), initializer=_init_worker)
+      for future in [pool.submit(_ready) for _ in range(workers)]:
+        future.result()
+      _pool = pool
+    return _pool
+
+
+def shutdown_render_pool() -> None:
+  """Stop the render pool's workers; the next process run starts a new pool"""
+  global _pool
+  with _pool_lock:
+    pool, _pool = _pool, None
+  if pool is not None:
+    pool.shutdown(wait=True)
+
+
+def _drop_broken_pool(pool: ProcessPoolExecutor) -> None:
+  global _pool
+  with _pool_lock:
+    if _pool is pool:
+      _pool = None
+  pool.shutdown(wait=False)
+
+
+class ProcessRenderer:
+  """Renders one run's graph nodes in the render pool"""
+
+  def __init__(self, idea: Idea, fsync: bool = False, sink: str = "storage"):
+    self.payload = idea.model_dump_json()
+    self.digest = hashlib.sha256(self.payload.encode("utf-8")).hexdigest()
+    self.fsync = fsync
+    self.sink = sink
+    self._pending: List[Future] = []
+    self._lock = threading.Lock()
+
+  def render(self, node: str, writer: ArtifactWriter, sample: Dict[str, Any]) -> Dict[str, Any]:
+    """Render a node in a worker, adopting its files and build records
+
+    The worker's render, write, CPU and RSS measurements replace those of
+    the waiting thread in ``sample``.
+    """
+    pool = get_render_pool()
+    future = pool.submit(_render_in_worker, self.digest, self.payload, node, self.fsync, self.sink)
+    with self._lock:
+      self._pending.append(future)
+    try:
+      result = future.result()
+      writer.adopt(result["files"])
+    except BrokenProcessPool:
+      _drop_broken_pool(pool)
+      raise
+    finally:
+      with self._lock:
+        self._pending.remove(future)
+    for record in result["manifest"]:
+      writer.stage_manifest_entry(**record)
+    for key in ("render", "write", "cpu", "rss_delta"):
+      sample[key] = result["sample"][key]
+    return result["artifact"]
+
+  def discard(self) -> None:
+    """Wait for nodes still rendering and remove the files they exported"""
+    with self._lock:
+      pending = list(self._pending)
+    for future in pending:
+      try:
+        discard_exported(future.result()["files"])
+      except Exception:
+        pass
@@ -1,50 +1,23 @@
 """FastMCP server for DocGen Suite"""
 
 import sys
+import asyncio
+import base64
 import json
-import zipfile
-import os
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from fastmcp import FastMCP
-from docs_agent.state import Idea
-from docs_agent.graph import run_docs_generation, generate_all_documents
-
-
-def get_output_directory() -> Path:
-  """Get the appropriate output directory, creating it if necessary"""
-  # Try multiple possible locations in order of preference
-  possible_paths = [
-    # 1. Relative to current working directory
-    Path.cwd() / "docs_agent" / "outputs",
-    # 2. Relative to script location
-    Path(__file__).parent / "outputs",
-    # 3. In current working directory
-    Path.cwd() / "outputs",
-    # 4. In user's home directory as fallback
-    Path.home() / "docgen_outputs"
-  ]
-  
-  for path in possible_paths:
-    try:
-      # Create directory if it doesn't exist
-      path.mkdir(parents=True, exist_ok=True)
-      # Test if we can write to it
-      test_file = path / ".test_write"
-      test_file.write_text("test", encoding="utf-8")
-      test_file.unlink()  # Clean up test file
-      return path
-    except (OSError, PermissionError):
-      continue
-  
-  # If all else fails, use current working directory
-  fallback_path = Path.cwd() / "docgen_outputs"
-  fallback_path.mkdir(parents=True, exist_ok=True)
-  return fallback_path
+from fastmcp import Context, FastMCP
+from docs_agent import service
+from docs_agent.utils.output import get_output_directory
+from docs_agent.utils.archive import DEFAULT_CHUNK_SIZE
+
+# LangGraph, Jinja2, networkx and the generation modules are imported by
+# the tools that need them, so the server answers ping without loading them
+
 
 # Create MCP server with FastMCP v2 API
 mcp = FastMCP("DocGenAgent")
@@ -62,81 +35,457 @@ def list_tools() -> List[str]:
   return [
     "ping",
     "list_tools", 
+    "list_doc_types",
     "generate_documents",
     "generate_all",
+    "generate_documents_async",
+    "generate_all_async",
+    "generate_documents_stream",
+    "submit_generation",
+    "job_status",
+    "job_result",
+    "cancel_job",
+    "generate_batch",
     "list_outputs",
     "show_doc",
-    "zip_outputs"
+    "list_runs",
+    "zip_outputs",
+    "download_outputs",
+    "cache_stats",
+    "stats",
+    "dependency_map"
   ]
 
 
 @mcp.tool()
-def generate_documents(idea_json: str, docs: List[str], overwrite: bool = False) -> Dict[str, Any]:
-  """Generate specific documents"""
+def list_doc_types() -> List[Dict[str, Any]]:
+  """Registered document types with their template, output file, node and profiles"""
+  from docs_agent.registry import describe_documents
+  return describe_documents()
+
+
+def _unknown_docs_error(docs: List[str]) -> Optional[Dict[str, Any]]:
   try:
-    idea = Idea.model_validate_json(idea_json)
-    # Set the output directory to the one we can actually write to
-    idea.output_dir = get_output_directory()
-    result = run_docs_generation(idea, docs, overwrite)
-    return {"success": True, "result": result}
+    service.check_docs(docs)
+  except ValueError as e:
+    return {"success": False, "error": str(e)}
+  return None
+
+
+def _generate(
+  idea_json: str,
+  docs: List[str],
+  overwrite: bool = False,
+  parallel: bool = False,
+  incremental: bool = False,
+  layout: Optional[str] = None,
+  backend: Optional[str] = None,
+  sink: str = "storage"
+) -> Dict[str, Any]:
+  """Shared body of the generation tools"""
+  try:
+    return service.generate(idea_json, docs, overwrite, parallel, incremental, layout, backend, sink)
   except Exception as e:
     return {"success": False, "error": str(e)}
 
 
 @mcp.tool()
-def generate_all(idea_json: str, overwrite: bool = False) -> Dict[str, Any]:
-  """Generate all documents"""
+def generate_documents(
+  idea_json: str,
+  docs: List[str],
+  overwrite: bool = False,
+  parallel: bool = False,
+  incremental: bool = False,
+  layout: Optional[str] = None,
+  backend: Optional[str] = None,
+  sink: str = "storage"
+) -> Dict[str, Any]:
+  """Generate specific documents (see list_doc_types); layout is "runs" or "flat" (default DOCGEN_OUTPUT_LAYOUT)
+
+  backend is "thread" or "process" (default DOCGEN_RENDER_BACKEND); small Ideas always render in-process.
+  sink "memory" writes nothing and returns each document's text and hash in result.documents.
+  """
+  return _generate(idea_json, docs, overwrite, parallel, incremental, layout, backend, sink)
+
+
+@mcp.tool()
+def generate_all(
+  idea_json: str,
+  overwrite: bool = False,
+  parallel: bool = False,
+  incremental: bool = False,
+  layout: Optional[str] = None,
+  backend: Optional[str] = None,
+  sink: str = "storage"
+) -> Dict[str, Any]:
+  """Generate all documents; sink "memory" returns them instead of writing them"""
+  return _generate(idea_json, service.all_docs(), overwrite, parallel, incremental, layout, backend, sink)
+
+
+@mcp.tool()
+async def generate_documents_async(
+  idea_json: str,
+  docs: List[str],
+  overwrite: bool = False,
+  parallel: bool = False,
+  incremental: bool = False,
+  backend: Optional[str] = None,
+  sink: str = "storage"
+) -> Dict[str, Any]:
+  """Generate specific documents on the worker pool without blocking the server"""
+  from docs_agent.jobs import QueueFullError, get_job_queue
+  try:
+    return await get_job_queue().run(
+      _generate, idea_json, docs, overwrite, parallel, incremental, backend=backend, sink=sink
+    )
+  except QueueFullError as e:
+    return {"success": False, "error": str(e)}
+
+
+@mcp.tool()
+async def generate_all_async(
+  idea_json: str,
+  overwrite: bool = False,
+  parallel: bool = False,
+  incremental: bool = False,
+  backend: Optional[str] = None,
+  sink: str = "storage"
+) -> Dict[str, Any]:
+  """Generate all documents on the worker pool without blocking the server"""
+  from docs_agent.jobs import QueueFullError, get_job_queue
+  try:
+    return await get_job_queue().run(
+      _generate, idea_json, service.all_docs(), overwrite, parallel, incremental, backend=backend, sink=sink
+    )
+  except QueueFullError as e:
+    return {"success": False, "error": str(e)}
+
+
+@mcp.tool()
+async def generate_documents_stream(
+  idea_json: str,
+  docs: List[str],
+  ctx: Context,
+  overwrite: bool = False,
+  parallel: bool = False,
+  incremental: bool = False,
+  backend: Optional[str] = None,
+  sink: str = "storage"
+) -> Dict[str, Any]:
+  """Generate documents, sending a progress notification as each node finishes
+
+  sink "memory" writes nothing and returns each document's text and hash in result.documents.
+  """
+  error = _unknown_docs_error(docs)
+  if error:
+    return error
+  from docs_agent.ingest import ingest_idea
+  from docs_agent.graph import SINKS, requested_nodes, stream_docs_generation
+  from docs_agent.jobs import get_job_queue
+  from docs_agent.utils.runs import describe_run, run_directory
+  if sink not in SINKS:
+    return {"success": False, "error": f"Unknown sink '{sink}'. Available: {', '.join(SINKS)}"}
+  try:
+    idea, ingest = ingest_idea(idea_json)
+  except Exception as e:
+    return {"success": False, "error": str(e)}
+
+  loop = asyncio.get_running_loop()
+  queue: asyncio.Queue = asyncio.Queue()
+
+  def produce() -> None:
+    completed: Optional[Dict[str, Any]] = None
+
+    def forward(events: Iterator[Dict[str, Any]]) -> None:
+      nonlocal completed
+      for event in events:
+        if event["event"] == "completed":
+          completed = event
+          continue
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    try:
+      if sink == "memory":
+        forward(stream_docs_generation(idea, docs, overwrite, parallel, incremental=incremental, backend=backend, sink=sink))
+      else:
+        with run_directory(get_output_directory(), idea, seed=incremental) as run:
+          idea.output_dir = run["path"]
+          forward(stream_docs_generation(
+            idea, docs, overwrite or run["isolated"], parallel, incremental=incremental, backend=backend
+          ))
+        # Sent once the run has been published as the latest
+        if completed is not None:
+          completed = {**completed, "run": describe_run(run)}
+      if completed is None:
+        raise RuntimeError("Generation ended without a result")
+      loop.call_soon_threadsafe(queue.put_nowait, completed)
+    except Exception as e:
+      loop.call_soon_threadsafe(queue.put_nowait, {"event": "error", "error": str(e)})
+
+  async def pump() -> None:
+    # Always ends the stream with an event, or the loop below would wait forever
+    try:
+      await get_job_queue().run(produce)
+    except Exception as e:
+      queue.put_nowait({"event": "error", "error": str(e)})
+
+  # Both graphs run exactly the requested nodes
+  total = len(requested_nodes(docs))
+  task = asyncio.ensure_future(pump())
+  events = []
+  while True:
+    event = await queue.get()
+    if event["event"] != "node_finished":
+      break
+    events.append(event)
+    await ctx.report_progress(
+      len(events),
+      total,
+      f"{event['node']}: {event['bytes']} bytes in {event['duration']:.3f}s"
+    )
+  await task
+
+  if event["event"] == "error":
+    return {"success": False, "error": event["error"], "events": events}
+  return {
+    "success": True,
+    "result": event["result"],
+    **({"run": event["run"]} if "run" in event else {}),
+    "events": events,
+    "elapsed": event["elapsed"],
+    "ingest": ingest
+  }
+
+
+@mcp.tool()
+def submit_generation(
+  idea_json: str,
+  docs: Optional[List[str]] = None,
+  overwrite: bool = False,
+  parallel: bool = False,
+  incremental: bool = False,
+  backend: Optional[str] = None,
+  sink: str = "storage"
+) -> Dict[str, Any]:
+  """Queue a generation job and return its id immediately; omit docs for all"""
+  from docs_agent.jobs import QueueFullError, get_job_queue
+  try:
+    job = get_job_queue().submit(
+      "generate", _generate, idea_json, docs or service.all_docs(), overwrite, parallel, incremental,
+      backend=backend, sink=sink
+    )
+    return {"success": True, **job.describe()}
+  except QueueFullError as e:
+    return {"success": False, "error": str(e)}
+
+
+@mcp.tool()
+def job_status(job_id: str) -> Dict[str, Any]:
+  """Show the status of a generation job"""
+  from docs_agent.jobs import get_job_queue
+  job = get_job_queue().get(job_id)
+  if job is None:
+    return {"success": False, "error": f"Unknown job: {job_id}"}
+  return {"success": True, **job.describe()}
+
+
+@mcp.tool()
+def job_result(job_id: str) -> Dict[str, Any]:
+  """Get the result of a finished generation job"""
+  from docs_agent.jobs import get_job_queue
+  job = get_job_queue().get(job_id)
+  if job is None:
+    return {"success": False, "error": f"Unknown job: {job_id}"}
+  status = job.status
+  if status == "succeeded":
+    return job.future.result()
+  if status == "failed":
+    return {"success": False, "status": status, "error": str(job.future.exception())}
+  return {"success": False, "status": status, "error": f"Job is {status}"}
+
+
+@mcp.tool()
+def cancel_job(job_id: str) -> Dict[str, Any]:
+  """Cancel a queued generation job; running jobs finish normally"""
+  from docs_agent.jobs import get_job_queue
+  job = get_job_queue().get(job_id)
+  if job is None:
+    return {"success": False, "error": f"Unknown job: {job_id}"}
+  cancelled = get_job_queue().cancel(job_id)
+  return {"success": cancelled, "status": job.status}
+
+
+@mcp.tool()
+def generate_batch(
+  ideas: Optional[List[Dict[str, Any]]] = None,
+  jsonl_path: Optional[str] = None,
+  docs: Optional[List[str]] = None,
+  overwrite: bool = False,
+  incremental: bool = False,
+  workers: Optional[int] = None
+) -> Dict[str, Any]:
+  """Generate documents for many Ideas, each into its own subdirectory"""
   try:
-    idea = Idea.model_validate_json(idea_json)
-    # Set the output directory to the one we can actually write to
-    idea.output_dir = get_output_directory()
-    result = generate_all_documents(idea, overwrite)
-    return {"success": True, "result": result}
+    from docs_agent.batch import load_jsonl, run_batch
+
+    if docs:
+      service.check_docs(docs)
+    payloads: List[Any] = list(ideas or [])
+    if jsonl_path:
+      payloads.extend(load_jsonl(jsonl_path))
+    if not payloads:
+      return {"success": False, "error": "Provide ideas or jsonl_path"}
+    batch = run_batch(
+      payloads,
+      get_output_directory() / "batch",
+      docs=docs,
+      overwrite=overwrite,
+      incremental=incremental,
+      workers=workers
+    )
+    return {"success": True, **batch}
   except Exception as e:
     return {"success": False, "error": str(e)}
 
 
 @mcp.tool()
-def list_outputs() -> List[str]:
-  """List generated outputs"""
-  outputs_dir = get_output_directory()
-  
-  files = []
-  for file_path in outputs_dir.rglob("*"):
-    if file_path.is_file():
-      files.append(str(file_path.relative_to(outputs_dir)))
-  return files
+def list_outputs(
+  doc_type: Optional[str] = None,
+  idea_hash: Optional[str] = None,
+  prefix: Optional[str] = None,
+  limit: Optional[int] = None,
+  offset: int = 0,
+  refresh: bool = False
+) -> List[str]:
+  """List generated outputs
+
+  Served from the output catalog. Filter by doc type (e.g. ``frd``), Idea
+  hash or path prefix and page with limit/offset. ``refresh`` re-indexes
+  the output directory to pick up files changed outside the tools.
+  """
+  return service.list_outputs(doc_type, idea_hash, prefix, limit, offset, refresh)
 
 
 @mcp.tool()
-def show_doc(path: str) -> str:
-  """Show document content"""
+def list_runs(idea_hash: str) -> Dict[str, Any]:
+  """List the runs kept for one Idea hash, oldest first, marking the latest"""
   try:
-    outputs_dir = get_output_directory()
-    doc_path = outputs_dir / path
-    if doc_path.exists():
-      return doc_path.read_text(encoding="utf-8")
-    return f"Document not found: {path}"
+    return {"success": True, "idea_hash": idea_hash, "runs": service.list_runs(idea_hash)}
+  except Exception as e:
+    return {"success": False, "error": str(e)}
+
+
+@mcp.tool()
+def show_doc(
+  path: str,
+  start_line: Optional[int] = None,
+  end_line: Optional[int] = None,
+  offset: Optional[int] = None,
+  length: Optional[int] = None
+) -> str:
+  """Show document content
+
+  Pass start_line/end_line (1-based, inclusive) or a byte offset/length to
+  read part of a large document.
+  """
+  try:
+    return service.read_document(path, start_line, end_line, offset, length)
+  except FileNotFoundError as e:
+    return str(e)
   except Exception as e:
     return f"Error reading document: {str(e)}"
 
 
 @mcp.tool()
-def zip_outputs() -> str:
-  """Create zip of all outputs"""
+def zip_outputs(
+  subdir: Optional[str] = None,
+  files: Optional[List[str]] = None,
+  compression: Optional[str] = None
+) -> str:
+  """Create or update a zip of the outputs
+
+  Only files changed since the last zip are re-read. Pass ``files`` (for
+  example the paths from one generation result) or ``subdir`` to archive
+  part of the outputs; compression is stored, deflate, bzip2, lzma or zstd.
+  """
   try:
-    outputs_dir = get_output_directory()
-    zip_path = Path("docs_outputs.zip")
-    
-    with zipfile.ZipFile(zip_path, 'w') as zipf:
-      for file_path in outputs_dir.rglob("*"):
-        if file_path.is_file():
-          zipf.write(file_path, file_path.relative_to(outputs_dir))
-    
-    return str(zip_path)
+    report = service.zip_outputs(subdir, files, compression)
+    return report.get("location", report["path"])
   except Exception as e:
     return f"Error creating zip: {str(e)}"
 
 
+@mcp.tool()
+def download_outputs(
+  subdir: Optional[str] = None,
+  files: Optional[List[str]] = None,
+  compression: Optional[str] = None,
+  chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Dict[str, Any]:
+  """Build a zip of the outputs in memory and return it as base64 chunks
+
+  Nothing is written to disk. Decode and concatenate ``chunks`` in order to
+  get the archive.
+  """
+  try:
+    from docs_agent.utils.archive import collect_files, iter_archive_chunks
+
+    sources = collect_files(get_output_directory(), subdir, files)
+    chunks = [
+      base64.b64encode(chunk).decode("ascii")
+      for chunk in iter_archive_chunks(sources, compression, chunk_size=chunk_size)
+    ]
+    return {"success": True, "files": len(sources), "encoding": "base64", "chunks": chunks}
+  except Exception as e:
+    return {"success": False, "error": str(e)}
+
+
+@mcp.tool()
+def cache_stats() -> Dict[str, Any]:
+  """Show template, compiled graph and validated Idea cache statistics"""
+  from docs_agent.graph import graph_cache_stats
+  from docs_agent.ingest import idea_cache_stats
+  from docs_agent.jobs import get_job_queue
+  from docs_agent.utils.render import template_cache_stats
+  return {
+    "templates": template_cache_stats(),
+    "graphs": graph_cache_stats(),
+    "ideas": idea_cache_stats(),
+    "jobs": get_job_queue().stats()
+  }
+
+
+@mcp.tool()
+def stats(reset: bool = False) -> Dict[str, Any]:
+  """Rolling per-node timing, CPU, memory and bytes aggregates over recent runs"""
+  from docs_agent.metrics import get_metrics_registry
+  registry = get_metrics_registry()
+  result = registry.stats()
+  if reset:
+    registry.reset()
+  return result
+
+
+@mcp.tool()
+def dependency_map() -> Dict[str, List[str]]:
+  """Show which Idea fields each template reads"""
+  from docs_agent.utils.incremental import dependency_map as template_dependency_map
+  return template_dependency_map()
+
+
 if __name__ == "__main__":
-  mcp.run()
+  import argparse
+  from docs_agent.utils.startup import format_import_report, profile_imports, start_prewarm
+
+  parser = argparse.ArgumentParser(description="DocGen MCP server")
+  parser.add_argument("--profile-imports", action="store_true", help="Report the server's import times and exit")
+  args = parser.parse_args()
+  if args.profile_imports:
+    # stdout belongs to the MCP protocol
+    print(format_import_report(profile_imports(["docs_agent.server"])), file=sys.stderr)
+    sys.exit(0)
+
+  # Compile templates and graphs while the first calls are answered (DOCGEN_PREWARM)
+  start_prewarm(service.warm_up)
+  # The banner renders with rich and checks PyPI for updates before serving
+  mcp.run(show_banner=False)
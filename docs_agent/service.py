@@ -0,0 +1,181 @@
+"""Operations shared by the MCP servers and the HTTP API
+
+Each function raises on bad input (ValueError) or a missing document
+(FileNotFoundError); the MCP tools turn that into their error replies and
+the API into status codes. Generation modules are imported on first use.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from .ingest import IdeaPayload
+from .utils.output import get_output_directory, with_output_directory
+
+
+def all_docs() -> List[str]:
+  from .registry import doc_types
+  return doc_types()
+
+
+def check_docs(docs: List[str]) -> None:
+  """Raise ValueError naming any unregistered document types"""
+  from .registry import unknown_doc_types
+  unknown = unknown_doc_types(docs)
+  if unknown:
+    raise ValueError(f"Unknown document types: {', '.join(unknown)}. Available: {', '.join(all_docs())}")
+
+
+def generate(
+  payload: IdeaPayload,
+  docs: List[str],
+  overwrite: bool = False,
+  parallel: bool = False,
+  incremental: bool = False,
+  layout: Optional[str] = None,
+  backend: Optional[str] = None,
+  sink: str = "storage"
+) -> Dict[str, Any]:
+  """Generate documents for an Idea payload into a run directory of the output root
+
+  With ``sink="memory"`` there is no run directory; the documents come
+  back in ``result["documents"]``.
+  """
+  from .ingest import ingest_idea
+  from .graph import SINKS, run_docs_generation
+  from .utils.incremental import build_report
+  from .utils.runs import describe_run, run_directory
+
+  check_docs(docs)
+  if sink not in SINKS:
+    raise ValueError(f"Unknown sink '{sink}'. Available: {', '.join(SINKS)}")
+  idea, ingest = ingest_idea(payload)
+  if sink == "memory":
+    result = run_docs_generation(idea, docs, overwrite, parallel, incremental=incremental, backend=backend, sink=sink)
+    return {"success": True, "result": result, "ingest": ingest}
+
+  def run_generation(output_dir: Path) -> Dict[str, Any]:
+    with run_directory(output_dir, idea, layout, seed=incremental) as run:
+      # Set the output directory to the one we can actually write to
+      idea.output_dir = run["path"]
+      result = run_docs_generation(
+        idea, docs, overwrite or run["isolated"], parallel, incremental=incremental, backend=backend, sink=sink
+      )
+    return {"success": True, "result": result, "run": describe_run(run)}
+
+  response = with_output_directory(run_generation)
+  response["ingest"] = ingest
+  if incremental:
+    response["build_report"] = build_report(response["result"]["artifacts"])
+  return response
+
+
+def orchestrate(payload: IdeaPayload, profile: str = "full", overwrite: bool = False) -> Dict[str, Any]:
+  """Generate an orchestration profile's documents into a run directory"""
+  from .ingest import load_idea
+  from .utils.runs import describe_run, run_directory
+  from orchestrator.graph import orchestrate_docgen
+
+  idea = load_idea(payload)
+
+  def run_profile(output_dir: Path) -> Dict[str, Any]:
+    with run_directory(output_dir, idea) as run:
+      # Set the output directory to the one we can actually write to
+      idea.output_dir = run["path"]
+      result = orchestrate_docgen(idea, profile, overwrite or run["isolated"])
+    return {"success": True, "result": result, "run": describe_run(run)}
+
+  return with_output_directory(run_profile)
+
+
+def list_outputs(
+  doc_type: Optional[str] = None,
+  idea_hash: Optional[str] = None,
+  prefix: Optional[str] = None,
+  limit: Optional[int] = None,
+  offset: int = 0,
+  refresh: bool = False
+) -> List[str]:
+  """Output paths from the catalog, re-indexing the output directory when asked"""
+  from .utils.catalog import get_catalog
+
+  catalog = get_catalog()
+  if refresh or not catalog.is_indexed():
+    catalog.rebuild()
+  rows = catalog.query(doc_type=doc_type, idea_hash=idea_hash, prefix=prefix, limit=limit, offset=offset)
+  return [row["path"] for row in rows]
+
+
+def list_runs(idea_hash: str) -> List[Dict[str, Any]]:
+  """Runs kept for one Idea hash, oldest first"""
+  from .utils.runs import list_runs as list_idea_runs
+
+  # Idea hashes are 16 hex digits; anything else could walk out of the output root
+  if not re.fullmatch(r"[0-9a-f]{16}", idea_hash):
+    raise ValueError(f"Invalid Idea hash: {idea_hash!r}")
+  return list_idea_runs(get_output_directory() / idea_hash)
+
+
+def read_document(
+  path: str,
+  start_line: Optional[int] = None,
+  end_line: Optional[int] = None,
+  offset: Optional[int] = None,
+  length: Optional[int] = None
+) -> str:
+  """A document under the output directory, whole or by line or byte range"""
+  from .utils.catalog import read_bytes, read_lines
+  from .utils.storage import get_storage
+
+  root = get_output_directory().resolve()
+  doc_path = (root / path).resolve()
+  if doc_path != root and root not in doc_path.parents:
+    raise ValueError(f"{path} is outside the output directory")
+  storage = get_storage(root)
+  if start_line is not None or end_line is not None:
+    return read_lines(doc_path, start_line or 1, end_line, storage)
+  if offset is not None or length is not None:
+    return read_bytes(doc_path, offset or 0, length, storage)
+  data = storage.read(doc_path)
+  if data is None:
+    raise FileNotFoundError(f"Document not found: {path}")
+  return data.decode("utf-8")
+
+
+def zip_outputs(
+  subdir: Optional[str] = None,
+  files: Optional[List[str]] = None,
+  compression: Optional[str] = None
+) -> Dict[str, Any]:
+  """Create or update the zip of the outputs at DOCGEN_ARCHIVE_PATH
+
+  With storage that is not local the archive is also uploaded to the
+  storage root, as a multipart upload once it is large, and ``location``
+  names it. Its ``.docgen_`` name keeps it out of listings and archives.
+  """
+  from .utils.archive import update_archive
+  from .utils.storage import get_storage
+
+  root = get_output_directory()
+  storage = get_storage(root)
+  zip_path = Path(os.getenv("DOCGEN_ARCHIVE_PATH", "docs_outputs.zip"))
+  report = update_archive(zip_path, root, subdir, files, compression, storage=storage)
+  if not storage.local:
+    bundle = storage.root / f".docgen_{zip_path.name}"
+    with open(zip_path, "rb") as f:
+      storage.upload(bundle, f)
+    report["location"] = f"{storage.location.rstrip('/')}/{storage.key(bundle)}"
+  return report
+
+
+def warm_up() -> None:
+  """Compile templates and graphs, and start the render pool if it is the default"""
+  from .graph import prebuild_graphs
+  from .render_pool import default_backend, get_render_pool
+  from .utils.render import warm_templates
+
+  warm_templates()
+  prebuild_graphs([all_docs()])
+  prebuild_graphs([all_docs()], parallel=True)
+  if default_backend() == "process":
+    get_render_pool()
@@ -1,6 +1,7 @@
 """State models for DocGen Suite"""
 
-from typing import List, Dict, Optional, Any
+import operator
+from typing import Annotated, List, Dict, Literal, Optional, Any
 from pathlib import Path
 from pydantic import BaseModel, Field
 from datetime import datetime
@@ -15,6 +16,16 @@ class Context(BaseModel):
   assumptions: List[str] = Field(default_factory=list, description="Key assumptions")
 
 
+class Relationship(BaseModel):
+  """Relationship between two entities, drawn on the ERD"""
+  source: str = Field(..., description="Entity on the left-hand side")
+  target: str = Field(..., description="Entity on the right-hand side")
+  cardinality: Literal["one-to-one", "one-to-many", "many-to-one", "many-to-many"] = Field(
+    default="one-to-many", description="Relationship cardinality"
+  )
+  label: str = Field(default="relates to", description="Verb phrase shown on the diagram")
+
+
 class Idea(BaseModel):
   """Core idea specification for document generation"""
   title: str = Field(..., description="Project title")
@@ -24,6 +35,8 @@ class Idea(BaseModel):
   kpis: List[str] = Field(default_factory=list, description="Key performance indicators")
   modules: List[str] = Field(default_factory=list, description="System modules")
   entities: List[str] = Field(default_factory=list, description="Data entities")
+  relationships: List[Relationship] = Field(default_factory=list, description="Declared entity relationships")
+  entity_modules: Dict[str, str] = Field(default_factory=dict, description="Module each entity belongs to, used to group ERD diagrams")
   apis: List[str] = Field(default_factory=list, description="API endpoints")
   compliance: List[str] = Field(default_factory=list, description="Compliance requirements")
   slas: Dict[str, str] = Field(default_factory=dict, description="Service level agreements")
@@ -34,6 +47,9 @@ class Idea(BaseModel):
   docs: Optional[List[str]] = Field(default_factory=list, description="Document types to generate")
   overwrite: Optional[bool] = Field(default=False, description="Allow overwriting existing files")
   output_dir: Path = Field(default=Path("docs_agent/outputs"), description="Directory to write artifacts")
+  incremental: Optional[bool] = Field(default=False, description="Skip documents whose inputs are unchanged since the last build")
+  # Parallel branches each append their artifacts; the reducer merges them
+  artifacts: Annotated[List[Dict[str, Any]], operator.add] = Field(default_factory=list, description="Artifacts produced by generation nodes")
 
 
 class DocRequest(BaseModel):
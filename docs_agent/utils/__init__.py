@@ -1,6 +1,27 @@
 """Utility modules for DocGen Suite"""
 
-from .render import render_template
-from .safety import safe_write
+import importlib
+from typing import Any, List
 
-__all__ = ["render_template", "safe_write"]
+# Imported on first access, so light utilities do not load Jinja2
+_EXPORTS = {
+  "render_template": "render",
+  "warm_templates": "render",
+  "template_cache_stats": "render",
+  "safe_write": "safety"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+  module = _EXPORTS.get(name)
+  if module is None:
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  value = getattr(importlib.import_module(f".{module}", __name__), name)
+  globals()[name] = value
+  return value
+
+
+def __dir__() -> List[str]:
+  return sorted(set(globals()) | set(__all__))
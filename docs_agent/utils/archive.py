@@ -0,0 +1,313 @@
+"""Zip archives of generated outputs for DocGen Suite"""
+
+import json
+import contextlib
+import os
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from .output import is_internal_file
+from .storage import Storage, get_storage
+from .writer import atomic_write, file_mode
+
+
+COMPRESSION_METHODS = {
+  "stored": zipfile.ZIP_STORED,
+  "deflate": zipfile.ZIP_DEFLATED,
+  "bzip2": zipfile.ZIP_BZIP2,
+  "lzma": zipfile.ZIP_LZMA
+}
+# zipfile only writes Zstandard members from Python 3.14 on
+if hasattr(zipfile, "ZIP_ZSTANDARD"):
+  COMPRESSION_METHODS["zstd"] = zipfile.ZIP_ZSTANDARD
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+class ArchiveTooLargeError(ValueError):
+  """Raised when the files to archive exceed the configured size limit"""
+
+
+def resolve_compression(name: Optional[str] = None) -> Tuple[str, int]:
+  """Compression name and zipfile constant, from the argument or DOCGEN_ARCHIVE_COMPRESSION
+
+  ``zstd`` falls back to ``deflate`` where zipfile cannot write it.
+  """
+  name = (name or os.getenv("DOCGEN_ARCHIVE_COMPRESSION") or "deflate").lower()
+  if name == "zstd" and name not in COMPRESSION_METHODS:
+    name = "deflate"
+  if name not in COMPRESSION_METHODS:
+    raise ValueError(f"Unknown compression '{name}', expected one of: {', '.join(COMPRESSION_METHODS)}")
+  return name, COMPRESSION_METHODS[name]
+
+
+def default_max_bytes() -> int:
+  """Uncompressed size limit for one archive, from DOCGEN_ARCHIVE_MAX_BYTES (0 disables it)"""
+  return int(os.getenv("DOCGEN_ARCHIVE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+def _within(path: Path, root: Path) -> Path:
+  resolved = path.resolve()
+  if resolved != root and root not in resolved.parents:
+    raise ValueError(f"{path} is outside the output directory")
+  return resolved
+
+
+def collect_files(
+  root: Path,
+  subdir: Optional[str] = None,
+  files: Optional[Iterable[str]] = None,
+  exclude: Iterable[Path] = (),
+  storage: Optional[Storage] = None
+) -> Dict[str, Path]:
+  """Map archive member names to source files under root
+
+  ``files`` selects explicit artifacts, such as the paths of a single run;
+  ``subdir`` limits the walk to one directory. Otherwise everything under
+  root is included.
+  """
+  root = root.resolve()
+  storage = storage or get_storage(root)
+  sources: Dict[str, Path] = {}
+  if files:
+    for name in files:
+      path = Path(name)
+      path = _within(path if path.is_absolute() else root / path, root)
+      if not storage.exists(path):
+        raise FileNotFoundError(f"File not found: {name}")
+      sources[path.relative_to(root).as_posix()] = path
+    return sources
+
+  excluded = {path.resolve() for path in exclude}
+  base = _within(root / subdir, root) if subdir else root
+  for item in storage.list(base):
+    path = Path(item["path"])
+    if is_internal_file(path.name) or path in excluded:
+      continue
+    sources[path.relative_to(root).as_posix()] = path
+  return dict(sorted(sources.items()))
+
+
+def _check_size(sources: Dict[str, Path], max_bytes: Optional[int], storage: Storage) -> int:
+  total = sum((storage.stat(path) or {"size": 0})["size"] for path in sources.values())
+  limit = default_max_bytes() if max_bytes is None else max_bytes
+  if limit and total > limit:
+    raise ArchiveTooLargeError(f"{len(sources)} files total {total} bytes, over the {limit} byte limit")
+  return total
+
+
+def _read_manifest(path: Path) -> Dict[str, Any]:
+  try:
+    with open(path, "r", encoding="utf-8") as f:
+      return json.load(f)
+  except (OSError, ValueError):
+    return {}
+
+
+def _write_member(zipf: zipfile.ZipFile, name: str, path: Path, storage: Storage) -> None:
+  if storage.local:
+    zipf.write(path, name)
+    return
+  stat = storage.stat(path)
+  data = storage.read(path)
+  if stat is None or data is None:
+    raise FileNotFoundError(f"File not found: {name}")
+  info = zipfile.ZipInfo(name, time.localtime(stat["mtime"])[:6])
+  info.external_attr = 0o644 << 16
+  zipf.writestr(info, data, compress_type=zipf.compression, compresslevel=zipf.compresslevel)
+
+
+def _write_members(zipf: zipfile.ZipFile, names: Iterable[str], sources: Dict[str, Path], storage: Storage) -> None:
+  for name in names:
+    _write_member(zipf, name, sources[name], storage)
+
+
+def _appendable(zip_path: Path, names: Iterable[str]) -> bool:
+  """Whether members can be appended without duplicating names in a sound archive"""
+  try:
+    with zipfile.ZipFile(zip_path) as zipf:
+      return not set(names) & set(zipf.namelist())
+  except (OSError, zipfile.BadZipFile):
+    return False
+
+
+def _write_archive(
+  zip_path: Path,
+  sources: Dict[str, Path],
+  storage: Storage,
+  method: int,
+  compresslevel: Optional[int]
+) -> None:
+  """Write every member to a temp archive and rename it into place"""
+  zip_path.parent.mkdir(parents=True, exist_ok=True)
+  fd, tmp_name = tempfile.mkstemp(dir=str(zip_path.parent), prefix=f".{zip_path.name}.", suffix=".tmp")
+  try:
+    os.fchmod(fd, file_mode(zip_path))
+    with os.fdopen(fd, "wb") as f, zipfile.ZipFile(f, "w", compression=method, compresslevel=compresslevel) as zipf:
+      _write_members(zipf, sources, sources, storage)
+    os.replace(tmp_name, zip_path)
+  except BaseException:
+    if os.path.exists(tmp_name):
+      os.unlink(tmp_name)
+    raise
+
+
+def _append_archive(
+  zip_path: Path,
+  manifest_path: Path,
+  names: Iterable[str],
+  sources: Dict[str, Path],
+  storage: Storage,
+  method: int,
+  compresslevel: Optional[int]
+) -> None:
+  """Append members to the archive in place
+
+  Only the new members are written. If that fails part way, the manifest
+  is dropped so the next update rebuilds the archive.
+  """
+  try:
+    with zipfile.ZipFile(zip_path, "a", compression=method, compresslevel=compresslevel) as zipf:
+      _write_members(zipf, names, sources, storage)
+  except BaseException:
+    with contextlib.suppress(OSError):
+      os.unlink(manifest_path)
+    raise
+
+
+def update_archive(
+  zip_path: Path,
+  root: Path,
+  subdir: Optional[str] = None,
+  files: Optional[Iterable[str]] = None,
+  compression: Optional[str] = None,
+  compresslevel: Optional[int] = None,
+  max_bytes: Optional[int] = None,
+  storage: Optional[Storage] = None
+) -> Dict[str, Any]:
+  """Bring a zip archive up to date with the files under root
+
+  A manifest next to the archive records each member's size, mtime and
+  hash. Unchanged files are not re-read and new files are appended in
+  place. Zip members cannot be replaced or removed, so a changed or
+  removed file (such as a pruned run) rebuilds the whole archive, into a
+  temp file that atomically replaces it; archive one run with ``subdir``
+  or ``files`` to keep rebuilds small. The archive itself is a local file;
+  its members come from storage.
+  """
+  start = time.perf_counter()
+  zip_path = Path(zip_path)
+  manifest_path = zip_path.with_name(zip_path.name + MANIFEST_SUFFIX)
+  compression_name, method = resolve_compression(compression)
+  storage = storage or get_storage(root)
+  sources = collect_files(root, subdir, files, exclude=(zip_path, manifest_path), storage=storage)
+  _check_size(sources, max_bytes, storage)
+
+  manifest = _read_manifest(manifest_path) if zip_path.exists() else {}
+  if manifest.get("compression") != compression_name or manifest.get("root") != str(Path(root).resolve()):
+    manifest = {}
+  previous = manifest.get("files", {})
+
+  entries: Dict[str, Dict[str, Any]] = {}
+  added, changed, unchanged = [], [], 0
+  for name, path in sources.items():
+    stat = storage.stat(path)
+    if stat is None:
+      raise FileNotFoundError(f"File not found: {name}")
+    entry = previous.get(name)
+    if entry and entry["size"] == stat["size"] and entry["mtime_ns"] == stat["mtime_ns"]:
+      entries[name] = entry
+      unchanged += 1
+      continue
+    entries[name] = {"size": stat["size"], "mtime_ns": stat["mtime_ns"], "hash": storage.hash(path)}
+    if entry is None:
+      added.append(name)
+    elif entry["hash"] != entries[name]["hash"]:
+      changed.append(name)
+    else:
+      unchanged += 1
+  removed = [name for name in previous if name not in sources]
+
+  # A manifest that missed the last update may list members the archive already has
+  if not manifest or changed or removed or (added and not _appendable(zip_path, added)):
+    action = "rebuilt"
+    _write_archive(zip_path, sources, storage, method, compresslevel)
+  elif added:
+    action = "appended"
+    _append_archive(zip_path, manifest_path, added, sources, storage, method, compresslevel)
+  else:
+    action = "unchanged"
+
+  manifest = {"root": str(Path(root).resolve()), "compression": compression_name, "files": entries}
+  atomic_write(manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+  return {
+    "path": str(zip_path),
+    "action": action,
+    "compression": compression_name,
+    "files": len(sources),
+    "added": len(added),
+    "changed": len(changed),
+    "removed": len(removed),
+    "unchanged": unchanged,
+    "bytes": zip_path.stat().st_size,
+    "elapsed": round(time.perf_counter() - start, 6)
+  }
+
+
+class _ChunkSink:
+  """Write-only, unseekable buffer that zipfile streams into"""
+
+  def __init__(self):
+    self._buffer = bytearray()
+
+  def write(self, data: bytes) -> int:
+    self._buffer += data
+    return len(data)
+
+  def flush(self) -> None:
+    pass
+
+  def drain(self, chunk_size: int, final: bool = False) -> Iterator[bytes]:
+    while len(self._buffer) >= chunk_size or (final and self._buffer):
+      chunk = bytes(self._buffer[:chunk_size])
+      del self._buffer[:chunk_size]
+      yield chunk
+
+
+def iter_archive_chunks(
+  sources: Dict[str, Path],
+  compression: Optional[str] = None,
+  compresslevel: Optional[int] = None,
+  chunk_size: int = DEFAULT_CHUNK_SIZE,
+  max_bytes: Optional[int] = None,
+  storage: Optional[Storage] = None
+) -> Iterator[bytes]:
+  """Build a zip archive in memory, yielding it in chunks as members are added
+
+  Nothing touches disk and at most about one member plus one chunk is
+  buffered, so the output can be forwarded to a client as it is produced.
+  """
+  storage = storage or get_storage()
+  _check_size(sources, max_bytes, storage)
+  _, method = resolve_compression(compression)
+  sink = _ChunkSink()
+  with zipfile.ZipFile(sink, "w", compression=method, compresslevel=compresslevel) as zipf:
+    for name, path in sources.items():
+      _write_member(zipf, name, path, storage)
+      yield from sink.drain(chunk_size)
+  yield from sink.drain(chunk_size, final=True)
+
+
+def archive_bytes(
+  sources: Dict[str, Path],
+  compression: Optional[str] = None,
+  compresslevel: Optional[int] = None,
+  max_bytes: Optional[int] = None,
+  storage: Optional[Storage] = None
+) -> bytes:
+  """Build a whole zip archive in memory"""
+  return b"".join(iter_archive_chunks(sources, compression, compresslevel, max_bytes=max_bytes, storage=storage))
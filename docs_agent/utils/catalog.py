@@ -0,0 +1,276 @@
+"""Persistent catalog of generated outputs for DocGen Suite"""
+
+import hashlib
+import io
+import itertools
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .output import candidate_directories, get_output_directory, is_internal_file, known_output_directory
+from .storage import Storage, get_storage
+
+
+logger = logging.getLogger(__name__)
+
+CATALOG_NAME = ".docgen_catalog.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+  path TEXT PRIMARY KEY,
+  doc_type TEXT NOT NULL,
+  idea_hash TEXT,
+  size INTEGER NOT NULL,
+  content_hash TEXT,
+  updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_doc_type ON artifacts (doc_type);
+CREATE INDEX IF NOT EXISTS artifacts_idea_hash ON artifacts (idea_hash);
+CREATE INDEX IF NOT EXISTS artifacts_updated_at ON artifacts (updated_at);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_COLUMNS = ("path", "doc_type", "idea_hash", "size", "content_hash", "updated_at")
+
+
+def doc_type_for(path: str) -> str:
+  """Document type of an artifact, from its file name (``frd.md.new`` is ``frd``)"""
+  return Path(path).name.split(".")[0]
+
+
+class OutputCatalog:
+  """SQLite index of the artifacts under one output root
+
+  Paths are stored relative to the root. Each thread gets its own
+  connection; WAL mode lets batch worker processes record concurrently.
+  With storage that is not local the database lives in the temp directory,
+  one per storage location.
+  """
+
+  def __init__(self, root: Path, db_path: Optional[Path] = None, storage: Optional[Storage] = None):
+    self.root = Path(root).resolve()
+    self.storage = storage or get_storage(self.root)
+    if db_path is None and not self.storage.local:
+      digest = hashlib.sha256(self.storage.location.encode("utf-8")).hexdigest()[:16]
+      db_path = Path(tempfile.gettempdir()) / f"docgen_catalog_{digest}.sqlite"
+    self.db_path = Path(db_path) if db_path else self.root / CATALOG_NAME
+    self._local = threading.local()
+    self._pid = os.getpid()
+
+  def _connect(self) -> sqlite3.Connection:
+    # Connections must not cross a fork into batch worker processes
+    if self._pid != os.getpid():
+      self._local = threading.local()
+      self._pid = os.getpid()
+    conn = getattr(self._local, "conn", None)
+    if conn is None:
+      self.db_path.parent.mkdir(parents=True, exist_ok=True)
+      conn = sqlite3.connect(str(self.db_path), timeout=30)
+      conn.row_factory = sqlite3.Row
+      conn.execute("PRAGMA journal_mode=WAL")
+      conn.execute("PRAGMA synchronous=NORMAL")
+      conn.executescript(_SCHEMA)
+      self._local.conn = conn
+    return conn
+
+  def relative(self, path: Path) -> Optional[str]:
+    """Catalog key for a path, or None if it lies outside the root"""
+    resolved = Path(path).resolve()
+    if self.root not in resolved.parents:
+      return None
+    return resolved.relative_to(self.root).as_posix()
+
+  def record(self, entries: Iterable[Dict[str, Any]]) -> int:
+    """Insert or replace artifact rows"""
+    now = time.time()
+    rows = [
+      (e["path"], e.get("doc_type") or doc_type_for(e["path"]), e.get("idea_hash"),
+       e["size"], e.get("content_hash"), e.get("updated_at", now))
+      for e in entries
+    ]
+    conn = self._connect()
+    with conn:
+      conn.executemany(f"INSERT OR REPLACE INTO artifacts ({', '.join(_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+  def record_writes(self, files: List[Dict[str, Any]], idea_hash: Optional[str] = None) -> int:
+    """Record the files from an ArtifactWriter commit report"""
+    entries = []
+    for file in files:
+      key = self.relative(Path(file["path"]))
+      if key is not None:
+        entries.append({"path": key, "idea_hash": idea_hash, "size": file["size"], "content_hash": file["hash"]})
+    return self.record(entries) if entries else 0
+
+  def _where(
+    self,
+    doc_type: Optional[str],
+    idea_hash: Optional[str],
+    prefix: Optional[str],
+    since: Optional[float]
+  ) -> Tuple[str, List[Any]]:
+    clauses, params = [], []
+    if doc_type:
+      clauses.append("doc_type = ?")
+      params.append(doc_type)
+    if idea_hash:
+      clauses.append("idea_hash = ?")
+      params.append(idea_hash)
+    if prefix:
+      clauses.append("substr(path, 1, ?) = ?")
+      params.extend([len(prefix), prefix])
+    if since is not None:
+      clauses.append("updated_at >= ?")
+      params.append(since)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+  def query(
+    self,
+    doc_type: Optional[str] = None,
+    idea_hash: Optional[str] = None,
+    prefix: Optional[str] = None,
+    since: Optional[float] = None,
+    limit: Optional[int] = None,
+    offset: int = 0
+  ) -> List[Dict[str, Any]]:
+    """Artifact rows matching the filters, ordered by path"""
+    where, params = self._where(doc_type, idea_hash, prefix, since)
+    sql = f"SELECT {', '.join(_COLUMNS)} FROM artifacts{where} ORDER BY path LIMIT ? OFFSET ?"
+    rows = self._connect().execute(sql, params + [-1 if limit is None else limit, offset])
+    return [dict(row) for row in rows]
+
+  def count(
+    self,
+    doc_type: Optional[str] = None,
+    idea_hash: Optional[str] = None,
+    prefix: Optional[str] = None,
+    since: Optional[float] = None
+  ) -> int:
+    where, params = self._where(doc_type, idea_hash, prefix, since)
+    return self._connect().execute(f"SELECT COUNT(*) FROM artifacts{where}", params).fetchone()[0]
+
+  def get(self, path: str) -> Optional[Dict[str, Any]]:
+    row = self._connect().execute(
+      f"SELECT {', '.join(_COLUMNS)} FROM artifacts WHERE path = ?", (path,)
+    ).fetchone()
+    return dict(row) if row else None
+
+  def remove(self, paths: Iterable[str]) -> None:
+    conn = self._connect()
+    with conn:
+      conn.executemany("DELETE FROM artifacts WHERE path = ?", [(path,) for path in paths])
+
+  def remove_prefix(self, prefix: str) -> int:
+    """Drop every row under a directory prefix"""
+    conn = self._connect()
+    with conn:
+      cursor = conn.execute("DELETE FROM artifacts WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))
+    return cursor.rowcount
+
+  def is_indexed(self) -> bool:
+    """Whether the existing output tree has been indexed at least once"""
+    row = self._connect().execute("SELECT value FROM meta WHERE key = 'indexed_at'").fetchone()
+    return row is not None
+
+  def rebuild(self) -> int:
+    """Index everything under the root, dropping rows for files that are gone
+
+    Files already cataloged with the same size keep their row, so only new
+    or changed files are hashed.
+    """
+    known = {row["path"]: row for row in self.query()}
+    seen, entries = set(), []
+    for item in self.storage.list(self.root):
+      path = Path(item["path"])
+      if is_internal_file(path.name):
+        continue
+      key = path.relative_to(self.root).as_posix()
+      seen.add(key)
+      row = known.get(key)
+      if row is not None and row["size"] == item["size"] and row["updated_at"] >= item["mtime"]:
+        continue
+      entries.append({
+        "path": key,
+        "idea_hash": row["idea_hash"] if row else None,
+        "size": item["size"],
+        "content_hash": self.storage.hash(path),
+        "updated_at": item["mtime"]
+      })
+    self.record(entries)
+    self.remove(key for key in known if key not in seen)
+    conn = self._connect()
+    with conn:
+      conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('indexed_at', ?)", (str(time.time()),))
+    return len(seen)
+
+
+_catalog: Optional[OutputCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def catalog_enabled() -> bool:
+  return os.getenv("DOCGEN_CATALOG", "true").lower() not in ("0", "false", "no")
+
+
+def get_catalog() -> OutputCatalog:
+  """Catalog for the current output directory and storage, at DOCGEN_CATALOG_PATH if set"""
+  global _catalog
+  root = get_output_directory().resolve()
+  storage = get_storage(root)
+  with _catalog_lock:
+    if _catalog is None or _catalog.root != root or _catalog.storage is not storage:
+      db_path = os.getenv("DOCGEN_CATALOG_PATH")
+      _catalog = OutputCatalog(root, Path(db_path) if db_path else None, storage)
+    return _catalog
+
+
+def _under_output_root(files: List[Dict[str, Any]]) -> bool:
+  """Whether any file lies under the output root, decided without creating it
+
+  Until the root is configured or probed, any candidate location counts;
+  files written elsewhere, e.g. to an Idea's own output_dir, are not cataloged.
+  """
+  known = known_output_directory()
+  roots = [known] if known is not None else candidate_directories()
+  bases = [os.path.realpath(root) + os.sep for root in roots]
+  return any(os.path.realpath(file["path"]).startswith(tuple(bases)) for file in files)
+
+
+def record_writes(files: List[Dict[str, Any]], idea_hash: Optional[str] = None) -> None:
+  """Catalog committed artifacts; a catalog failure never fails generation"""
+  if not files or not catalog_enabled() or not _under_output_root(files):
+    return
+  try:
+    get_catalog().record_writes(files, idea_hash)
+  except (sqlite3.Error, OSError) as e:
+    logger.warning("Could not update output catalog: %s", e)
+
+
+def forget_prefix(directory: Path) -> None:
+  """Drop catalog rows for a deleted output directory"""
+  if not catalog_enabled():
+    return
+  try:
+    catalog = get_catalog()
+    key = catalog.relative(directory)
+    if key is not None:
+      catalog.remove_prefix(key + "/")
+  except (sqlite3.Error, OSError) as e:
+    logger.warning("Could not update output catalog: %s", e)
+
+
+def read_lines(path: Path, start: int = 1, end: Optional[int] = None, storage: Optional[Storage] = None) -> str:
+  """Lines start..end (1-based, inclusive) of a text file, without reading the rest"""
+  stream = (storage or get_storage()).open(path)
+  with io.TextIOWrapper(stream, encoding="utf-8", errors="replace") as f:
+    return "".join(itertools.islice(f, max(start, 1) - 1, end))
+
+
+def read_bytes(path: Path, offset: int = 0, length: Optional[int] = None, storage: Optional[Storage] = None) -> str:
+  """A byte range of a text file, decoded leniently at the range edges"""
+  data = (storage or get_storage()).read_range(path, offset, length)
+  return data.decode("utf-8", errors="replace")
@@ -0,0 +1,348 @@
+"""Content-addressed incremental build support for DocGen Suite"""
+
+import functools
+import hashlib
+import importlib.util
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from jinja2 import nodes
+from pydantic import BaseModel
+from ..state import Idea
+from .render import get_template_registry
+from .safety import get_file_hash
+from .storage import Storage, get_storage
+
+
+MANIFEST_NAME = ".docgen_manifest.json"
+MANIFEST_VERSION = 3
+
+# Workflow fields steer the run, they are not document inputs
+WORKFLOW_FIELDS = {"docs", "overwrite", "output_dir", "artifacts", "incremental"}
+
+# Dependency marker for templates that use the Idea as a whole
+ALL_FIELDS = "*"
+
+# Template -> (hash of its include closure, the templates in it, its dependencies)
+_dependency_cache: Dict[str, Tuple[str, List[str], List[str]]] = {}
+_dependency_lock = threading.Lock()
+_manifest_locks: Dict[str, threading.Lock] = {}
+_manifest_locks_guard = threading.Lock()
+
+
+def _digest(data: bytes) -> str:
+  return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _canonical(value: Any) -> bytes:
+  return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def template_source(template_name: str) -> str:
+  """Read the raw source of a template"""
+  env = get_template_registry().env
+  source, _, _ = env.loader.get_source(env, template_name)
+  return source
+
+
+def _attribute_path(node: nodes.Node) -> Optional[List[str]]:
+  """Return the attribute path of an ``idea.a.b`` chain, or None"""
+  parts: List[str] = []
+  while isinstance(node, (nodes.Getattr, nodes.Getitem)):
+    if isinstance(node, nodes.Getattr):
+      parts.append(node.attr)
+    elif isinstance(node.arg, nodes.Const) and isinstance(node.arg.value, str):
+      parts.append(node.arg.value)
+    else:
+      # Dynamic subscript: only the container is known statically
+      parts = []
+    node = node.node
+  if isinstance(node, nodes.Name) and node.name == "idea":
+    return list(reversed(parts))
+  return None
+
+
+def _resolve_field(path: List[str]) -> str:
+  """Trim an attribute path to the Idea (sub)fields it reads"""
+  model = Idea
+  resolved: List[str] = []
+  for part in path:
+    field = model.model_fields.get(part)
+    if field is None:
+      break
+    resolved.append(part)
+    annotation = field.annotation
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+      model = annotation
+    else:
+      break
+  return ".".join(resolved) if resolved else ALL_FIELDS
+
+
+def _collect_dependencies(node: nodes.Node, found: Set[str], seen: Set[str]) -> None:
+  path = _attribute_path(node)
+  if path is not None:
+    found.add(_resolve_field(path))
+    inner = node
+    while isinstance(inner, (nodes.Getattr, nodes.Getitem)):
+      if isinstance(inner, nodes.Getitem):
+        _collect_dependencies(inner.arg, found, seen)
+      inner = inner.node
+    return
+  if isinstance(node, nodes.Name) and node.name == "idea" and node.ctx == "load":
+    found.add(ALL_FIELDS)
+    return
+  if isinstance(node, (nodes.Include, nodes.Extends, nodes.Import, nodes.FromImport)):
+    names = _template_names(node.template)
+    if names is None:
+      # Chosen at render time: any template, so any field
+      found.add(ALL_FIELDS)
+    for name in names or []:
+      if name not in seen:
+        found.update(_analyze(name, seen))
+  for child in node.iter_child_nodes():
+    _collect_dependencies(child, found, seen)
+
+
+def _template_names(node: nodes.Node) -> Optional[List[str]]:
+  """Names of a constant include/import target (one name or a list), else None"""
+  if isinstance(node, nodes.Const):
+    value = node.value
+    if isinstance(value, str):
+      return [value]
+    if isinstance(value, (list, tuple)) and all(isinstance(name, str) for name in value):
+      return list(value)
+  if isinstance(node, (nodes.List, nodes.Tuple)):
+    names = [_template_names(item) for item in node.items]
+    if all(name is not None and len(name) == 1 for name in names):
+      return [name[0] for name in names]
+  return None
+
+
+def _analyze(template_name: str, seen: Set[str]) -> Set[str]:
+  seen.add(template_name)
+  ast = get_template_registry().env.parse(template_source(template_name))
+  found: Set[str] = set()
+  _collect_dependencies(ast, found, seen)
+  return found
+
+
+def _closure_hash(template_names: List[str]) -> str:
+  """Hash the sources of a template and everything it includes"""
+  return _digest(_canonical({name: _digest(template_source(name).encode("utf-8")) for name in template_names}))
+
+
+def _template_info(template_name: str) -> Tuple[str, List[str]]:
+  """A template's include-closure source hash and its Idea dependencies"""
+  with _dependency_lock:
+    cached = _dependency_cache.get(template_name)
+  if cached:
+    closure_hash = _closure_hash(cached[1])
+    if closure_hash == cached[0]:
+      return closure_hash, cached[2]
+  seen: Set[str] = set()
+  found = _analyze(template_name, seen)
+  dependencies = [ALL_FIELDS] if ALL_FIELDS in found else sorted(found)
+  closure = sorted(seen)
+  closure_hash = _closure_hash(closure)
+  with _dependency_lock:
+    _dependency_cache[template_name] = (closure_hash, closure, dependencies)
+  return closure_hash, dependencies
+
+
+def template_dependencies(template_name: str) -> List[str]:
+  """List the Idea fields a template reads, from its Jinja2 syntax tree
+
+  Nested models are tracked per attribute (``context.domain``). A template
+  that uses ``idea`` as a whole depends on ``*``. Included and imported
+  templates count too, and editing any of them refreshes the result.
+  """
+  return _template_info(template_name)[1]
+
+
+def template_hash(template_name: str) -> str:
+  """Hash of a template's source together with every template it includes"""
+  return _template_info(template_name)[0]
+
+
+@functools.lru_cache(maxsize=None)
+def _module_digest(module: str) -> str:
+  # The code loaded in this process is what its outputs reflect, so one read per module
+  spec = importlib.util.find_spec(module)
+  if spec is None or not spec.origin:
+    raise ValueError(f"Cannot find the source of module '{module}'")
+  with open(spec.origin, "rb") as f:
+    return _digest(f.read())
+
+
+def code_hash(modules: Iterable[str]) -> str:
+  """Hash the source of the modules whose code builds a document ("" for none)"""
+  modules = sorted(modules)
+  if not modules:
+    return ""
+  return _digest(_canonical({module: _module_digest(module) for module in modules}))
+
+
+def dependency_map() -> Dict[str, List[str]]:
+  """Map every template in docs_agent/prompts to the Idea fields it reads"""
+  registry = get_template_registry()
+  return {
+    name: template_dependencies(name)
+    for name in registry.env.list_templates(extensions=["jinja"])
+  }
+
+
+def _content_data(idea: Idea) -> Dict[str, Any]:
+  data = idea.model_dump(mode="json", exclude=WORKFLOW_FIELDS)
+  # Templates only print the creation date, so the time of day is not an input
+  data["created_at"] = idea.created_at.date().isoformat()
+  return data
+
+
+def _lookup(data: Dict[str, Any], path: str) -> Any:
+  value: Any = data
+  for part in path.split("."):
+    value = value.get(part) if isinstance(value, dict) else None
+  return value
+
+
+def canonical_idea_json(idea: Idea) -> str:
+  """Serialize Idea content deterministically"""
+  return _canonical(_content_data(idea)).decode("utf-8")
+
+
+def compute_idea_hash(idea: Idea) -> str:
+  """Hash all document-relevant Idea content"""
+  return _digest(canonical_idea_json(idea).encode("utf-8"))
+
+
+def document_inputs(
+  template_name: str,
+  idea: Idea,
+  extra: Optional[List[str]] = None,
+  code: Optional[List[str]] = None
+) -> Dict[str, Any]:
+  """Hash everything a rendered document depends on
+
+  Returns the template hash (covering included templates), the source hash
+  of the ``code`` modules that build the document, one hash per Idea field
+  the template reads (plus any ``extra`` fields read by that code) and the
+  combined inputs hash.
+  """
+  data = _content_data(idea)
+  source_hash, dependencies = _template_info(template_name)
+  if extra and ALL_FIELDS not in dependencies:
+    dependencies = sorted(set(dependencies) | set(extra))
+  paths = sorted(data) if ALL_FIELDS in dependencies else dependencies
+  fields = {path: _digest(_canonical(_lookup(data, path))) for path in paths}
+  code_digest = code_hash(code or [])
+  combined = _canonical({"template": template_name, "source": source_hash, "code": code_digest, "fields": fields})
+  return {
+    "template_hash": source_hash,
+    "code_hash": code_digest,
+    "fields": fields,
+    "inputs_hash": _digest(combined)
+  }
+
+
+def inputs_hash(template_name: str, idea: Idea) -> str:
+  return document_inputs(template_name, idea)["inputs_hash"]
+
+
+def rebuild_reason(entry: Optional[Dict[str, Any]], inputs: Dict[str, Any]) -> Tuple[str, List[str]]:
+  """Explain whether a document must be rebuilt
+
+  Returns one of ``new``, ``template_changed``, ``code_changed``,
+  ``inputs_changed``, ``output_missing``, ``output_modified`` or
+  ``up_to_date``, plus the Idea fields that changed. The document's
+  companion ``parts`` files are checked like the document itself.
+  """
+  if not entry:
+    return "new", []
+  if entry.get("template_hash") != inputs["template_hash"]:
+    return "template_changed", []
+  if entry.get("code_hash", "") != inputs["code_hash"]:
+    return "code_changed", []
+  if entry.get("inputs_hash") != inputs["inputs_hash"]:
+    previous = entry.get("fields", {})
+    changed = sorted(
+      path for path in set(previous) | set(inputs["fields"])
+      if previous.get(path) != inputs["fields"].get(path)
+    )
+    return "inputs_changed", changed
+  for output in [entry, *entry.get("parts", [])]:
+    content_hash = get_file_hash(Path(output["path"]))
+    if not content_hash:
+      return "output_missing", []
+    if content_hash != output.get("content_hash"):
+      return "output_modified", []
+  return "up_to_date", []
+
+
+def _lock_for(output_dir: Path) -> threading.Lock:
+  key = str(Path(output_dir).resolve())
+  with _manifest_locks_guard:
+    return _manifest_locks.setdefault(key, threading.Lock())
+
+
+def read_manifest(output_dir: Path, storage: Optional[Storage] = None) -> Dict[str, Any]:
+  """Load the build manifest of an output directory"""
+  raw = (storage or get_storage()).read(Path(output_dir) / MANIFEST_NAME)
+  try:
+    data = json.loads(raw) if raw is not None else None
+  except ValueError:
+    data = None
+  if not isinstance(data, dict):
+    return {"version": MANIFEST_VERSION, "documents": {}}
+  if data.get("version") != MANIFEST_VERSION:
+    return {"version": MANIFEST_VERSION, "documents": {}}
+  return data
+
+
+def manifest_entry(output_dir: Path, key: str) -> Optional[Dict[str, Any]]:
+  with _lock_for(output_dir):
+    return read_manifest(output_dir)["documents"].get(key)
+
+
+def record_manifest_entries(records: List[Dict[str, Any]], storage: Optional[Storage] = None) -> None:
+  """Store build records, replacing each output directory's manifest atomically once
+
+  Each record holds record_manifest_entry's arguments. A run's writer
+  stores its records this way after its files are in place.
+  """
+  storage = storage or get_storage()
+  by_dir: Dict[str, List[Dict[str, Any]]] = {}
+  for record in records:
+    by_dir.setdefault(str(record["output_dir"]), []).append(record)
+  for directory, group in by_dir.items():
+    output_dir = Path(directory)
+    with _lock_for(output_dir):
+      manifest = read_manifest(output_dir, storage)
+      for record in group:
+        manifest["idea_hash"] = record["idea_hash"]
+        manifest["documents"][record["key"]] = {**record["entry"], "updated_at": datetime.now().isoformat()}
+      storage.write(output_dir / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+
+def record_manifest_entry(output_dir: Path, key: str, entry: Dict[str, Any], idea_hash: str) -> None:
+  """Store one document's build record, replacing the manifest atomically"""
+  record_manifest_entries([{"output_dir": str(output_dir), "key": key, "entry": entry, "idea_hash": idea_hash}])
+
+
+def build_report(artifacts: List[Dict[str, Any]]) -> Dict[str, Any]:
+  """Summarize why each document of an incremental run was rebuilt or skipped"""
+  flat: List[Dict[str, Any]] = []
+  for artifact in artifacts:
+    flat.extend(artifact.get("artifacts", [artifact]))
+  documents = {
+    artifact["template"]: {
+      "skipped": artifact.get("skipped", False),
+      "reason": artifact.get("reason"),
+      "changed_fields": artifact.get("changed_fields", [])
+    }
+    for artifact in flat
+  }
+  skipped = sum(1 for doc in documents.values() if doc["skipped"])
+  return {"rebuilt": len(documents) - skipped, "skipped": skipped, "documents": documents}
@@ -0,0 +1,112 @@
+"""Output directory resolution for DocGen Suite"""
+
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+_resolved: Optional[Path] = None
+_resolved_lock = threading.Lock()
+
+# Bookkeeping files kept next to the outputs that are not artifacts
+_INTERNAL_PREFIXES = (".docgen_", ".test_write")
+
+
+def is_internal_file(name: str) -> bool:
+  """Whether a file name is a manifest, catalog or temp file rather than an artifact"""
+  return name.startswith(_INTERNAL_PREFIXES) or (name.startswith(".") and name.endswith(".tmp"))
+
+
+def candidate_directories() -> List[Path]:
+  """Output locations to probe, in order of preference"""
+  return [
+    # 1. Relative to current working directory
+    Path.cwd() / "docs_agent" / "outputs",
+    # 2. Relative to the package
+    Path(__file__).parent.parent / "outputs",
+    # 3. In current working directory
+    Path.cwd() / "outputs",
+    # 4. In user's home directory as fallback
+    Path.home() / "docgen_outputs"
+  ]
+
+
+def _tenant_env_name(tenant: str) -> str:
+  return "DOCGEN_OUTPUT_ROOT_" + re.sub(r"[^A-Z0-9]+", "_", tenant.upper()).strip("_")
+
+
+def configured_output_root(tenant: Optional[str] = None) -> Optional[Path]:
+  """Explicit output root from the environment, if any
+
+  ``DOCGEN_OUTPUT_ROOT_<TENANT>`` wins for a tenant, then
+  ``DOCGEN_OUTPUT_ROOT``. Configured roots are trusted and never probed.
+  """
+  tenant = tenant or os.getenv("DOCGEN_TENANT") or None
+  if tenant:
+    value = os.getenv(_tenant_env_name(tenant))
+    if value:
+      return Path(value)
+  value = os.getenv("DOCGEN_OUTPUT_ROOT")
+  return Path(value) if value else None
+
+
+def _probe() -> Path:
+  for path in candidate_directories():
+    try:
+      # Create directory if it doesn't exist
+      path.mkdir(parents=True, exist_ok=True)
+      # Test if we can write to it
+      test_file = path / ".test_write"
+      test_file.write_text("test", encoding="utf-8")
+      test_file.unlink()  # Clean up test file
+      return path
+    except (OSError, PermissionError):
+      continue
+
+  # If all else fails, use current working directory
+  fallback_path = Path.cwd() / "docgen_outputs"
+  fallback_path.mkdir(parents=True, exist_ok=True)
+  return fallback_path
+
+
+def get_output_directory(tenant: Optional[str] = None) -> Path:
+  """Get a writable output directory, probing candidates only once per process"""
+  global _resolved
+  configured = configured_output_root(tenant)
+  if configured is not None:
+    return configured
+  with _resolved_lock:
+    if _resolved is None:
+      _resolved = _probe()
+    return _resolved
+
+
+def known_output_directory(tenant: Optional[str] = None) -> Optional[Path]:
+  """The configured or already probed output directory; never probes"""
+  configured = configured_output_root(tenant)
+  if configured is not None:
+    return configured
+  with _resolved_lock:
+    return _resolved
+
+
+def invalidate_output_directory() -> None:
+  """Forget the probed directory so the next lookup probes again"""
+  global _resolved
+  with _resolved_lock:
+    _resolved = None
+
+
+def with_output_directory(action: Callable[[Path], T], tenant: Optional[str] = None) -> T:
+  """Run an action against the output directory, re-probing once if writing fails"""
+  try:
+    return action(get_output_directory(tenant))
+  except OSError:
+    if configured_output_root(tenant) is not None:
+      raise
+    invalidate_output_directory()
+    return action(get_output_directory(tenant))
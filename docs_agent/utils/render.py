@@ -1,35 +1,152 @@
 """Template rendering utilities for DocGen Suite"""
 
+import os
+import threading
 from pathlib import Path
-from typing import Any, Dict
-from jinja2 import Environment, FileSystemLoader, StrictUndefined
+from typing import Any, Dict, List, Optional
+from jinja2 import (
+  BytecodeCache,
+  Environment,
+  FileSystemBytecodeCache,
+  FileSystemLoader,
+  StrictUndefined,
+  Template
+)
+
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "prompts"
+
+
+class LayeredBytecodeCache(BytecodeCache):
+  """In-memory bytecode cache with an optional on-disk layer underneath"""
+
+  def __init__(self, directory: Optional[str] = None):
+    self._memory: Dict[str, bytes] = {}
+    self._lock = threading.Lock()
+    self.directory = directory
+    self._disk: Optional[FileSystemBytecodeCache] = None
+    if directory:
+      Path(directory).mkdir(parents=True, exist_ok=True)
+      self._disk = FileSystemBytecodeCache(directory)
+
+  def load_bytecode(self, bucket) -> None:
+    with self._lock:
+      data = self._memory.get(bucket.key)
+    if data is not None:
+      bucket.bytecode_from_string(data)
+      return
+    if self._disk is not None:
+      self._disk.load_bytecode(bucket)
+      if bucket.code is not None:
+        with self._lock:
+          self._memory[bucket.key] = bucket.bytecode_to_string()
+
+  def dump_bytecode(self, bucket) -> None:
+    with self._lock:
+      self._memory[bucket.key] = bucket.bytecode_to_string()
+    if self._disk is not None:
+      self._disk.dump_bytecode(bucket)
+
+  def clear(self) -> None:
+    with self._lock:
+      self._memory.clear()
+    if self._disk is not None:
+      self._disk.clear()
+
+
+class TemplateRegistry:
+  """Process-wide registry of compiled templates sharing one environment"""
+
+  def __init__(self, templates_dir: Path = TEMPLATES_DIR, bytecode_dir: Optional[str] = None):
+    self.templates_dir = Path(templates_dir)
+    self.bytecode_cache = LayeredBytecodeCache(bytecode_dir)
+    # auto_reload makes every lookup compare the source mtime, so edited
+    # templates are recompiled without restarting the process
+    self.env = Environment(
+      loader=FileSystemLoader(str(self.templates_dir)),
+      undefined=StrictUndefined,
+      trim_blocks=True,
+      lstrip_blocks=True,
+      auto_reload=True,
+      bytecode_cache=self.bytecode_cache
+    )
+    self._templates: Dict[str, Template] = {}
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+
+  def get(self, template_name: str) -> Template:
+    """Return a compiled template, reloading it if the source changed"""
+    with self._lock:
+      template = self._templates.get(template_name)
+      if template is not None and template.is_up_to_date:
+        self.hits += 1
+        return template
+      self.misses += 1
+    template = self.env.get_template(template_name)
+    with self._lock:
+      self._templates[template_name] = template
+    return template
+
+  def render(self, template_name: str, data: Dict[str, Any]) -> str:
+    return self.get(template_name).render(**data)
+
+  def warm(self) -> List[str]:
+    """Precompile every template in the templates directory"""
+    names = self.env.list_templates(extensions=["jinja"])
+    for name in names:
+      self.get(name)
+    return names
+
+  def stats(self) -> Dict[str, Any]:
+    with self._lock:
+      lookups = self.hits + self.misses
+      return {
+        "hits": self.hits,
+        "misses": self.misses,
+        "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        "cached_templates": sorted(self._templates),
+        "bytecode_dir": self.bytecode_cache.directory
+      }
+
+  def clear(self) -> None:
+    with self._lock:
+      self._templates.clear()
+      self.hits = 0
+      self.misses = 0
+    self.bytecode_cache.clear()
+
+
+_registry: Optional[TemplateRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_template_registry() -> TemplateRegistry:
+  """Get the shared template registry, creating it on first use"""
+  global _registry
+  if _registry is None:
+    with _registry_lock:
+      if _registry is None:
+        _registry = TemplateRegistry(bytecode_dir=os.getenv("DOCGEN_TEMPLATE_CACHE_DIR") or None)
+  return _registry
+
+
+def warm_templates() -> List[str]:
+  """Precompile all templates in docs_agent/prompts"""
+  return get_template_registry().warm()
+
+
+def template_cache_stats() -> Dict[str, Any]:
+  """Get template cache hit/miss counters"""
+  return get_template_registry().stats()
 
 
 def render_template(template_name: str, data: Dict[str, Any]) -> str:
   """Render a Jinja2 template with strict undefined handling"""
-  # Get the templates directory
-  templates_dir = Path(__file__).parent.parent / "prompts"
-  
-  # Create Jinja2 environment with strict undefined
-  env = Environment(
-    loader=FileSystemLoader(str(templates_dir)),
-    undefined=StrictUndefined,
-    trim_blocks=True,
-    lstrip_blocks=True
-  )
-  
-  # Load and render template
-  template = env.get_template(template_name)
-  return template.render(**data)
+  return get_template_registry().render(template_name, data)
 
 
 def render_template_from_string(template_string: str, data: Dict[str, Any]) -> str:
   """Render a Jinja2 template from string content"""
-  env = Environment(
-    undefined=StrictUndefined,
-    trim_blocks=True,
-    lstrip_blocks=True
-  )
-  
-  template = env.from_string(template_string)
+  template = get_template_registry().env.from_string(template_string)
   return template.render(**data)
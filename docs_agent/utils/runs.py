@@ -0,0 +1,225 @@
+"""Run-scoped output directories for DocGen Suite"""
+
+import contextlib
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from .catalog import forget_prefix, record_writes
+from .incremental import MANIFEST_NAME, compute_idea_hash
+from .output import is_internal_file
+from .storage import get_storage
+from .writer import content_digest
+
+
+LATEST_NAME = ".docgen_latest"
+PROJECT_LATEST_PREFIX = ".docgen_latest_project_"
+RUN_MARKER = ".docgen_run.json"
+LAYOUTS = ("runs", "flat")
+
+
+def output_layout(layout: Optional[str] = None) -> str:
+  """Output layout from the argument or DOCGEN_OUTPUT_LAYOUT
+
+  ``runs`` writes each generation to ``<idea_hash>/<run_id>/`` under the
+  output root; ``flat`` writes straight into the root as before.
+  """
+  layout = (layout or os.getenv("DOCGEN_OUTPUT_LAYOUT") or "runs").lower()
+  if layout not in LAYOUTS:
+    raise ValueError(f"Unknown output layout '{layout}', expected one of: {', '.join(LAYOUTS)}")
+  return layout
+
+
+def new_run_id() -> str:
+  """Sortable, unique run id: UTC timestamp plus a random suffix"""
+  return time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()) + "-" + uuid.uuid4().hex[:8]
+
+
+def latest_run(idea_dir: Path) -> Optional[Path]:
+  """Directory of the most recent successful run for an Idea"""
+  storage = get_storage()
+  raw = storage.read(Path(idea_dir) / LATEST_NAME)
+  run_id = raw.decode("utf-8").strip() if raw else ""
+  if not run_id:
+    return None
+  run_dir = Path(idea_dir) / run_id
+  # A run becomes the latest only after its marker is written
+  return run_dir if storage.exists(run_dir / RUN_MARKER) else None
+
+
+def set_latest(idea_dir: Path, run_id: str) -> None:
+  """Point an Idea's latest run at run_id, atomically"""
+  get_storage().write(Path(idea_dir) / LATEST_NAME, run_id.encode("utf-8"))
+
+
+def project_key(idea: Any) -> str:
+  """Stable key for an Idea's project, from its project name
+
+  Unlike the Idea hash it survives edits, so an edited Idea's run can
+  start from the project's previous run.
+  """
+  return content_digest(idea.context.project_name.strip().lower().encode("utf-8"))
+
+
+def latest_project_run(root: Path, key: str) -> Optional[Path]:
+  """Directory of the most recent successful run of a project, whatever its Idea hash"""
+  storage = get_storage()
+  raw = storage.read(Path(root) / f"{PROJECT_LATEST_PREFIX}{key}")
+  relative = raw.decode("utf-8").strip() if raw else ""
+  if not relative:
+    return None
+  run_dir = Path(root) / relative
+  # The run is also its Idea's latest, which retention never deletes
+  return run_dir if storage.exists(run_dir / RUN_MARKER) else None
+
+
+def set_latest_project_run(root: Path, key: str, run_dir: Path) -> None:
+  """Point a project's latest run at run_dir, atomically"""
+  relative = Path(run_dir).relative_to(root).as_posix()
+  get_storage().write(Path(root) / f"{PROJECT_LATEST_PREFIX}{key}", relative.encode("utf-8"))
+
+
+def list_runs(idea_dir: Path) -> List[Dict[str, Any]]:
+  """Runs for one Idea, oldest first"""
+  idea_dir = Path(idea_dir)
+  found: Dict[str, Dict[str, Any]] = {}
+  for item in get_storage().list(idea_dir):
+    parts = Path(item["path"]).relative_to(idea_dir).parts
+    if len(parts) < 2 or parts[0].startswith("."):
+      continue
+    run = found.setdefault(parts[0], {"modified_at": 0.0, "complete": False})
+    run["modified_at"] = max(run["modified_at"], item["mtime"])
+    run["complete"] = run["complete"] or parts[1:] == (RUN_MARKER,)
+  latest = latest_run(idea_dir) if found else None
+  return [
+    {
+      "run_id": run_id,
+      "path": str(idea_dir / run_id),
+      "modified_at": run["modified_at"],
+      "complete": run["complete"],
+      "latest": latest is not None and run_id == latest.name
+    }
+    for run_id, run in sorted(found.items())
+  ]
+
+
+def retention_policy() -> Dict[str, float]:
+  """Runs kept per Idea, from DOCGEN_RUN_KEEP and DOCGEN_RUN_MAX_AGE_DAYS (0 disables either)"""
+  return {
+    "keep": int(os.getenv("DOCGEN_RUN_KEEP", "10")),
+    "max_age_days": float(os.getenv("DOCGEN_RUN_MAX_AGE_DAYS", "0"))
+  }
+
+
+def prune_runs(idea_dir: Path, keep: Optional[int] = None, max_age_days: Optional[float] = None) -> List[str]:
+  """Delete runs beyond the newest ``keep`` or older than ``max_age_days``
+
+  Only completed runs count towards ``keep``, so runs still in progress
+  are safe; the age limit also clears runs abandoned by a crash. The latest
+  run is never deleted. Returns the removed run ids.
+  """
+  policy = retention_policy()
+  keep = policy["keep"] if keep is None else keep
+  max_age_days = policy["max_age_days"] if max_age_days is None else max_age_days
+
+  runs = [run for run in list_runs(idea_dir) if not run["latest"]]
+  doomed = set()
+  if keep:
+    # The latest run counts towards keep
+    complete = [run for run in runs if run["complete"]]
+    doomed.update(run["run_id"] for run in complete[:max(0, len(complete) - (keep - 1))])
+  if max_age_days:
+    cutoff = time.time() - max_age_days * 86400
+    doomed.update(run["run_id"] for run in runs if run["modified_at"] < cutoff)
+
+  for run_id in sorted(doomed):
+    run_dir = Path(idea_dir) / run_id
+    get_storage().delete_prefix(run_dir)
+    forget_prefix(run_dir)
+  return sorted(doomed)
+
+
+def seed_run(run_dir: Path, previous: Optional[Path], idea_hash: Optional[str] = None) -> int:
+  """Start a run from the previous run's files so incremental builds can skip them
+
+  Local files are hard-linked where possible and object stores copy
+  server-side. Writes replace files atomically, so the previous run is
+  never modified. The incremental manifest is copied with its paths pointed
+  at the new run.
+  """
+  storage = get_storage()
+  storage.makedirs(run_dir)
+  if previous is None:
+    return 0
+  seeded = []
+  for item in storage.list(previous):
+    path = Path(item["path"])
+    if path.parent != previous or is_internal_file(path.name):
+      continue
+    target = run_dir / path.name
+    storage.copy(path, target)
+    seeded.append({"path": str(target), "size": item["size"], "hash": storage.hash(target)})
+  record_writes(seeded, idea_hash)
+
+  raw = storage.read(previous / MANIFEST_NAME)
+  try:
+    manifest = json.loads(raw) if raw is not None else None
+  except ValueError:
+    manifest = None
+  if not isinstance(manifest, dict):
+    return len(seeded)
+  for entry in manifest.get("documents", {}).values():
+    if "path" in entry:
+      entry["path"] = str(run_dir / Path(entry["path"]).name)
+  storage.write(run_dir / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+  return len(seeded)
+
+
+@contextlib.contextmanager
+def run_directory(
+  root: Path,
+  idea: Any,
+  layout: Optional[str] = None,
+  seed: bool = False
+) -> Iterator[Dict[str, Any]]:
+  """Allocate the directory one generation writes to
+
+  In the ``runs`` layout a fresh ``<idea_hash>/<run_id>/`` directory is
+  used; it becomes the Idea's latest run only if the block succeeds, and
+  old runs are then pruned. A failed run is removed. Because every run
+  starts empty, the ``.new`` collision rule is not needed there and
+  ``isolated`` tells callers to overwrite.
+
+  With ``seed`` the run starts from the previous run of the same Idea, or
+  else of the same project (see ``project_key``), so incremental builds of
+  an edited Idea only rebuild the documents its changed fields affect.
+  """
+  root = Path(root)
+  if output_layout(layout) == "flat":
+    yield {"layout": "flat", "path": root, "isolated": False}
+    return
+
+  idea_hash = compute_idea_hash(idea)
+  idea_dir = root / idea_hash
+  run_id = new_run_id()
+  run_dir = idea_dir / run_id
+  project = project_key(idea)
+  if seed:
+    seed_run(run_dir, latest_run(idea_dir) or latest_project_run(root, project), idea_hash)
+  try:
+    yield {"layout": "runs", "idea_hash": idea_hash, "run_id": run_id, "path": run_dir, "isolated": True}
+  except BaseException:
+    get_storage().delete_prefix(run_dir)
+    forget_prefix(run_dir)
+    raise
+  get_storage().write(run_dir / RUN_MARKER, json.dumps({"run_id": run_id, "finished_at": time.time()}).encode("utf-8"))
+  set_latest(idea_dir, run_id)
+  set_latest_project_run(root, project, run_dir)
+  prune_runs(idea_dir)
+
+
+def describe_run(run: Dict[str, Any]) -> Dict[str, Any]:
+  """JSON-friendly summary of a run_directory allocation"""
+  return {key: str(value) if isinstance(value, Path) else value for key, value in run.items() if key != "isolated"}
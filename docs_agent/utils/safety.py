@@ -1,32 +1,32 @@
 """Safe file writing utilities for DocGen Suite"""
 
-import hashlib
 from pathlib import Path
 from typing import Optional
+from .writer import ArtifactWriter, content_digest
 
 
 def safe_write(path: Path, text: str, overwrite: bool = False) -> Path:
-  """Safely write text to file with collision handling"""
-  # Ensure parent directory exists
-  path.parent.mkdir(parents=True, exist_ok=True)
-  
-  # If file exists and overwrite is False, use .new suffix
-  if path.exists() and not overwrite:
-    new_path = path.with_suffix(path.suffix + ".new")
-    path = new_path
-  
-  # Write content
-  path.write_text(text, encoding="utf-8")
-  return path
+  """Safely write text to file with collision handling
+
+  If the file exists with different content and overwrite is False, the
+  text goes to a ``.new`` sibling. Identical content is not rewritten, and
+  every write lands atomically via a temp file and rename.
+  """
+  writer = ArtifactWriter()
+  final_path = writer.stage(path, text, overwrite)
+  writer.commit()
+  return final_path
+
+
+def content_hash(text: str) -> str:
+  """Get SHA256 hash of text, matching get_file_hash for the written file"""
+  return content_digest(text.encode("utf-8"))
 
 
 def get_file_hash(path: Path) -> str:
-  """Get SHA256 hash of file content"""
-  if not path.exists():
-    return ""
-  
-  content = path.read_bytes()
-  return hashlib.sha256(content).hexdigest()[:16]
+  """Get SHA256 hash of an artifact's content from storage, or "" if it is missing"""
+  from .storage import get_storage
+  return get_storage().hash(path)
 
 
 def safe_append(path: Path, text: str) -> Path:
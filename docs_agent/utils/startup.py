@@ -0,0 +1,106 @@
+"""Startup helpers: background warm-up and import-time profiling"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+PREWARM_MODES = ("background", "startup", "off")
+
+
+def prewarm_mode() -> str:
+  """When servers compile templates and graphs, from DOCGEN_PREWARM"""
+  mode = os.getenv("DOCGEN_PREWARM", "background").lower()
+  return mode if mode in PREWARM_MODES else "background"
+
+
+def start_prewarm(warm: Callable[[], None], mode: Optional[str] = None) -> Optional[threading.Thread]:
+  """Run a warm-up now, on a daemon thread, or not at all
+
+  In the background the server answers its first calls while the warm-up
+  runs; a tool that needs something still being built waits for it.
+  """
+  mode = mode or prewarm_mode()
+  if mode == "off":
+    return None
+  if mode == "startup":
+    warm()
+    return None
+  thread = threading.Thread(target=warm, name="docgen-prewarm", daemon=True)
+  thread.start()
+  return thread
+
+
+def _parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+  rows = []
+  for line in stderr.splitlines():
+    if not line.startswith("import time:") or "imported package" in line:
+      continue
+    self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+    # Nested imports are indented two spaces per level after one separator space
+    level = (len(name) - len(name.lstrip()) - 1) // 2
+    rows.append({"module": name.strip(), "level": level, "self": int(self_us) / 1e6, "cumulative": int(cumulative_us) / 1e6})
+  return rows
+
+
+def profile_imports(modules: List[str], top: int = 15) -> Dict[str, Any]:
+  """Import modules in a fresh interpreter under ``-X importtime`` and summarize it
+
+  Reports the interpreter's wall time, each requested module's cumulative
+  import time, and the packages and modules that cost the most on their own.
+  """
+  env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(PROJECT_ROOT), os.getenv("PYTHONPATH")]))}
+  code = "; ".join(f"import {module}" for module in modules)
+  start = time.perf_counter()
+  proc = subprocess.run(
+    [sys.executable, "-X", "importtime", "-c", code],
+    cwd=str(PROJECT_ROOT), env=env, capture_output=True, text=True
+  )
+  wall = time.perf_counter() - start
+  if proc.returncode != 0:
+    raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit code {proc.returncode}")
+
+  rows = _parse_importtime(proc.stderr)
+  packages: Dict[str, float] = {}
+  for row in rows:
+    package = row["module"].split(".")[0]
+    packages[package] = packages.get(package, 0.0) + row["self"]
+  requested = {row["module"]: row["cumulative"] for row in rows if row["module"] in modules}
+  return {
+    "modules": modules,
+    "wall": round(wall, 6),
+    "imports": round(sum(row["cumulative"] for row in rows if row["level"] == 0), 6),
+    "count": len(rows),
+    "requested": {module: round(requested.get(module, 0.0), 6) for module in modules},
+    "packages": [
+      {"package": name, "self": round(seconds, 6)}
+      for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[:top]
+    ],
+    "slowest": [
+      {"module": row["module"], "self": round(row["self"], 6), "cumulative": round(row["cumulative"], 6)}
+      for row in sorted(rows, key=lambda row: -row["self"])[:top]
+    ]
+  }
+
+
+def format_import_report(report: Dict[str, Any]) -> str:
+  """Human-readable view of profile_imports"""
+  lines = [
+    f"Import profile for {', '.join(report['modules'])}",
+    f"  interpreter wall time {report['wall'] * 1000:9.1f} ms",
+    f"  imports               {report['imports'] * 1000:9.1f} ms across {report['count']} modules"
+  ]
+  lines += [f"  {module:<22}{seconds * 1000:9.1f} ms" for module, seconds in report["requested"].items()]
+  lines.append("Packages by own import time:")
+  lines += [f"  {p['package']:<40}{p['self'] * 1000:9.1f} ms" for p in report["packages"]]
+  lines.append("Slowest modules (own / cumulative):")
+  lines += [
+    f"  {m['module']:<40}{m['self'] * 1000:9.1f} ms {m['cumulative'] * 1000:9.1f} ms"
+    for m in report["slowest"]
+  ]
+  return "\n".join(lines)
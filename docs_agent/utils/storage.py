@@ -0,0 +1,519 @@
+"""Artifact storage backends for DocGen Suite
+
+Every artifact read and write goes through a Storage. Callers keep using
+paths under the output root; object stores map them to keys relative to
+that root. ``DOCGEN_STORAGE`` selects the backend:
+
+- ``local`` writes files atomically under the output directory
+- ``memory`` keeps objects in this process, for tests and benchmarks
+- ``s3`` stores objects in ``DOCGEN_BUCKET`` with a pooled client,
+  concurrent uploads and multipart transfers for large bundles; set
+  ``DOCGEN_S3_ENDPOINT_URL`` for MinIO or a moto server
+"""
+
+import abc
+import contextlib
+import io
+import os
+import shutil
+import stat as stat_module
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+from .output import candidate_directories, get_output_directory, known_output_directory
+from .writer import atomic_write, content_digest, file_mode, fsync_directory
+
+
+STORAGE_BACKENDS = ("local", "memory", "s3")
+
+MIB = 1024 * 1024
+
+
+def storage_backend() -> str:
+  """Configured storage backend, from DOCGEN_STORAGE"""
+  return os.getenv("DOCGEN_STORAGE", "local").lower()
+
+
+class Storage(abc.ABC):
+  """Reads and writes artifacts addressed by their path under ``root``
+
+  ``local`` backends can be used through the filesystem directly (temp
+  files renamed into place, hard links, directory walks). ``shared``
+  backends are visible to other processes, such as render pool and batch
+  workers. ``stat`` and ``list`` report ``size``, ``mtime`` and ``mtime_ns``.
+  Backends implement read, write, stat, list and delete_prefix; the other
+  operations are built on them and may be overridden.
+  """
+
+  name = "storage"
+  local = False
+  shared = True
+
+  def __init__(self, root: Path):
+    self.root = Path(root).resolve()
+    # Paths are usually built from the root as given, so most keys need no resolve()
+    self._prefixes = {os.path.normpath(os.path.abspath(root)), str(self.root)}
+
+  def key(self, path: Path) -> str:
+    """Key of a path relative to the root ("" for the root itself)"""
+    normalized = os.path.normpath(os.fspath(path))
+    for prefix in self._prefixes:
+      if normalized == prefix:
+        return ""
+      if normalized.startswith(prefix + os.sep):
+        return normalized[len(prefix) + 1:].replace(os.sep, "/")
+    resolved = Path(path).resolve()
+    if resolved == self.root:
+      return ""
+    if self.root not in resolved.parents:
+      raise ValueError(f"{path} is outside the storage root {self.root}")
+    return resolved.relative_to(self.root).as_posix()
+
+  @property
+  def location(self) -> str:
+    return str(self.root)
+
+  @abc.abstractmethod
+  def read(self, path: Path) -> Optional[bytes]:
+    """Content of an object, or None if it does not exist"""
+
+  def open(self, path: Path) -> BinaryIO:
+    """Binary stream of an object; raises FileNotFoundError if it does not exist"""
+    data = self.read(path)
+    if data is None:
+      raise FileNotFoundError(f"Document not found: {path}")
+    return io.BytesIO(data)
+
+  def read_range(self, path: Path, offset: int = 0, length: Optional[int] = None) -> bytes:
+    """A byte range of an object"""
+    with self.open(path) as f:
+      f.seek(offset)
+      return f.read(-1 if length is None else length)
+
+  @abc.abstractmethod
+  def write(self, path: Path, data: bytes, fsync: bool = False) -> None:
+    """Store an object, replacing any previous content"""
+
+  def write_many(self, items: Dict[Path, bytes], fsync: bool = False) -> Dict[Path, float]:
+    """Write several objects and return the seconds each write took"""
+    elapsed = {}
+    for path, data in items.items():
+      start = time.perf_counter()
+      self.write(path, data, fsync)
+      elapsed[path] = round(time.perf_counter() - start, 6)
+    return elapsed
+
+  def upload(self, path: Path, source: BinaryIO) -> None:
+    """Store a large object from a stream, such as an archive bundle"""
+    self.write(path, source.read())
+
+  @abc.abstractmethod
+  def stat(self, path: Path) -> Optional[Dict[str, Any]]:
+    """Size and modification time of an object, or None if it does not exist"""
+
+  def exists(self, path: Path) -> bool:
+    return self.stat(path) is not None
+
+  def hash(self, path: Path) -> str:
+    """Content digest of an object, or "" if it does not exist"""
+    data = self.read(path)
+    return content_digest(data) if data is not None else ""
+
+  @abc.abstractmethod
+  def list(self, directory: Path) -> Iterator[Dict[str, Any]]:
+    """Every object under a directory, recursively, with its path and stat"""
+
+  def copy(self, source: Path, target: Path) -> None:
+    data = self.read(source)
+    if data is None:
+      raise FileNotFoundError(f"Document not found: {source}")
+    self.write(target, data)
+
+  @abc.abstractmethod
+  def delete_prefix(self, directory: Path) -> int:
+    """Delete every object under a directory and return how many were removed"""
+
+  def makedirs(self, directory: Path) -> None:
+    """Create a directory where the backend has them"""
+
+
+class LocalStorage(Storage):
+  """Files under the output directory; any absolute path is accepted"""
+
+  name = "local"
+  local = True
+
+  def read(self, path: Path) -> Optional[bytes]:
+    try:
+      return Path(path).read_bytes()
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+      return None
+
+  def open(self, path: Path) -> BinaryIO:
+    path = Path(path)
+    if not path.is_file():
+      raise FileNotFoundError(f"Document not found: {path}")
+    return open(path, "rb")
+
+  def write(self, path: Path, data: bytes, fsync: bool = False) -> None:
+    atomic_write(Path(path), data, fsync)
+
+  def write_many(self, items: Dict[Path, bytes], fsync: bool = False) -> Dict[Path, float]:
+    elapsed = super().write_many(items, fsync)
+    if fsync:
+      for directory in {Path(path).parent for path in items}:
+        fsync_directory(directory)
+    return elapsed
+
+  def upload(self, path: Path, source: BinaryIO) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+      os.fchmod(fd, file_mode(path))
+      with os.fdopen(fd, "wb") as f:
+        shutil.copyfileobj(source, f, MIB)
+      os.replace(tmp_name, path)
+    except BaseException:
+      with contextlib.suppress(OSError):
+        os.unlink(tmp_name)
+      raise
+
+  def stat(self, path: Path) -> Optional[Dict[str, Any]]:
+    try:
+      st = os.stat(path)
+    except OSError:
+      return None
+    if not stat_module.S_ISREG(st.st_mode):
+      return None
+    return {"size": st.st_size, "mtime": st.st_mtime, "mtime_ns": st.st_mtime_ns}
+
+  def list(self, directory: Path) -> Iterator[Dict[str, Any]]:
+    for parent, _, filenames in os.walk(directory):
+      for filename in sorted(filenames):
+        path = Path(parent) / filename
+        stat = self.stat(path)
+        if stat is not None:
+          yield {"path": path, **stat}
+
+  def copy(self, source: Path, target: Path) -> None:
+    """Hard-link where possible; writes replace files, so the source never changes"""
+    Path(target).parent.mkdir(parents=True, exist_ok=True)
+    try:
+      os.link(source, target)
+    except OSError:
+      shutil.copy2(source, target)
+
+  def delete_prefix(self, directory: Path) -> int:
+    count = sum(1 for _ in self.list(directory))
+    shutil.rmtree(directory, ignore_errors=True)
+    return count
+
+  def makedirs(self, directory: Path) -> None:
+    Path(directory).mkdir(parents=True, exist_ok=True)
+
+
+class MemoryStorage(Storage):
+  """Objects held in a dict, private to this process"""
+
+  name = "memory"
+  shared = False
+
+  def __init__(self, root: Path):
+    super().__init__(root)
+    self._objects: Dict[str, Tuple[bytes, int]] = {}
+    self._lock = threading.Lock()
+
+  @property
+  def location(self) -> str:
+    return f"memory://{self.root}"
+
+  def read(self, path: Path) -> Optional[bytes]:
+    with self._lock:
+      item = self._objects.get(self.key(path))
+    return item[0] if item else None
+
+  def write(self, path: Path, data: bytes, fsync: bool = False) -> None:
+    key = self.key(path)
+    with self._lock:
+      self._objects[key] = (bytes(data), time.time_ns())
+
+  def stat(self, path: Path) -> Optional[Dict[str, Any]]:
+    with self._lock:
+      item = self._objects.get(self.key(path))
+    if item is None:
+      return None
+    return {"size": len(item[0]), "mtime": item[1] / 1e9, "mtime_ns": item[1]}
+
+  def _under(self, directory: Path) -> str:
+    prefix = self.key(directory)
+    return prefix + "/" if prefix else ""
+
+  def list(self, directory: Path) -> Iterator[Dict[str, Any]]:
+    prefix = self._under(directory)
+    with self._lock:
+      items = sorted((key, item) for key, item in self._objects.items() if key.startswith(prefix))
+    for key, (data, mtime_ns) in items:
+      yield {"path": self.root / key, "size": len(data), "mtime": mtime_ns / 1e9, "mtime_ns": mtime_ns}
+
+  def delete_prefix(self, directory: Path) -> int:
+    prefix = self._under(directory)
+    with self._lock:
+      doomed = [key for key in self._objects if key.startswith(prefix)]
+      for key in doomed:
+        del self._objects[key]
+    return len(doomed)
+
+  def clear(self) -> None:
+    with self._lock:
+      self._objects.clear()
+
+
+def default_upload_workers() -> int:
+  """Concurrent S3 uploads per commit, from DOCGEN_S3_UPLOAD_WORKERS"""
+  return int(os.getenv("DOCGEN_S3_UPLOAD_WORKERS", "8"))
+
+
+def default_multipart_threshold() -> int:
+  """Object size in bytes from which S3 uploads go multipart, from DOCGEN_S3_MULTIPART_THRESHOLD"""
+  return int(os.getenv("DOCGEN_S3_MULTIPART_THRESHOLD", str(8 * MIB)))
+
+
+_clients: Dict[Tuple[Optional[str], Optional[str], int], Any] = {}
+_clients_lock = threading.Lock()
+
+
+def s3_client(endpoint_url: Optional[str] = None, region: Optional[str] = None, pool_size: Optional[int] = None) -> Any:
+  """Shared S3 client for an endpoint
+
+  boto3 clients are thread-safe but slow to create, so one client per
+  endpoint serves every request, with a connection pool big enough for the
+  concurrent uploads.
+  """
+  import boto3
+  from botocore.config import Config
+
+  pool_size = pool_size or max(10, default_upload_workers())
+  key = (endpoint_url, region, pool_size)
+  with _clients_lock:
+    client = _clients.get(key)
+    if client is None:
+      config = Config(max_pool_connections=pool_size, retries={"mode": "standard", "max_attempts": 5})
+      # Creating clients is not thread-safe, so it happens under the lock
+      client = boto3.session.Session().client("s3", endpoint_url=endpoint_url, region_name=region, config=config)
+      _clients[key] = client
+    return client
+
+
+class S3Storage(Storage):
+  """Objects in an S3 bucket (or MinIO), keyed by ``prefix`` plus the path under the root"""
+
+  name = "s3"
+
+  def __init__(
+    self,
+    root: Path,
+    bucket: str,
+    prefix: str = "",
+    client: Any = None,
+    upload_workers: Optional[int] = None,
+    multipart_threshold: Optional[int] = None
+  ):
+    from boto3.s3.transfer import TransferConfig
+
+    super().__init__(root)
+    self.bucket = bucket
+    self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+    self.client = client or s3_client(os.getenv("DOCGEN_S3_ENDPOINT_URL") or None, os.getenv("AWS_REGION") or None)
+    self.upload_workers = upload_workers or default_upload_workers()
+    self.multipart_threshold = multipart_threshold or default_multipart_threshold()
+    self.transfer_config = TransferConfig(
+      multipart_threshold=self.multipart_threshold,
+      multipart_chunksize=max(self.multipart_threshold, 5 * MIB),
+      max_concurrency=self.upload_workers
+    )
+    self._executor: Optional[ThreadPoolExecutor] = None
+    self._executor_lock = threading.Lock()
+
+  @property
+  def location(self) -> str:
+    return f"s3://{self.bucket}/{self.prefix}"
+
+  def object_key(self, path: Path) -> str:
+    return self.prefix + self.key(path)
+
+  def _missing(self, error: Exception) -> bool:
+    code = getattr(error, "response", {}).get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey", "NotFound")
+
+  def _get(self, path: Path, **kwargs: Any) -> Optional[Dict[str, Any]]:
+    from botocore.exceptions import ClientError
+
+    try:
+      return self.client.get_object(Bucket=self.bucket, Key=self.object_key(path), **kwargs)
+    except ClientError as e:
+      if self._missing(e):
+        return None
+      raise
+
+  def read(self, path: Path) -> Optional[bytes]:
+    response = self._get(path)
+    return response["Body"].read() if response else None
+
+  def open(self, path: Path) -> BinaryIO:
+    response = self._get(path)
+    if response is None:
+      raise FileNotFoundError(f"Document not found: {path}")
+    return response["Body"]
+
+  def read_range(self, path: Path, offset: int = 0, length: Optional[int] = None) -> bytes:
+    from botocore.exceptions import ClientError
+
+    if length == 0:
+      return b""
+    end = "" if length is None else str(offset + length - 1)
+    try:
+      response = self._get(path, Range=f"bytes={offset}-{end}")
+    except ClientError as e:
+      if e.response.get("Error", {}).get("Code") == "InvalidRange":
+        return b""
+      raise
+    if response is None:
+      raise FileNotFoundError(f"Document not found: {path}")
+    return response["Body"].read()
+
+  def write(self, path: Path, data: bytes, fsync: bool = False) -> None:
+    if len(data) >= self.multipart_threshold:
+      self.upload(path, io.BytesIO(data))
+      return
+    self.client.put_object(Bucket=self.bucket, Key=self.object_key(path), Body=data)
+
+  def _pool(self) -> ThreadPoolExecutor:
+    with self._executor_lock:
+      if self._executor is None:
+        self._executor = ThreadPoolExecutor(max_workers=self.upload_workers, thread_name_prefix="docgen-s3")
+      return self._executor
+
+  def write_many(self, items: Dict[Path, bytes], fsync: bool = False) -> Dict[Path, float]:
+    """Upload objects concurrently over the pooled client's connections"""
+    if len(items) <= 1:
+      return super().write_many(items, fsync)
+
+    def upload(path: Path, data: bytes) -> float:
+      start = time.perf_counter()
+      self.write(path, data)
+      return round(time.perf_counter() - start, 6)
+
+    pool = self._pool()
+    futures = {path: pool.submit(upload, path, data) for path, data in items.items()}
+    return {path: future.result() for path, future in futures.items()}
+
+  def upload(self, path: Path, source: BinaryIO) -> None:
+    """Upload a stream, in parallel parts once it passes the multipart threshold"""
+    self.client.upload_fileobj(source, self.bucket, self.object_key(path), Config=self.transfer_config)
+
+  def stat(self, path: Path) -> Optional[Dict[str, Any]]:
+    from botocore.exceptions import ClientError
+
+    try:
+      response = self.client.head_object(Bucket=self.bucket, Key=self.object_key(path))
+    except ClientError as e:
+      if self._missing(e):
+        return None
+      raise
+    mtime = response["LastModified"].timestamp()
+    return {"size": response["ContentLength"], "mtime": mtime, "mtime_ns": int(mtime * 1e9)}
+
+  def _list_keys(self, directory: Path) -> Iterator[Dict[str, Any]]:
+    prefix = self.key(directory)
+    prefix = self.prefix + (prefix + "/" if prefix else "")
+    paginator = self.client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+      yield from page.get("Contents", [])
+
+  def list(self, directory: Path) -> Iterator[Dict[str, Any]]:
+    for item in self._list_keys(directory):
+      mtime = item["LastModified"].timestamp()
+      yield {
+        "path": self.root / item["Key"][len(self.prefix):],
+        "size": item["Size"],
+        "mtime": mtime,
+        "mtime_ns": int(mtime * 1e9)
+      }
+
+  def copy(self, source: Path, target: Path) -> None:
+    """Copy server-side, without downloading the object"""
+    from botocore.exceptions import ClientError
+
+    try:
+      self.client.copy_object(
+        Bucket=self.bucket,
+        Key=self.object_key(target),
+        CopySource={"Bucket": self.bucket, "Key": self.object_key(source)}
+      )
+    except ClientError as e:
+      if self._missing(e):
+        raise FileNotFoundError(f"Document not found: {source}") from e
+      raise
+
+  def delete_prefix(self, directory: Path) -> int:
+    keys = [item["Key"] for item in self._list_keys(directory)]
+    # DeleteObjects takes at most 1000 keys per request
+    for start in range(0, len(keys), 1000):
+      batch = [{"Key": key} for key in keys[start:start + 1000]]
+      self.client.delete_objects(Bucket=self.bucket, Delete={"Objects": batch, "Quiet": True})
+    return len(keys)
+
+
+def create_storage(backend: str, root: Path) -> Storage:
+  """A new storage of the named backend rooted at the output directory"""
+  if backend == "local":
+    return LocalStorage(root)
+  if backend == "memory":
+    return MemoryStorage(root)
+  if backend == "s3":
+    bucket = os.getenv("DOCGEN_BUCKET")
+    if not bucket:
+      raise ValueError("DOCGEN_STORAGE=s3 needs DOCGEN_BUCKET")
+    return S3Storage(root, bucket, os.getenv("DOCGEN_S3_PREFIX", ""))
+  raise ValueError(f"Unknown storage backend '{backend}'. Available: {', '.join(STORAGE_BACKENDS)}")
+
+
+_storages: Dict[Tuple[str, Path], Storage] = {}
+_storages_lock = threading.Lock()
+_override: Optional[Storage] = None
+
+
+def get_storage(root: Optional[Path] = None) -> Storage:
+  """Shared storage for an output root (the output directory by default)
+
+  Local storage takes any path, so until the output directory is known it
+  is named after the first candidate rather than probed, which would create it.
+  """
+  if _override is not None:
+    return _override
+  backend = storage_backend()
+  if root is None:
+    root = known_output_directory()
+    if root is None:
+      root = candidate_directories()[0] if backend == "local" else get_output_directory()
+  root = Path(root).resolve()
+  with _storages_lock:
+    storage = _storages.get((backend, root))
+    if storage is None:
+      storage = _storages[(backend, root)] = create_storage(backend, root)
+    return storage
+
+
+@contextlib.contextmanager
+def use_storage(storage: Optional[Storage]) -> Iterator[Optional[Storage]]:
+  """Send all artifact I/O in this process to the given storage, for tests and benchmarks"""
+  global _override
+  previous, _override = _override, storage
+  try:
+    yield storage
+  finally:
+    _override = previous
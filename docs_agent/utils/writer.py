@@ -0,0 +1,318 @@
+"""Atomic, batched artifact writer for DocGen Suite"""
+
+import contextlib
+import hashlib
+import os
+import stat
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+  from .storage import Storage
+
+
+def content_digest(data: bytes) -> str:
+  """Short SHA256 digest used for artifact content hashes"""
+  return hashlib.sha256(data).hexdigest()[:16]
+
+
+def fsync_directory(directory: Path) -> None:
+  """Flush a directory entry to disk where the platform supports it"""
+  flags = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0)
+  try:
+    fd = os.open(str(directory), flags)
+  except OSError:
+    return
+  try:
+    os.fsync(fd)
+  except OSError:
+    pass
+  finally:
+    os.close(fd)
+
+
+def _default_mode() -> int:
+  # The umask can only be read by setting it; done once, at import
+  umask = os.umask(0)
+  os.umask(umask)
+  return 0o666 & ~umask
+
+
+_DEFAULT_MODE = _default_mode()
+
+
+def file_mode(path: Path) -> int:
+  """Permissions for a file replacing path: the current file's, or what open() would give a new one
+
+  mkstemp creates 0600 temp files and os.replace keeps their mode, so temp
+  files get this mode before they are renamed into place.
+  """
+  try:
+    return stat.S_IMODE(os.stat(path).st_mode)
+  except OSError:
+    return _DEFAULT_MODE
+
+
+def _write_temp(path: Path, data: bytes, fsync: bool = False) -> str:
+  """Write data to a temp file next to path and return the temp file's name"""
+  try:
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+  except FileNotFoundError:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+  try:
+    os.fchmod(fd, file_mode(path))
+    with os.fdopen(fd, "wb") as f:
+      f.write(data)
+      if fsync:
+        f.flush()
+        os.fsync(f.fileno())
+  except BaseException:
+    with contextlib.suppress(OSError):
+      os.unlink(tmp_name)
+    raise
+  return tmp_name
+
+
+def atomic_write(path: Path, data: bytes, fsync: bool = False) -> None:
+  """Write to a temp file in the target directory and rename it into place"""
+  tmp_name = _write_temp(path, data, fsync)
+  try:
+    os.replace(tmp_name, path)
+  except BaseException:
+    with contextlib.suppress(OSError):
+      os.unlink(tmp_name)
+    raise
+
+
+class ArtifactWriter:
+  """Collects a run's artifacts and commits them together
+
+  ``stage`` resolves the final path right away: it applies the ``.new``
+  collision rule and skips content that is byte-identical to what is
+  stored. ``commit`` then writes every staged file through the storage
+  backend (the configured one by default); local files land atomically,
+  optionally fsyncing each file and each touched directory once.
+
+  A writer in another process can ``export`` its staged files as temp files
+  next to their targets, or as content for storage that is not local;
+  ``adopt`` hands them to this writer, whose commit writes them along with
+  its own.
+
+  Incremental build records are staged too, and written to the manifest
+  only after the files they describe are in place.
+  """
+
+  def __init__(self, fsync: bool = False, storage: Optional["Storage"] = None):
+    from .storage import get_storage
+
+    self.fsync = fsync
+    self.storage = storage or get_storage()
+    self._staged: Dict[Path, bytes] = {}
+    self._unchanged: Dict[Path, bytes] = {}
+    self._adopted: Dict[Path, Dict[str, Any]] = {}
+    self._manifest: List[Dict[str, Any]] = []
+    self._lock = threading.Lock()
+
+  def stage(self, path: Path, text: str, overwrite: bool = False) -> Path:
+    """Queue text for writing and return the path it will be written to"""
+    data = text.encode("utf-8")
+    existing = self.storage.read(path)
+    if existing is not None and existing != data and not overwrite:
+      path = path.with_suffix(path.suffix + ".new")
+      existing = self.storage.read(path)
+    with self._lock:
+      if existing == data:
+        self._unchanged[path] = data
+      else:
+        self._staged[path] = data
+    return path
+
+  def stage_manifest_entry(self, output_dir: Path, key: str, entry: Dict[str, Any], idea_hash: str) -> None:
+    """Queue a build record for the manifest; it takes record_manifest_entry's arguments"""
+    with self._lock:
+      self._manifest.append({"output_dir": str(output_dir), "key": key, "entry": entry, "idea_hash": idea_hash})
+
+  def take_manifest_entries(self) -> List[Dict[str, Any]]:
+    """Hand over the staged build records, e.g. to the writer that commits the run"""
+    with self._lock:
+      manifest, self._manifest = self._manifest, []
+    return manifest
+
+  def export(self) -> List[Dict[str, Any]]:
+    """Write staged files to temp files beside their targets and describe them
+
+    Nothing is renamed into place; the entries are meant for ``adopt`` on
+    the writer that commits the run. Unchanged files carry no temp file,
+    and with storage that is not local the entries carry the content.
+    """
+    with self._lock:
+      staged, self._staged = self._staged, {}
+      unchanged, self._unchanged = self._unchanged, {}
+
+    entries: List[Dict[str, Any]] = []
+    try:
+      for path, data in staged.items():
+        entries.append({
+          "path": str(path),
+          "tmp": _write_temp(path, data, self.fsync) if self.storage.local else None,
+          "size": len(data),
+          "hash": content_digest(data),
+          **({} if self.storage.local else {"data": data})
+        })
+    except BaseException:
+      discard_exported(entries)
+      raise
+    entries.extend(
+      {"path": str(path), "tmp": None, "size": len(data), "hash": content_digest(data)}
+      for path, data in unchanged.items()
+    )
+    return entries
+
+  def adopt(self, entries: List[Dict[str, Any]]) -> None:
+    """Take over files another writer exported, to be committed with this run"""
+    with self._lock:
+      for entry in entries:
+        if entry.get("data") is not None:
+          self._staged[Path(entry["path"])] = entry["data"]
+        else:
+          self._adopted[Path(entry["path"])] = entry
+
+  def commit(self) -> Dict[str, Any]:
+    """Write all staged artifacts and report bytes and timing"""
+    with self._lock:
+      staged, self._staged = self._staged, {}
+      unchanged, self._unchanged = self._unchanged, {}
+      adopted, self._adopted = self._adopted, {}
+      manifest, self._manifest = self._manifest, []
+
+    start = time.perf_counter()
+    files = []
+    written = {path: entry for path, entry in adopted.items() if entry["tmp"] is not None}
+    for path, entry in written.items():
+      file_start = time.perf_counter()
+      os.replace(entry["tmp"], path)
+      files.append({
+        "path": str(path),
+        "bytes": entry["size"],
+        "size": entry["size"],
+        "hash": entry["hash"],
+        "status": "written",
+        "elapsed": round(time.perf_counter() - file_start, 6)
+      })
+    if self.fsync:
+      for directory in {path.parent for path in written}:
+        fsync_directory(directory)
+    elapsed = self.storage.write_many(staged, self.fsync)
+    files.extend(
+      {
+        "path": str(path),
+        "bytes": len(data),
+        "size": len(data),
+        "hash": content_digest(data),
+        "status": "written",
+        "elapsed": elapsed[path]
+      }
+      for path, data in staged.items()
+    )
+    files.extend(
+      {
+        "path": str(path),
+        "bytes": 0,
+        "size": len(data),
+        "hash": content_digest(data),
+        "status": "unchanged",
+        "elapsed": 0.0
+      }
+      for path, data in unchanged.items()
+    )
+    files.extend(
+      {"path": str(path), "bytes": 0, "size": entry["size"], "hash": entry["hash"], "status": "unchanged", "elapsed": 0.0}
+      for path, entry in adopted.items() if entry["tmp"] is None
+    )
+    if manifest:
+      from .incremental import record_manifest_entries
+      record_manifest_entries(manifest, self.storage)
+
+    return {
+      "written": len(staged) + len(written),
+      "unchanged": len(unchanged) + len(adopted) - len(written),
+      "bytes": sum(len(data) for data in staged.values()) + sum(entry["size"] for entry in written.values()),
+      "elapsed": round(time.perf_counter() - start, 6),
+      "files": files
+    }
+
+  def collect(self) -> Dict[str, Any]:
+    """Hand back the staged artifacts' text instead of writing them
+
+    The report has ``commit``'s shape, with each file's text under
+    ``content`` and its status ``rendered``; nothing reaches the storage.
+    """
+    with self._lock:
+      rendered = {**self._unchanged, **self._staged}
+      self._staged.clear()
+      self._unchanged.clear()
+      self._manifest.clear()
+      adopted, self._adopted = list(self._adopted.values()), {}
+    discard_exported(adopted)
+
+    start = time.perf_counter()
+    files = [
+      {
+        "path": str(path),
+        "bytes": 0,
+        "size": len(data),
+        "hash": content_digest(data),
+        "status": "rendered",
+        "elapsed": 0.0,
+        "content": data.decode("utf-8")
+      }
+      for path, data in rendered.items()
+    ]
+    return {
+      "written": 0,
+      "unchanged": 0,
+      "rendered": len(files),
+      "bytes": 0,
+      "elapsed": round(time.perf_counter() - start, 6),
+      "files": files
+    }
+
+  def discard(self) -> None:
+    """Drop everything staged, leaving the filesystem untouched"""
+    with self._lock:
+      self._staged.clear()
+      self._unchanged.clear()
+      self._manifest.clear()
+      adopted, self._adopted = list(self._adopted.values()), {}
+    discard_exported(adopted)
+
+
+def discard_exported(entries: List[Dict[str, Any]]) -> None:
+  """Remove the temp files of exported entries that will not be committed"""
+  for entry in entries:
+    if entry.get("tmp"):
+      with contextlib.suppress(OSError):
+        os.unlink(entry["tmp"])
+
+
+_current_writer: ContextVar[Optional[ArtifactWriter]] = ContextVar("docgen_artifact_writer", default=None)
+
+
+def current_writer() -> Optional[ArtifactWriter]:
+  """The writer collecting artifacts for the run executing in this context"""
+  return _current_writer.get()
+
+
+@contextlib.contextmanager
+def use_writer(writer: Optional[ArtifactWriter]) -> Iterator[Optional[ArtifactWriter]]:
+  """Route render_artifact writes in this context through the given writer"""
+  token = _current_writer.set(writer)
+  try:
+    yield writer
+  finally:
+    _current_writer.reset(token)
@@ -1,8 +1,29 @@
 """DocGen Suite - Orchestrator Package"""
 
+import importlib
+from typing import Any, List
+
 __version__ = "0.1.0"
 __author__ = "DocGen Team"
 
-from .graph import create_orchestrator_graph, orchestrate_docgen, run_unified_workflow
+# Imported on first access; the orchestrator graph loads the docs graph
+_EXPORTS = {
+  "create_orchestrator_graph": "graph",
+  "orchestrate_docgen": "graph",
+  "run_unified_workflow": "graph"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+  module = _EXPORTS.get(name)
+  if module is None:
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  value = getattr(importlib.import_module(f".{module}", __name__), name)
+  globals()[name] = value
+  return value
+
 
-__all__ = ["create_orchestrator_graph", "orchestrate_docgen", "run_unified_workflow"]
+def __dir__() -> List[str]:
+  return sorted(set(globals()) | set(__all__))
@@ -1,29 +1,36 @@
 """Orchestrator graph for DocGen Suite"""
 
-from typing import Dict, Any, List
+import logging
+import re
+import time
+from typing import Callable, Dict, Any, List, Tuple
 from pathlib import Path
 from langgraph.graph import StateGraph, END
 from docs_agent.state import Idea, DocRequest
-from docs_agent.graph import run_docs_generation
-
-
-# Profile definitions
-PROFILES = {
-  "full": [
-    "brd_prd", "frd", "srd", "trd_tdd", "erd", "openapi",
-    "wireframes", "design_system", "project_plan", "test_strategy", 
-    "cicd_env", "release_runbook"
-  ],
-  "lean": [
-    "brd_prd", "srd", "erd", "project_plan", "test_strategy"
-  ],
-  "tech_only": [
-    "srd", "trd_tdd", "erd", "openapi", "cicd_env"
-  ],
-  "pm_only": [
-    "brd_prd", "frd", "project_plan", "test_strategy", "release_runbook"
-  ]
-}
+from docs_agent.graph import commit_documents, run_docs_generation, prebuild_graphs
+from docs_agent.registry import canonical_docs, get_doc_spec, profiles, unknown_doc_types
+
+
+# Progress goes to logging: stdout carries the MCP protocol
+logger = logging.getLogger(__name__)
+
+# Profile definitions, from the profiles each registered document joins
+PROFILES = profiles()
+
+# Rewrites a document's rendered text; takes the text and the Idea
+Transformer = Callable[[str, Idea], str]
+
+# Problems in a document's text; takes the text and every rendered file's text by name
+Validator = Callable[[str, Dict[str, str]], List[str]]
+
+
+def prebuild_profile_graphs(parallel: bool = False) -> int:
+  """Compile the docs graphs profile runs use and return how many there are
+
+  Profile runs are serial and share the one serial graph; with ``parallel``
+  each profile gets its own fan-out graph.
+  """
+  return prebuild_graphs(PROFILES.values(), parallel)
 
 
 def create_orchestrator_graph():
@@ -63,42 +70,68 @@ def orchestrate_docgen(idea: Idea, profile: str = "full", overwrite: bool = Fals
 
 
 def run_unified_workflow(idea: Idea, docs: List[str] = None, profile: str = "full", overwrite: bool = False) -> Dict[str, Any]:
-  """Run unified workflow that combines docagent generation with orchestrator review"""
-  
+  """Run unified workflow that combines docagent generation with orchestrator review
+
+  One pass: the documents are rendered into memory, each goes through its
+  type's TRANSFORMERS pipeline, and all of them are written once, through
+  the same writer a normal run commits with. ``timings`` reports the
+  render, transform and write phases and every transform's own time.
+
+  Documents with a VALIDATORS entry are checked again after their
+  transforms; a problem the transforms introduced raises ValueError and
+  nothing is written.
+  """
+  start = time.perf_counter()
+
   # If no specific docs provided, use profile
   if docs is None:
-    docs = PROFILES.get(profile, [])
-  
-  # Step 1: Run docagent to generate documents
-  print(f"🔄 Step 1: Generating documents with docagent...")
-  generation_result = run_docs_generation(idea, docs, overwrite)
-  
-  # Step 2: Apply orchestrator corrections and improvements
-  print(f"🔄 Step 2: Applying orchestrator corrections...")
+    if profile not in PROFILES:
+      raise ValueError(f"Unknown profile: {profile}. Available: {list(PROFILES.keys())}")
+    docs = PROFILES[profile]
+  docs = canonical_docs(docs)
+  unknown = unknown_doc_types(docs)
+  if unknown:
+    raise ValueError(f"Unknown document types: {', '.join(unknown)}")
+
+  # Step 1: Run docagent to render documents without writing them
+  logger.info("Step 1: Generating documents with docagent")
+  generation_result = run_docs_generation(idea, docs, overwrite, sink="memory")
+  documents = generation_result.pop("documents")
+  rendered = time.perf_counter()
+
+  # Step 2: Apply orchestrator corrections to the rendered text
+  logger.info("Step 2: Applying orchestrator corrections")
+  by_path = {Path(document["path"]): document for document in documents}
+  files = {path.name: document["content"] for path, document in by_path.items()}
   corrected_docs = {}
   corrections_applied = {}
-  
+  transforms = []
+
   for doc_type in docs:
-    if doc_type in generation_result:
-      doc_content = generation_result[doc_type]
-      
-      # Apply orchestrator-specific improvements
-      corrected_content = apply_orchestrator_improvements(doc_type, doc_content, idea)
-      
-      if corrected_content != doc_content:
-        corrected_docs[doc_type] = corrected_content
-        corrections_applied[doc_type] = {
-          "original_length": len(doc_content),
-          "corrected_length": len(corrected_content),
-          "improvements": get_improvement_summary(doc_type)
-        }
-        
-        # Save corrected document
-        save_improved_document(doc_type, corrected_content, idea.output_dir)
-      else:
-        corrected_docs[doc_type] = doc_content
-        corrections_applied[doc_type] = {"status": "no_changes_needed"}
-  
+    document = by_path[Path(idea.output_dir) / get_doc_spec(doc_type).filename]
+    doc_content = document["content"]
+    corrected_content, timings = transform_document(doc_type, doc_content, idea)
+    transforms.extend({"doc_type": doc_type, **timing} for timing in timings)
+    corrected_docs[doc_type] = corrected_content
+
+    if corrected_content != doc_content:
+      check_transformed(doc_type, doc_content, corrected_content, files)
+      document["content"] = corrected_content
+      corrections_applied[doc_type] = {
+        "original_length": len(doc_content),
+        "corrected_length": len(corrected_content),
+        "improvements": get_improvement_summary(doc_type),
+        "transforms": [timing["transform"] for timing in timings if timing["changed"]]
+      }
+    else:
+      corrections_applied[doc_type] = {"status": "no_changes_needed"}
+  transformed = time.perf_counter()
+
+  # Step 3: Write every document once
+  logger.info("Step 3: Writing documents")
+  writes = commit_documents(idea, documents, overwrite)
+  written = time.perf_counter()
+
   return {
     "workflow_type": "unified_docagent_orchestrator",
     "profile": profile,
@@ -106,27 +139,87 @@ def run_unified_workflow(idea: Idea, docs: List[str] = None, profile: str = "ful
     "generation_result": generation_result,
     "corrected_docs": corrected_docs,
     "corrections_applied": corrections_applied,
+    "writes": writes,
+    "timings": {
+      "render": round(rendered - start, 6),
+      "transform": round(transformed - rendered, 6),
+      "write": round(written - transformed, 6),
+      "total": round(written - start, 6),
+      "transforms": transforms
+    },
     "status": "completed"
   }
 
 
+def transform_document(doc_type: str, content: str, idea: Idea) -> Tuple[str, List[Dict[str, Any]]]:
+  """Run a document's text through its type's transformers, timing each one"""
+  timings = []
+  for transformer in TRANSFORMERS.get(doc_type, []):
+    start = time.perf_counter()
+    transformed = transformer(content, idea)
+    timings.append({
+      "transform": transformer.__name__,
+      "elapsed": round(time.perf_counter() - start, 6),
+      "changed": transformed != content
+    })
+    content = transformed
+  return content, timings
+
+
+def check_transformed(doc_type: str, original: str, transformed: str, files: Dict[str, str]) -> None:
+  """Raise ValueError if transforms made a document invalid
+
+  Only problems the rendered text did not already have count, so a
+  template that renders an imperfect document can still be reviewed.
+  """
+  validator = VALIDATORS.get(doc_type)
+  if validator is None:
+    return
+  before = set(validator(original, files))
+  introduced = [problem for problem in validator(transformed, files) if problem not in before]
+  if introduced:
+    raise ValueError(f"Transforms made {get_doc_spec(doc_type).filename} invalid: {'; '.join(introduced[:5])}")
+
+
+def openapi_problems(content: str, files: Dict[str, str]) -> List[str]:
+  """Parse openapi.yaml and its split path files and run the OpenAPI checks"""
+  import yaml
+  from docs_agent.openapi import validate_spec
+
+  try:
+    spec = yaml.safe_load(content)
+    parts = {name: yaml.safe_load(text) for name, text in files.items() if _OPENAPI_PART.fullmatch(name)}
+  except yaml.YAMLError as e:
+    return [f"not valid YAML: {e}"]
+  if not isinstance(spec, dict):
+    return ["not a YAML mapping"]
+  return validate_spec(spec, parts)
+
+
 def apply_orchestrator_improvements(doc_type: str, content: str, idea: Idea) -> str:
   """Apply orchestrator improvements to document content"""
-  
-  # This is where the orchestrator's intelligence would be applied
-  # For now, we'll implement basic improvements based on document type
-  
-  if doc_type == "brd_prd":
-    content = improve_brd_prd(content, idea)
-  elif doc_type == "srd":
-    content = improve_srd(content, idea)
-  elif doc_type == "erd":
-    content = improve_erd(content, idea)
-  elif doc_type == "openapi":
-    content = improve_openapi(content, idea)
-  # Add more document type improvements as needed
-  
-  return content
+  return transform_document(doc_type, content, idea)[0]
+
+
+def register_transformer(doc_type: str, transformer: Transformer) -> Transformer:
+  """Append a transformer to a document type's review pipeline"""
+  get_doc_spec(doc_type)
+  TRANSFORMERS.setdefault(doc_type, []).append(transformer)
+  return transformer
+
+
+def _yaml_comments(content: str, title: str, notes: List[str]) -> str:
+  # Comments keep the document parseable and its data unchanged
+  return content.rstrip("\n") + f"\n\n# {title}\n" + "".join(f"# - {note}\n" for note in notes)
+
+
+def _mermaid_comments(content: str, title: str, notes: List[str]) -> str:
+  # Mermaid comments inside the first diagram: valid Mermaid and hidden once rendered
+  comments = [f"%% {title}", *(f"%% - {note}" for note in notes)]
+  fence = re.search(r"^```mermaid\n.*?^(?=```)", content, re.DOTALL | re.MULTILINE)
+  if fence is None:
+    return content.rstrip("\n") + "\n" + "".join(f"{line}\n" for line in comments)
+  return content[:fence.end()] + "".join(f"  {line}\n" for line in comments) + content[fence.end():]
 
 
 def improve_brd_prd(content: str, idea: Idea) -> str:
@@ -173,12 +266,8 @@ def improve_erd(content: str, idea: Idea) -> str:
   # - Performance optimizations
   # - Data governance considerations
   
-  improvement_header = f"\n\n## Orchestrator Review Notes\n\n"
-  improvement_header += f"- Data model validated\n"
-  improvement_header += f"- Relationships optimized\n"
-  improvement_header += f"- Performance considerations added\n"
-  
-  return content + improvement_header
+  notes = ["Data model validated", "Relationships optimized", "Performance considerations added"]
+  return _mermaid_comments(content, "Orchestrator Review Notes", notes)
 
 
 def improve_openapi(content: str, idea: Idea) -> str:
@@ -189,12 +278,8 @@ def improve_openapi(content: str, idea: Idea) -> str:
   # - Rate limiting considerations
   # - Documentation enhancements
   
-  improvement_header = f"\n\n## Orchestrator Review Notes\n\n"
-  improvement_header += f"- API design validated\n"
-  improvement_header += f"- Security considerations added\n"
-  improvement_header += f"- Rate limiting configured\n"
-  
-  return content + improvement_header
+  notes = ["API design validated", "Security considerations added", "Rate limiting configured"]
+  return _yaml_comments(content, "Orchestrator Review Notes", notes)
 
 
 def get_improvement_summary(doc_type: str) -> List[str]:
@@ -210,21 +295,18 @@ def get_improvement_summary(doc_type: str) -> List[str]:
   return improvements.get(doc_type, improvements["default"])
 
 
-def save_improved_document(doc_type: str, content: str, output_dir: Path):
-  """Save improved document to output directory"""
-  try:
-    # Determine file extension based on document type
-    if doc_type == "openapi":
-      file_path = output_dir / "openapi.yaml"
-    elif doc_type == "erd":
-      file_path = output_dir / "erd.mmd"
-    elif doc_type == "wireframes":
-      file_path = output_dir / "wireframes.mmd"
-    else:
-      file_path = output_dir / f"{doc_type}.md"
-    
-    file_path.write_text(content, encoding="utf-8")
-    print(f"✅ Saved improved {doc_type} document")
-    
-  except Exception as e:
-    print(f"❌ Error saving improved document {doc_type}: {e}")
+# Post-render review transforms per document type, applied in order;
+# register_transformer adds more
+TRANSFORMERS: Dict[str, List[Transformer]] = {
+  "brd_prd": [improve_brd_prd],
+  "srd": [improve_srd],
+  "erd": [improve_erd],
+  "openapi": [improve_openapi]
+}
+
+# Checks run again on documents their transforms changed
+VALIDATORS: Dict[str, Validator] = {
+  "openapi": openapi_problems
+}
+
+_OPENAPI_PART = re.compile(r"openapi\.paths-\d+\.yaml")
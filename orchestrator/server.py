@@ -8,40 +8,12 @@ from typing import Dict, Any, List
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from fastmcp import FastMCP
-from docs_agent.state import Idea
-from orchestrator.graph import orchestrate_docgen
-
-
-def get_output_directory() -> Path:
-  """Get the appropriate output directory, creating it if necessary"""
-  # Try multiple possible locations in order of preference
-  possible_paths = [
-    # 1. Relative to current working directory
-    Path.cwd() / "docs_agent" / "outputs",
-    # 2. Relative to script location
-    Path(__file__).parent.parent / "docs_agent" / "outputs",
-    # 3. In current working directory
-    Path.cwd() / "outputs",
-    # 4. In user's home directory as fallback
-    Path.home() / "docgen_outputs"
-  ]
-  
-  for path in possible_paths:
-    try:
-      # Create directory if it doesn't exist
-      path.mkdir(parents=True, exist_ok=True)
-      # Test if we can write to it
-      test_file = path / ".test_write"
-      test_file.write_text("test", encoding="utf-8")
-      test_file.unlink()  # Clean up test file
-      return path
-    except (OSError, PermissionError):
-      continue
-  
-  # If all else fails, use current working directory
-  fallback_path = Path.cwd() / "docgen_outputs"
-  fallback_path.mkdir(parents=True, exist_ok=True)
-  return fallback_path
+from docs_agent import service
+from docs_agent.utils.output import with_output_directory
+
+# The orchestrator graph loads LangGraph and the docs graph, so tools
+# import it on first use and ping stays cheap
+
 
 # Create MCP server with FastMCP v2 API
 mcp = FastMCP("DocGenOrchestrator")
@@ -59,20 +31,24 @@ def list_tools() -> List[str]:
   return [
     "ping",
     "list_tools",
+    "list_profiles",
     "orchestrate_docgen",
     "run_unified_workflow"
   ]
 
 
+@mcp.tool()
+def list_profiles() -> Dict[str, List[str]]:
+  """Document types generated by each orchestration profile"""
+  from docs_agent.registry import profiles
+  return profiles()
+
+
 @mcp.tool()
 def orchestrate_docgen_tool(idea_json: str, profile: str = "full", overwrite: bool = False) -> Dict[str, Any]:
   """Orchestrate document generation with profile selection"""
   try:
-    idea = Idea.model_validate_json(idea_json)
-    # Set the output directory to the one we can actually write to
-    idea.output_dir = get_output_directory()
-    result = orchestrate_docgen(idea, profile, overwrite)
-    return {"success": True, "result": result}
+    return service.orchestrate(idea_json, profile, overwrite)
   except Exception as e:
     return {"success": False, "error": str(e)}
 
@@ -81,12 +57,18 @@ def orchestrate_docgen_tool(idea_json: str, profile: str = "full", overwrite: bo
 def run_unified_workflow(idea_json: str, docs: List[str] = None, profile: str = "full", overwrite: bool = False) -> Dict[str, Any]:
   """Run the unified workflow with both docagent and orchestrator working together automatically"""
   try:
-    idea = Idea.model_validate_json(idea_json)
-    idea.output_dir = get_output_directory()
-    
-    # Import the unified workflow function
+    from docs_agent.ingest import load_idea
+    from docs_agent.utils.runs import describe_run, run_directory
     from orchestrator.graph import run_unified_workflow as run_unified
-    result = run_unified(idea, docs, profile, overwrite)
+
+    idea = load_idea(idea_json)
+
+    def unified(output_dir: Path) -> Dict[str, Any]:
+      with run_directory(output_dir, idea) as run:
+        idea.output_dir = run["path"]
+        return run_unified(idea, docs, profile, overwrite or run["isolated"]), describe_run(run)
+
+    result, run = with_output_directory(unified)
     
     return {
       "success": True,
@@ -94,6 +76,7 @@ def run_unified_workflow(idea_json: str, docs: List[str] = None, profile: str =
       "profile": profile,
       "documents": result.get("documents", []),
       "result": result,
+      "run": run,
       "corrections_applied": result.get("corrections_applied", {}),
       "status": result.get("status", "completed")
     }
@@ -101,5 +84,28 @@ def run_unified_workflow(idea_json: str, docs: List[str] = None, profile: str =
     return {"success": False, "error": str(e)}
 
 
+def _warm_up() -> None:
+  """Compile templates and the graph profile runs use"""
+  from docs_agent.utils.render import warm_templates
+  from orchestrator.graph import prebuild_profile_graphs
+
+  warm_templates()
+  prebuild_profile_graphs()
+
+
 if __name__ == "__main__":
-  mcp.run()
+  import argparse
+  from docs_agent.utils.startup import format_import_report, profile_imports, start_prewarm
+
+  parser = argparse.ArgumentParser(description="DocGen orchestrator MCP server")
+  parser.add_argument("--profile-imports", action="store_true", help="Report the server's import times and exit")
+  args = parser.parse_args()
+  if args.profile_imports:
+    # stdout belongs to the MCP protocol
+    print(format_import_report(profile_imports(["orchestrator.server"])), file=sys.stderr)
+    sys.exit(0)
+
+  # Compile templates and graphs while the first calls are answered (DOCGEN_PREWARM)
+  start_prewarm(_warm_up)
+  # The banner renders with rich and checks PyPI for updates before serving
+  mcp.run(show_banner=False)
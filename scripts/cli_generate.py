@@ -2,63 +2,145 @@
 """CLI script for DocGen Suite"""
 
 import argparse
-import json
 import sys
 from pathlib import Path
 
 # Add parent directory to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from docs_agent.state import Idea, Context
+# docs_agent modules are imported once the arguments are known, so --help
+# and argument errors do not wait for LangGraph and Jinja2
+
+
+def run_batch_cli(args) -> int:
+  """Generate documents for every idea in a JSONL file, streaming results"""
+  import time
+  from docs_agent import service
+  from docs_agent.batch import iter_batch, load_jsonl, summarize
+
+  docs = [doc.strip() for doc in args.docs.split(",")] if args.docs else None
+  if docs:
+    try:
+      service.check_docs(docs)
+    except ValueError as e:
+      print(f"Error: {e}")
+      return 1
+  start = time.perf_counter()
+  results = []
+  for result in iter_batch(
+    load_jsonl(args.batch),
+    Path(args.output_root),
+    docs=docs,
+    overwrite=args.overwrite,
+    parallel=args.parallel,
+    incremental=args.incremental,
+    workers=args.processes
+  ):
+    results.append(result)
+    if result["success"]:
+      print(f"[{result['index']}] {result['title']}: {result['documents']} docs in {result['elapsed']:.3f}s -> {result['output_dir']}")
+    else:
+      print(f"[{result['index']}] FAILED: {result['error']}")
+
+  summary = summarize(results, time.perf_counter() - start)
+  print(
+    f"Batch finished: {summary['succeeded']}/{summary['total']} ideas, "
+    f"{summary['documents']} docs in {summary['elapsed']:.2f}s "
+    f"({summary['ideas_per_second']} ideas/s, {summary['documents_per_second']} docs/s)"
+  )
+  return 0 if summary["failed"] == 0 else 1
 
 
 def main():
   parser = argparse.ArgumentParser(description="Generate documents using DocGen Suite")
-  parser.add_argument("--idea", required=True, help="Path to idea JSON file")
+  parser.add_argument("--idea", help="Path to idea JSON file")
+  parser.add_argument("--batch", help="Path to a JSONL file with one idea per line")
   parser.add_argument("--docs", help="Comma-separated list of document types")
   parser.add_argument("--all", action="store_true", help="Generate all documents")
   parser.add_argument("--overwrite", action="store_true", help="Allow overwriting existing files")
+  parser.add_argument("--parallel", action="store_true", help="Render requested documents as concurrent graph branches")
+  parser.add_argument("--workers", type=int, help="Thread pool size for --parallel")
+  parser.add_argument("--backend", choices=["thread", "process"],
+                      help="Render in-process or in a worker process pool (default DOCGEN_RENDER_BACKEND)")
+  parser.add_argument("--incremental", action="store_true", help="Skip documents whose inputs are unchanged since the last build")
+  parser.add_argument("--sink", choices=["storage", "memory"], default="storage",
+                      help="Write documents to storage, or print them as JSON on stdout without writing anything")
+  parser.add_argument("--stream", action="store_true", help="Print a progress line as each document node finishes")
+  parser.add_argument("--processes", type=int, help="Worker processes for --batch (defaults to CPU count)")
+  parser.add_argument("--output-root", default="docs_agent/outputs/batch", help="Root directory for --batch outputs")
+  parser.add_argument("--profile-imports", action="store_true", help="Report import times of the generation modules and exit")
   
   args = parser.parse_args()
+
+  if args.profile_imports:
+    from docs_agent.utils.startup import format_import_report, profile_imports
+    print(format_import_report(profile_imports(["docs_agent.ingest", "docs_agent.graph"])))
+    return
+  if args.batch:
+    sys.exit(run_batch_cli(args))
+  if not args.idea:
+    parser.error("one of --idea or --batch is required")
+
+  # With the memory sink stdout carries only the documents
+  out = sys.stderr if args.sink == "memory" else sys.stdout
+
+  def log(message: str) -> None:
+    print(message, file=out)
   
   try:
-    # Load idea from JSON
-    with open(args.idea, 'r') as f:
-      idea_data = json.load(f)
-    
-    print(f"Loaded JSON data: {idea_data.keys()}")
-    
-    # Create Context object from nested data
-    if 'context' in idea_data:
-      context_data = idea_data.pop('context')
-      print(f"Context data: {context_data}")
-      idea_data['context'] = Context(**context_data)
-      print(f"Context object created: {idea_data['context']}")
-    
-    print(f"Final idea data keys: {idea_data.keys()}")
+    # Parse and validate the idea in one pass, nested models included
+    from docs_agent.ingest import load_idea_file
+    idea, ingest = load_idea_file(args.idea)
+    log(f"Loaded idea: {idea.title} (parse {ingest['parse'] * 1000:.1f} ms, validate {ingest['validate'] * 1000:.1f} ms)")
     
-    idea = Idea(**idea_data)
-    print(f"Idea object created successfully: {idea.title}")
-    
-    if args.all:
+    if args.stream and (args.all or args.docs):
+      # Stream progress events while generating
+      from docs_agent.graph import ALL_DOCS, stream_docs_generation
+      docs = ALL_DOCS if args.all else [doc.strip() for doc in args.docs.split(",")]
+      for event in stream_docs_generation(
+        idea, docs, args.overwrite, args.parallel, args.workers, args.incremental, backend=args.backend, sink=args.sink
+      ):
+        if event["event"] == "node_finished":
+          log(f"  [{event['elapsed']:7.3f}s] {event['node']}: {event['bytes']} bytes in {event['duration']:.3f}s -> {', '.join(event['paths'])}")
+        else:
+          result = event["result"]
+      log(f"Generated documents: {', '.join(docs)}")
+    elif args.all:
       # Generate all documents
       from docs_agent.graph import generate_all_documents
-      result = generate_all_documents(idea, args.overwrite)
-      print("Generated all documents successfully")
+      result = generate_all_documents(
+        idea, args.overwrite, args.parallel, args.workers, args.incremental, backend=args.backend, sink=args.sink
+      )
+      log("Generated all documents successfully")
     elif args.docs:
       # Generate specific documents
       from docs_agent.graph import run_docs_generation
       docs = [doc.strip() for doc in args.docs.split(",")]
-      result = run_docs_generation(idea, docs, args.overwrite)
-      print(f"Generated documents: {', '.join(docs)}")
+      result = run_docs_generation(
+        idea, docs, args.overwrite, args.parallel, args.workers, args.incremental, backend=args.backend, sink=args.sink
+      )
+      log(f"Generated documents: {', '.join(docs)}")
     else:
-      print("Error: Must specify --docs or --all")
+      log("Error: Must specify --docs or --all")
       sys.exit(1)
     
-    print(f"Output directory: {Path('outputs')}")
+    if args.incremental:
+      from docs_agent.utils.incremental import build_report
+      report = build_report(result["artifacts"])
+      log(f"Rebuilt {report['rebuilt']}, skipped {report['skipped']}")
+      for template, doc in report["documents"].items():
+        changed = f" ({', '.join(doc['changed_fields'])})" if doc["changed_fields"] else ""
+        log(f"  {template}: {doc['reason']}{changed}")
+
+    if args.sink == "memory":
+      import json
+      json.dump(result["documents"], sys.stdout, indent=2)
+      print()
+    else:
+      print(f"Output directory: {Path('outputs')}")
     
   except Exception as e:
-    print(f"Error: {e}")
+    log(f"Error: {e}")
     import traceback
     traceback.print_exc()
     sys.exit(1)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Load-test the DocGen HTTP API and report requests per second and latency percentiles"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+ENDPOINTS = ("health", "generate", "generate_all", "orchestrate", "outputs")
+
+
+def percentile(values: List[float], pct: float) -> float:
+  if not values:
+    return 0.0
+  ordered = sorted(values)
+  index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+  return ordered[index]
+
+
+def idea_payload(path: Optional[str], scale: int) -> bytes:
+  if path:
+    return Path(path).read_bytes()
+  from benchmarks.synthetic import synthetic_idea
+  return synthetic_idea(scale).model_dump_json().encode("utf-8")
+
+
+def build_request(
+  endpoint: str,
+  docs: str,
+  payload: bytes,
+  sink: str = "storage"
+) -> Tuple[str, str, Dict[str, Any], Optional[bytes]]:
+  # Every request writes to its own isolated run, so overwrite is safe
+  if endpoint == "health":
+    return "GET", "/health", {}, None
+  if endpoint == "outputs":
+    return "GET", "/outputs", {"limit": 50}, None
+  if endpoint == "orchestrate":
+    return "POST", "/orchestrate", {"profile": "full", "overwrite": True}, payload
+  if endpoint == "generate_all":
+    return "POST", "/generate/all", {"overwrite": True, "sink": sink}, payload
+  return "POST", "/generate", {"docs": docs, "overwrite": True, "sink": sink}, payload
+
+
+async def run_load(
+  client: httpx.AsyncClient,
+  endpoint: str,
+  docs: str,
+  payload: bytes,
+  requests: int,
+  concurrency: int,
+  sink: str = "storage"
+) -> Dict[str, Any]:
+  method, path, params, body = build_request(endpoint, docs, payload, sink)
+  latencies: List[float] = []
+  statuses: Counter = Counter()
+  remaining = iter(range(requests))
+
+  async def worker() -> None:
+    for _ in remaining:
+      start = time.perf_counter()
+      try:
+        response = await client.request(method, path, params=params, content=body)
+        statuses[str(response.status_code)] += 1
+      except httpx.HTTPError as e:
+        statuses[type(e).__name__] += 1
+      latencies.append(time.perf_counter() - start)
+
+  start = time.perf_counter()
+  await asyncio.gather(*(worker() for _ in range(concurrency)))
+  elapsed = time.perf_counter() - start
+
+  return {
+    "endpoint": endpoint,
+    "sink": sink,
+    "requests": requests,
+    "concurrency": concurrency,
+    "ok": statuses.get("200", 0),
+    "statuses": dict(statuses),
+    "seconds": round(elapsed, 3),
+    "rps": round(requests / elapsed, 2) if elapsed else 0.0,
+    "latency_ms": {
+      "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+      "p50": round(percentile(latencies, 50) * 1000, 2),
+      "p95": round(percentile(latencies, 95) * 1000, 2),
+      "p99": round(percentile(latencies, 99) * 1000, 2),
+      "max": round(max(latencies, default=0.0) * 1000, 2)
+    }
+  }
+
+
+def spawn_server(port: int, workers: int, output_root: str) -> subprocess.Popen:
+  env = {**os.environ, "DOCGEN_OUTPUT_ROOT": output_root, "DOCGEN_PREWARM": "startup"}
+  return subprocess.Popen(
+    [sys.executable, "-m", "docs_agent.api", "--port", str(port), "--workers", str(workers)],
+    cwd=str(Path(__file__).parent.parent), env=env
+  )
+
+
+async def wait_ready(url: str, timeout: float = 60.0) -> None:
+  deadline = time.perf_counter() + timeout
+  async with httpx.AsyncClient(base_url=url) as client:
+    while time.perf_counter() < deadline:
+      try:
+        if (await client.get("/health")).status_code == 200:
+          return
+      except httpx.HTTPError:
+        pass
+      await asyncio.sleep(0.2)
+  raise RuntimeError(f"Server at {url} did not become ready within {timeout:.0f}s")
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+  payload = idea_payload(args.idea, args.scale)
+  timeout = httpx.Timeout(args.timeout)
+  limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+  if args.in_process:
+    from docs_agent.api import asgi
+    transport = httpx.ASGITransport(app=asgi)
+    async with httpx.AsyncClient(transport=transport, base_url="http://docgen", timeout=timeout) as client:
+      # One untimed request so the first run's graph build is excluded
+      await run_load(client, args.endpoint, args.docs, payload, 1, 1, args.sink)
+      return await run_load(client, args.endpoint, args.docs, payload, args.requests, args.concurrency, args.sink)
+
+  async with httpx.AsyncClient(base_url=args.url, timeout=timeout, limits=limits) as client:
+    await run_load(client, args.endpoint, args.docs, payload, args.concurrency, args.concurrency, args.sink)
+    return await run_load(client, args.endpoint, args.docs, payload, args.requests, args.concurrency, args.sink)
+
+
+def format_report(report: Dict[str, Any]) -> str:
+  latency = report["latency_ms"]
+  statuses = ", ".join(f"{status}: {count}" for status, count in sorted(report["statuses"].items()))
+  return "\n".join([
+    f"{report['endpoint']} ({report['sink']} sink): {report['requests']} requests, concurrency {report['concurrency']}",
+    f"  ok {report['ok']}  ({statuses})",
+    f"  {report['rps']:.1f} requests/s over {report['seconds']:.2f}s",
+    f"  latency ms  mean {latency['mean']:.1f}  p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}"
+    f"  p99 {latency['p99']:.1f}  max {latency['max']:.1f}"
+  ])
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Load-test the DocGen HTTP API")
+  target = parser.add_mutually_exclusive_group()
+  target.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of a running API")
+  target.add_argument("--spawn", action="store_true", help="Start the API with --workers processes for the test")
+  target.add_argument("--in-process", action="store_true", help="Call the ASGI app directly, without a server")
+  parser.add_argument("--workers", type=int, default=2, help="uvicorn workers when spawning")
+  parser.add_argument("--port", type=int, default=8765, help="Port when spawning")
+  parser.add_argument("--endpoint", choices=ENDPOINTS, default="generate")
+  parser.add_argument("--docs", default="brd_prd,openapi", help="Comma-separated document types for generate")
+  parser.add_argument("--sink", choices=["storage", "memory"], default="storage",
+                      help="Have generate endpoints write documents or return them")
+  parser.add_argument("--idea", help="Idea JSON file to post (default: a synthetic Idea)")
+  parser.add_argument("--scale", type=int, default=1, help="Size of the synthetic Idea")
+  parser.add_argument("--requests", type=int, default=200)
+  parser.add_argument("--concurrency", type=int, default=16)
+  parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+  parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+  args = parser.parse_args()
+
+  server = None
+  with tempfile.TemporaryDirectory() as output_root:
+    if args.spawn:
+      args.url = f"http://127.0.0.1:{args.port}"
+      server = spawn_server(args.port, args.workers, output_root)
+    elif args.in_process:
+      os.environ.setdefault("DOCGEN_OUTPUT_ROOT", output_root)
+    try:
+      if server is not None:
+        asyncio.run(wait_ready(args.url))
+      report = asyncio.run(main_async(args))
+    finally:
+      if server is not None:
+        server.terminate()
+        server.wait(timeout=30)
+
+  print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+  main()
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Verify core components are working"""
 
+import re
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -108,6 +109,124 @@ def test_safe_write():
     return False
 
 
+# A lazy import missing from a tool only fails once the tool is called, and
+# most tools report exceptions in their result instead of raising
+MISSING_IMPORT = re.compile(r"name '\w+' is not defined|No module named|cannot import name")
+
+
+def server_tool_calls(idea_json):
+  """Arguments for one call of every tool of each MCP server"""
+  idea = {"idea_json": idea_json}
+  memory = {**idea, "docs": ["frd"], "sink": "memory"}
+  job = {"job_id": "missing"}
+  return {
+    "docs_agent": {
+      "ping": {},
+      "list_tools": {},
+      "list_doc_types": {},
+      "generate_documents": memory,
+      "generate_all": {**idea, "sink": "memory"},
+      "generate_documents_async": memory,
+      "generate_all_async": {**idea, "sink": "memory"},
+      "generate_documents_stream": {**idea, "docs": ["frd"]},
+      "submit_generation": memory,
+      "job_status": job,
+      "job_result": job,
+      "cancel_job": job,
+      "generate_batch": {"ideas": [create_sample_idea().model_dump(mode="json")], "docs": ["frd"]},
+      "list_outputs": {},
+      "list_runs": {"idea_hash": "0" * 16},
+      "show_doc": {"path": "frd.md"},
+      "zip_outputs": {},
+      "download_outputs": {},
+      "cache_stats": {},
+      "stats": {},
+      "dependency_map": {}
+    },
+    "orchestrator": {
+      "ping": {},
+      "list_tools": {},
+      "list_profiles": {},
+      "orchestrate_docgen_tool": {**idea, "profile": "pm_only"},
+      "run_unified_workflow": {**idea, "docs": ["frd"]}
+    }
+  }
+
+
+async def call_server_tools(servers, calls):
+  """Call every tool once; returns a list of failures"""
+  from fastmcp import Client
+
+  failures = []
+  for server, mcp in servers.items():
+    async with Client(mcp) as client:
+      names = {tool.name for tool in await client.list_tools()}
+      missing = sorted(names - set(calls[server]))
+      if missing:
+        failures.append(f"{server}: no call for {', '.join(missing)}")
+      for name in sorted(names & set(calls[server])):
+        result = await client.call_tool(name, calls[server][name], raise_on_error=False)
+        text = " ".join(getattr(block, "text", "") for block in result.content)
+        if result.is_error or MISSING_IMPORT.search(text):
+          failures.append(f"{server}.{name}: {text[:200]}")
+  return failures
+
+
+def test_lazy_server_imports():
+  """Test that the MCP servers start without loading the generation stack
+
+  Every tool is then called once, so an import a tool defers but never
+  makes fails here rather than in a client.
+  """
+  print("Testing server cold start...")
+  
+  try:
+    import asyncio
+    import os
+    import subprocess
+    import tempfile
+    
+    code = (
+      "import sys, docs_agent.server, orchestrator.server; "
+      "print(','.join(m for m in ('langgraph', 'jinja2', 'networkx') if m in sys.modules))"
+    )
+    out = subprocess.run(
+      [sys.executable, "-c", code], cwd=str(Path(__file__).parent.parent), capture_output=True, text=True, check=True
+    )
+    loaded = out.stdout.strip()
+    if loaded:
+      print(f"✗ Server import loads {loaded}")
+      return False
+    print("✓ Servers import without LangGraph, Jinja2 or networkx")
+
+    from docs_agent.server import mcp as docs_mcp
+    from orchestrator.server import mcp as orch_mcp
+
+    servers = {"docs_agent": docs_mcp, "orchestrator": orch_mcp}
+    calls = server_tool_calls(create_sample_idea().model_dump_json())
+    with tempfile.TemporaryDirectory() as root:
+      env = {"DOCGEN_OUTPUT_ROOT": str(Path(root) / "outputs"), "DOCGEN_ARCHIVE_PATH": str(Path(root) / "outputs.zip")}
+      previous = {name: os.environ.get(name) for name in env}
+      os.environ.update(env)
+      try:
+        failures = asyncio.run(call_server_tools(servers, calls))
+      finally:
+        for name, value in previous.items():
+          if value is None:
+            os.environ.pop(name, None)
+          else:
+            os.environ[name] = value
+    if failures:
+      for failure in failures:
+        print(f"✗ {failure}")
+      return False
+    print(f"✓ Called all {sum(len(c) for c in calls.values())} server tools")
+    return True
+  except Exception as e:
+    print(f"✗ Server cold start test failed: {e}")
+    return False
+
+
 def main():
   """Run all verification tests"""
   print("DocGen Suite - MCP Verification")
@@ -116,7 +235,8 @@ def main():
   tests = [
     test_state_models,
     test_template_rendering,
-    test_safe_write
+    test_safe_write,
+    test_lazy_server_imports
   ]
   
   passed = 0
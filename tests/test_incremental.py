@@ -0,0 +1,88 @@
+"""Incremental builds: why each document is rebuilt or skipped"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from docs_agent import registry
+from docs_agent.graph import run_docs_generation
+from docs_agent.state import Idea
+from docs_agent.utils import incremental
+from docs_agent.utils.incremental import MANIFEST_NAME, MANIFEST_VERSION, build_report, rebuild_reason
+
+
+FIXTURE = Path(__file__).parent / "fixtures" / "idea_sample.json"
+
+
+@pytest.fixture
+def idea(tmp_path, monkeypatch) -> Idea:
+  monkeypatch.setenv("DOCGEN_OUTPUT_ROOT", str(tmp_path))
+  monkeypatch.setenv("DOCGEN_STORAGE", "local")
+  idea = Idea.model_validate_json(FIXTURE.read_text())
+  idea.output_dir = tmp_path / "run"
+  return idea
+
+
+def build(idea: Idea, docs=None):
+  result = run_docs_generation(idea, docs or registry.doc_types(), overwrite=True, incremental=True)
+  return build_report(result["artifacts"])["documents"]
+
+
+def rebuilt(report):
+  return {template: doc for template, doc in report.items() if not doc["skipped"]}
+
+
+def test_first_build_is_new_then_up_to_date(idea):
+  assert {doc["reason"] for doc in build(idea).values()} == {"new"}
+  report = build(idea)
+  assert rebuilt(report) == {}
+  assert {doc["reason"] for doc in report.values()} == {"up_to_date"}
+
+
+def test_changed_field_rebuilds_only_its_readers(idea):
+  build(idea)
+  idea.kpis = [*idea.kpis, "Weekly active teams"]
+  assert rebuilt(build(idea)) == {
+    template: {"skipped": False, "reason": "inputs_changed", "changed_fields": ["kpis"]}
+    for template in ["brd_prd.md.jinja", "project_plan.md.jinja", "cicd_env.md.jinja", "release_runbook.md.jinja"]
+  }
+  assert rebuilt(build(idea)) == {}
+
+
+def test_template_edit_rebuilds_its_document(idea, monkeypatch):
+  build(idea)
+  source = incremental.template_source
+
+  def edited(name: str) -> str:
+    return source(name) + ("{# edited #}" if name == "frd.md.jinja" else "")
+
+  monkeypatch.setattr(incremental, "template_source", edited)
+  assert rebuilt(build(idea)) == {"frd.md.jinja": {"skipped": False, "reason": "template_changed", "changed_fields": []}}
+
+
+def test_outputs_are_verified(idea):
+  build(idea, ["brd_prd", "srd"])
+  (idea.output_dir / "brd_prd.md").write_text("# Edited by hand\n")
+  (idea.output_dir / "srd.md").unlink()
+  report = build(idea, ["brd_prd", "srd"])
+  assert report["brd_prd.md.jinja"]["reason"] == "output_modified"
+  assert report["srd.md.jinja"]["reason"] == "output_missing"
+  assert rebuilt(build(idea, ["brd_prd", "srd"])) == {}
+
+
+def test_code_change_comes_before_inputs():
+  inputs = {"template_hash": "t", "code_hash": "c2", "fields": {"kpis": "b"}, "inputs_hash": "i2"}
+  entry = {"template_hash": "t", "code_hash": "c1", "fields": {"kpis": "a"}, "inputs_hash": "i1"}
+  assert rebuild_reason(entry, inputs) == ("code_changed", [])
+  assert rebuild_reason({**entry, "code_hash": "c2"}, inputs) == ("inputs_changed", ["kpis"])
+  assert rebuild_reason(None, inputs) == ("new", [])
+
+
+def test_manifest_from_another_version_is_ignored(idea):
+  build(idea, ["frd"])
+  path = idea.output_dir / MANIFEST_NAME
+  manifest = json.loads(path.read_text())
+  assert manifest["version"] == MANIFEST_VERSION
+  path.write_text(json.dumps({**manifest, "version": MANIFEST_VERSION - 1}))
+  assert build(idea, ["frd"])["frd.md.jinja"]["reason"] == "new"
@@ -0,0 +1,78 @@
+"""JobQueue: bounded capacity and backpressure"""
+
+import asyncio
+import threading
+
+import pytest
+
+from docs_agent.jobs import JobQueue, QueueFullError
+
+
+@pytest.fixture
+def queue():
+  queue = JobQueue(max_workers=1, max_pending=2)
+  yield queue
+  queue._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def test_submissions_beyond_capacity_are_rejected(queue):
+  release = threading.Event()
+  started = threading.Event()
+
+  def blocked():
+    started.set()
+    release.wait(5)
+    return "done"
+
+  jobs = [queue.submit("test", blocked) for _ in range(3)]
+  assert started.wait(5)
+  assert [job.status for job in jobs] == ["running", "queued", "queued"]
+
+  with pytest.raises(QueueFullError, match="1 running, 2 pending"):
+    queue.submit("test", blocked)
+  with pytest.raises(QueueFullError):
+    asyncio.run(queue.run(blocked))
+  assert queue.stats()["rejected"] == 2
+  assert queue.stats()["jobs"] == {"running": 1, "queued": 2}
+
+  release.set()
+  assert [job.future.result(5) for job in jobs] == ["done"] * 3
+  # Finished jobs free their slots
+  assert queue.submit("test", lambda: "again").future.result(5) == "again"
+
+
+def test_cancelled_and_failed_jobs_free_their_slots(queue):
+  release = threading.Event()
+  running = queue.submit("test", release.wait, 5)
+  waiting = queue.submit("test", lambda: None)
+  assert queue.cancel(waiting.id)
+  assert waiting.status == "cancelled"
+
+  def fail():
+    raise ValueError("boom")
+
+  failed = queue.submit("test", fail)
+  queue.submit("test", lambda: None)
+  with pytest.raises(QueueFullError):
+    queue.submit("test", lambda: None)
+
+  release.set()
+  running.future.result(5)
+  with pytest.raises(ValueError, match="boom"):
+    failed.future.result(5)
+  assert failed.status == "failed"
+  assert asyncio.run(queue.run(lambda: "free")) == "free"
+
+
+def test_finished_jobs_are_pruned():
+  queue = JobQueue(max_workers=1, max_pending=4, max_finished=2)
+  jobs = []
+  for i in range(4):
+    jobs.append(queue.submit("test", lambda value=i: value))
+    jobs[-1].future.result(5)
+  release = threading.Event()
+  latest = queue.submit("test", release.wait, 5)
+  assert [queue.get(job.id) is not None for job in jobs] == [False, False, True, True]
+  assert queue.get(latest.id) is latest
+  release.set()
+  queue._executor.shutdown(wait=True)
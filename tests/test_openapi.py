@@ -0,0 +1,86 @@
+"""OpenAPI builder and its YAML emitter"""
+
+import math
+
+import pytest
+import yaml
+
+from benchmarks.synthetic import synthetic_idea
+from docs_agent.openapi import SPEC_FILENAME, dump_yaml, render_openapi, validate_spec
+
+
+TRICKY = [
+  "key: value",
+  "a:b",
+  "trailing:",
+  "# not a comment",
+  "text # comment",
+  "- leading dash",
+  "-1",
+  "yes", "No", "on", "OFF", "y", "true", "False", "null", "~", "",
+  "0", "007", "1.0", "1e3", "0x1F", ".inf", ".NaN", "3.0.3",
+  "2024-01-01",
+  "first line\nsecond line",
+  "ends with newline\n",
+  " leading space", "trailing space ",
+  "\ttab",
+  "quote \" and 'apostrophe'",
+  "back\\slash",
+  "{flow}", "[list]", "&anchor", "*alias", "!tag", "%directive", "@at", "`tick`", "|", ">",
+  "ünïcødé – text",
+  "/users/{id}",
+  "application/json"
+]
+
+
+@pytest.mark.parametrize("value", TRICKY)
+def test_tricky_strings_round_trip(value):
+  document = {"value": value, value or "empty": [value, {"nested": value}]}
+  assert yaml.safe_load(dump_yaml(document)) == document
+
+
+def test_other_scalars_round_trip():
+  document = {
+    "ints": [0, -1, 200, 10 ** 12],
+    "floats": [0.5, -2.25, 1e-9],
+    "bools": [True, False],
+    "none": None,
+    "empty": {"mapping": {}, "list": []},
+    "200": "string key that looks numeric"
+  }
+  assert yaml.safe_load(dump_yaml(document)) == document
+
+
+def test_non_finite_floats():
+  loaded = yaml.safe_load(dump_yaml({"values": [float("inf"), float("-inf")]}))
+  assert loaded == {"values": [float("inf"), float("-inf")]}
+  assert math.isnan(yaml.safe_load(dump_yaml({"nan": float("nan")}))["nan"])
+
+
+def test_list_items_use_the_block_style():
+  text = dump_yaml({"servers": [{"url": "https://api.example.com", "description": "Production"}], "nested": [[1, 2]]})
+  assert text == (
+    "servers:\n"
+    '  - url: "https://api.example.com"\n'
+    "    description: Production\n"
+    "nested:\n"
+    "  - - 1\n"
+    "    - 2\n"
+  )
+
+
+def test_shared_objects_are_copied():
+  shared = {"type": "string", "enum": ["a", "b"]}
+  document = {"first": shared, "second": [shared, shared], "third": {"again": shared}}
+  text = dump_yaml(document)
+  assert "&" not in text and "*" not in text
+  assert yaml.safe_load(text) == document
+
+
+@pytest.mark.parametrize("max_paths", [0, 3])
+def test_rendered_spec_round_trips_and_validates(max_paths):
+  files = render_openapi(synthetic_idea(12), max_paths=max_paths)
+  loaded = {name: yaml.safe_load(text) for name, text in files.items()}
+  spec = loaded.pop(SPEC_FILENAME)
+  assert (len(loaded) > 0) == bool(max_paths)
+  assert validate_spec(spec, loaded) == []
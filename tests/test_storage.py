@@ -0,0 +1,159 @@
+"""Storage backends and committing artifacts through them"""
+
+from pathlib import Path
+
+import pytest
+
+from docs_agent.utils.storage import LocalStorage, MemoryStorage, S3Storage, Storage
+from docs_agent.utils.writer import ArtifactWriter
+
+
+BUCKET = "docgen-test"
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+  boto3 = pytest.importorskip("boto3")
+  moto = pytest.importorskip("moto")
+  for name, value in {
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_SESSION_TOKEN": "testing",
+    "AWS_DEFAULT_REGION": "us-east-1"
+  }.items():
+    monkeypatch.setenv(name, value)
+  with moto.mock_aws():
+    client = boto3.client("s3", region_name="us-east-1")
+    client.create_bucket(Bucket=BUCKET)
+    yield client
+
+
+@pytest.fixture(params=["local", "memory", "s3"])
+def storage(request, tmp_path) -> Storage:
+  root = tmp_path / "outputs"
+  if request.param == "local":
+    return LocalStorage(root)
+  if request.param == "memory":
+    return MemoryStorage(root)
+  return S3Storage(root, BUCKET, "docs", client=request.getfixturevalue("s3_client"))
+
+
+def test_write_read_stat(storage):
+  path = storage.root / "run" / "brd_prd.md"
+  assert storage.read(path) is None
+  assert storage.stat(path) is None
+  assert storage.hash(path) == ""
+
+  storage.write(path, b"# BRD\n")
+  assert storage.read(path) == b"# BRD\n"
+  assert storage.stat(path)["size"] == 6
+  assert storage.exists(path)
+  assert storage.hash(path)
+
+  storage.write(path, b"# BRD v2\n")
+  assert storage.read(path) == b"# BRD v2\n"
+
+
+def test_read_range(storage):
+  path = storage.root / "openapi.yaml"
+  storage.write(path, b"0123456789")
+  assert storage.read_range(path) == b"0123456789"
+  assert storage.read_range(path, 2, 3) == b"234"
+  assert storage.read_range(path, 7) == b"789"
+  assert storage.read_range(path, 8, 10) == b"89"
+  assert storage.read_range(path, 4, 0) == b""
+  # Past the end: S3 answers InvalidRange, which reads as empty like a file
+  assert storage.read_range(path, 10) == b""
+  assert storage.read_range(path, 50, 5) == b""
+  with pytest.raises(FileNotFoundError):
+    storage.read_range(storage.root / "missing.md", 0, 1)
+
+
+def test_list(storage):
+  names = ["a.md", "run/b.md", "run/nested/c.mmd", "runs/d.md"]
+  for name in names:
+    storage.write(storage.root / name, name.encode("utf-8"))
+
+  listed = {item["path"]: item for item in storage.list(storage.root)}
+  assert sorted(listed) == [storage.root / name for name in names]
+  assert listed[storage.root / "run/b.md"]["size"] == len("run/b.md")
+  assert {"size", "mtime", "mtime_ns"} <= set(listed[storage.root / "a.md"])
+
+  # A directory's listing does not pick up siblings sharing its name as a prefix
+  assert sorted(item["path"] for item in storage.list(storage.root / "run")) == [
+    storage.root / "run/b.md",
+    storage.root / "run/nested/c.mmd"
+  ]
+  assert list(storage.list(storage.root / "empty")) == []
+
+
+def test_delete_prefix_over_a_thousand_keys(storage):
+  doomed = storage.root / "run"
+  storage.write_many({doomed / f"doc-{i:04d}.md": b"x" for i in range(1205)})
+  storage.write(storage.root / "keep.md", b"keep")
+  storage.write(storage.root / "runs" / "keep.md", b"keep")
+
+  assert storage.delete_prefix(doomed) == 1205
+  assert list(storage.list(doomed)) == []
+  assert sorted(item["path"] for item in storage.list(storage.root)) == [
+    storage.root / "keep.md",
+    storage.root / "runs" / "keep.md"
+  ]
+  assert storage.delete_prefix(doomed) == 0
+
+
+def test_copy(storage):
+  source = storage.root / "run-1" / "srd.md"
+  target = storage.root / "run-2" / "srd.md"
+  storage.write(source, b"# SRD\n")
+  storage.copy(source, target)
+  assert storage.read(target) == b"# SRD\n"
+
+  # Replacing the copy leaves the source alone
+  storage.write(target, b"# SRD v2\n")
+  assert storage.read(source) == b"# SRD\n"
+
+  with pytest.raises(FileNotFoundError):
+    storage.copy(storage.root / "missing.md", target)
+
+
+def test_key(storage, tmp_path):
+  assert storage.key(storage.root) == ""
+  assert storage.key(storage.root / "run" / "frd.md") == "run/frd.md"
+  assert storage.key(storage.root / "run" / ".." / "frd.md") == "frd.md"
+  for outside in (tmp_path / "elsewhere.md", storage.root / ".." / "escape.md", Path("/etc/passwd")):
+    with pytest.raises(ValueError):
+      storage.key(outside)
+
+
+def test_s3_keys_use_the_prefix(s3_client, tmp_path):
+  storage = S3Storage(tmp_path / "outputs", BUCKET, "/docs/", client=s3_client)
+  storage.write(storage.root / "run" / "frd.md", b"# FRD\n")
+  keys = [item["Key"] for item in s3_client.list_objects_v2(Bucket=BUCKET)["Contents"]]
+  assert keys == ["docs/run/frd.md"]
+  assert storage.location == f"s3://{BUCKET}/docs/"
+
+
+def test_writer_commit(storage):
+  writer = ArtifactWriter(storage=storage)
+  frd = writer.stage(storage.root / "frd.md", "# FRD\n")
+  erd = writer.stage(storage.root / "erd" / "erd.mmd", "erDiagram\n")
+  writer.stage_manifest_entry(storage.root, "frd.md", {"path": str(frd)}, "0" * 16)
+  # Nothing is stored before the commit
+  assert storage.read(frd) is None
+
+  report = writer.commit()
+  assert report["written"] == 2
+  assert report["bytes"] == len("# FRD\n") + len("erDiagram\n")
+  assert storage.read(frd) == b"# FRD\n"
+  assert storage.read(erd) == b"erDiagram\n"
+  assert storage.exists(storage.root / ".docgen_manifest.json")
+
+  writer = ArtifactWriter(storage=storage)
+  assert writer.stage(frd, "# FRD\n") == frd
+  changed = writer.stage(erd, "erDiagram\n  USER\n")
+  assert changed.name == "erd.mmd.new"
+  report = writer.commit()
+  assert (report["written"], report["unchanged"]) == (1, 1)
+  assert storage.read(erd) == b"erDiagram\n"
+  assert storage.read(changed) == b"erDiagram\n  USER\n"
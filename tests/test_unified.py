@@ -0,0 +1,63 @@
+"""Unified workflow: review transforms keep documents in their formats"""
+
+from pathlib import Path
+
+import pytest
+import yaml
+
+from docs_agent.openapi import validate_spec
+from docs_agent.state import Idea
+from orchestrator import graph as orchestrator_graph
+from orchestrator.graph import run_unified_workflow
+
+
+FIXTURE = Path(__file__).parent / "fixtures" / "idea_sample.json"
+
+
+@pytest.fixture
+def idea(tmp_path, monkeypatch) -> Idea:
+  monkeypatch.setenv("DOCGEN_OUTPUT_ROOT", str(tmp_path))
+  monkeypatch.setenv("DOCGEN_STORAGE", "local")
+  # Few paths per file, so the split path files are checked as well
+  monkeypatch.setenv("DOCGEN_OPENAPI_MAX_PATHS", "1")
+  idea = Idea.model_validate_json(FIXTURE.read_text())
+  idea.output_dir = tmp_path / "run"
+  return idea
+
+
+def test_transformed_openapi_still_parses(idea, capsys):
+  result = run_unified_workflow(idea, ["openapi", "erd", "brd_prd"], overwrite=True)
+  assert result["corrections_applied"]["openapi"]["transforms"] == ["improve_openapi"]
+
+  text = (idea.output_dir / "openapi.yaml").read_text()
+  assert "# Orchestrator Review Notes" in text
+  spec = yaml.safe_load(text)
+  parts = {path.name: yaml.safe_load(path.read_text()) for path in idea.output_dir.glob("openapi.paths-*.yaml")}
+  assert parts
+  assert validate_spec(spec, parts) == []
+
+  # Progress is logged; stdout carries the MCP protocol
+  assert capsys.readouterr().out == ""
+
+
+def test_erd_notes_are_mermaid_comments(idea):
+  run_unified_workflow(idea, ["erd"], overwrite=True)
+  text = (idea.output_dir / "erd.mmd").read_text()
+  diagram = text.split("```mermaid\n", 1)[1].split("```", 1)[0]
+  assert "%% Orchestrator Review Notes" in diagram
+  assert "## Orchestrator Review Notes" not in text
+
+
+def test_markdown_keeps_review_section(idea):
+  run_unified_workflow(idea, ["brd_prd"], overwrite=True)
+  assert "## Orchestrator Review Notes" in (idea.output_dir / "brd_prd.md").read_text()
+
+
+def test_transform_that_breaks_openapi_is_rejected(idea, monkeypatch):
+  def append_markdown(content: str, idea: Idea) -> str:
+    return content + "\n## Notes\n\n- not: [yaml\n"
+
+  monkeypatch.setitem(orchestrator_graph.TRANSFORMERS, "openapi", [append_markdown])
+  with pytest.raises(ValueError, match="openapi.yaml invalid"):
+    run_unified_workflow(idea, ["openapi"], overwrite=True)
+  assert not (idea.output_dir / "openapi.yaml").exists()
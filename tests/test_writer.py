@@ -0,0 +1,118 @@
+"""ArtifactWriter: atomic commits and the .new collision rule on local storage"""
+
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from docs_agent.utils import writer as writer_module
+from docs_agent.utils.storage import LocalStorage
+from docs_agent.utils.writer import ArtifactWriter, atomic_write, file_mode
+
+
+@pytest.fixture
+def storage(tmp_path) -> LocalStorage:
+  return LocalStorage(tmp_path / "outputs")
+
+
+def files_in(directory: Path):
+  return sorted(path.name for path in directory.rglob("*") if path.is_file())
+
+
+def mode(path: Path) -> int:
+  return stat.S_IMODE(path.stat().st_mode)
+
+
+def test_commit_writes_atomically(storage):
+  writer = ArtifactWriter(storage=storage, fsync=True)
+  srd = writer.stage(storage.root / "run" / "srd.md", "# SRD\n")
+  erd = writer.stage(storage.root / "run" / "erd" / "erd.mmd", "erDiagram\n")
+  assert files_in(storage.root) == []
+
+  report = writer.commit()
+  assert report["written"] == 2
+  assert srd.read_text() == "# SRD\n" and erd.read_text() == "erDiagram\n"
+  # No temp files are left behind, and files get the usual permissions
+  assert files_in(storage.root) == ["erd.mmd", "srd.md"]
+  assert mode(srd) == file_mode(storage.root / "missing.md") == writer_module._DEFAULT_MODE
+
+
+def test_failed_replace_leaves_the_target_alone(tmp_path, monkeypatch):
+  target = tmp_path / "frd.md"
+  target.write_text("# FRD\n")
+
+  def fail(src, dst):
+    raise OSError("disk full")
+
+  monkeypatch.setattr(os, "replace", fail)
+  with pytest.raises(OSError, match="disk full"):
+    atomic_write(target, b"# FRD v2\n")
+  assert target.read_text() == "# FRD\n"
+  assert files_in(tmp_path) == ["frd.md"]
+
+
+def test_replacing_keeps_the_file_mode(tmp_path):
+  target = tmp_path / "frd.md"
+  target.write_text("# FRD\n")
+  target.chmod(0o640)
+  atomic_write(target, b"# FRD v2\n")
+  assert target.read_text() == "# FRD v2\n"
+  assert mode(target) == 0o640
+
+
+def test_collision_goes_to_a_new_file(storage):
+  path = storage.root / "brd_prd.md"
+  storage.write(path, b"# BRD\n")
+
+  writer = ArtifactWriter(storage=storage)
+  staged = writer.stage(path, "# BRD v2\n")
+  assert staged == path.with_name("brd_prd.md.new")
+  writer.commit()
+  assert path.read_text() == "# BRD\n"
+  assert staged.read_text() == "# BRD v2\n"
+
+  # The .new file is replaced by the next differing render, not stacked
+  writer = ArtifactWriter(storage=storage)
+  assert writer.stage(path, "# BRD v3\n") == staged
+  writer.commit()
+  assert staged.read_text() == "# BRD v3\n"
+  assert files_in(storage.root) == ["brd_prd.md", "brd_prd.md.new"]
+
+
+def test_overwrite_replaces_the_file(storage):
+  path = storage.root / "brd_prd.md"
+  storage.write(path, b"# BRD\n")
+  writer = ArtifactWriter(storage=storage)
+  assert writer.stage(path, "# BRD v2\n", overwrite=True) == path
+  assert writer.commit()["written"] == 1
+  assert path.read_text() == "# BRD v2\n"
+  assert files_in(storage.root) == ["brd_prd.md"]
+
+
+def test_identical_bytes_are_not_rewritten(storage):
+  path = storage.root / "brd_prd.md"
+  storage.write(path, b"# BRD\n")
+  before = path.stat()
+
+  writer = ArtifactWriter(storage=storage)
+  assert writer.stage(path, "# BRD\n") == path
+  report = writer.commit()
+  assert (report["written"], report["unchanged"], report["bytes"]) == (0, 1, 0)
+  assert report["files"][0]["status"] == "unchanged"
+  assert (path.stat().st_ino, path.stat().st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+  assert files_in(storage.root) == ["brd_prd.md"]
+
+
+def test_discard_writes_nothing(storage):
+  writer = ArtifactWriter(storage=storage)
+  writer.stage(storage.root / "frd.md", "# FRD\n")
+  exported = ArtifactWriter(storage=storage)
+  exported.stage(storage.root / "srd.md", "# SRD\n")
+  writer.adopt(exported.export())
+  # Exported files wait as temp files until the adopting writer commits
+  assert len(files_in(storage.root)) == 1
+
+  writer.discard()
+  assert files_in(storage.root) == []
+  assert writer.commit()["written"] == 0